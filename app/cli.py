@@ -0,0 +1,78 @@
+"""Maintenance commands: ``python -m app.cli <command>``"""
+import argparse
+import asyncio
+from .core.config import settings
+from .database import SessionLocal, engine
+from .services.rollup_service import backfill_rollups
+from .services.interval_service import rebuild_all_interval_estimators
+
+
+async def _backfill_rollups(args) -> None:
+    async with SessionLocal() as db:
+        rows = await backfill_rollups(db, args.baby_id)
+    print(f"daily_activity_stats: {rows} filas regeneradas")
+
+
+async def _rebuild_intervals(args) -> None:
+    async with SessionLocal() as db:
+        babies = await rebuild_all_interval_estimators(db, args.baby_id)
+    print(f"interval_estimators: {babies} bebés recalculados")
+
+
+async def _prune_tombstones(args) -> None:
+    from .services.activity_writes import prune_tombstones
+    async with SessionLocal() as db:
+        removed = await prune_tombstones(db, args.retention_days)
+    print(f"activity_tombstones: {removed} lápidas purgadas")
+
+
+async def _migrate_media(args) -> None:
+    from .services.media_store import migrate_inline_media
+    async with SessionLocal() as db:
+        counts = await migrate_inline_media(db)
+    print(f"media: {counts['migrated']} fotos movidas al media store, {counts['invalid']} no válidas")
+
+
+async def _worker(args) -> None:
+    from .services.training_scheduler import training_scheduler
+    training_scheduler.start()
+    try:
+        while True:
+            await asyncio.sleep(settings.TRAINING_POLL_SECONDS)
+            print(f"training: {training_scheduler.stats()}", flush=True)
+    finally:
+        await training_scheduler.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    backfill = commands.add_parser("backfill-rollups", help="Rebuild daily_activity_stats from activities")
+    backfill.add_argument("--baby-id", type=int, default=None, help="Only rebuild this baby")
+    backfill.set_defaults(handler=_backfill_rollups)
+
+    intervals = commands.add_parser("rebuild-intervals", help="Recompute the online interval estimators from history")
+    intervals.add_argument("--baby-id", type=int, default=None, help="Only rebuild this baby")
+    intervals.set_defaults(handler=_rebuild_intervals)
+
+    prune = commands.add_parser("prune-tombstones", help="Delete activity tombstones past their retention")
+    prune.add_argument(
+        "--retention-days", type=int, default=settings.TOMBSTONE_RETENTION_DAYS,
+        help="Keep tombstones of the last N days"
+    )
+    prune.set_defaults(handler=_prune_tombstones)
+
+    media = commands.add_parser("migrate-media", help="Move inline base64 photos into the media store")
+    media.set_defaults(handler=_migrate_media)
+
+    worker = commands.add_parser("worker", help="Run the background model retraining scheduler")
+    worker.set_defaults(handler=_worker)
+
+    args = parser.parse_args()
+    engine.echo = False
+    asyncio.run(args.handler(args))
+
+
+if __name__ == "__main__":
+    main()
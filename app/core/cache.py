@@ -0,0 +1,140 @@
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+import json
+import time
+
+
+class TTLCache:
+    """Small in-process LRU cache whose entries expire after a fixed TTL"""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (value, time.monotonic() + self.ttl_seconds)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:  # Redis es opcional
+    redis_asyncio = None
+
+
+class LocalCacheBackend:
+    """Async cache interface over TTLCache (local stand-in for Redis)"""
+
+    backend = "local"
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self._cache = TTLCache(max_size, ttl_seconds)
+
+    async def get(self, key: str) -> Optional[Any]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: Any) -> None:
+        self._cache.set(key, value)
+
+    async def invalidate(self, key: str) -> None:
+        self._cache.invalidate(key)
+
+    def stats(self) -> dict:
+        return {"backend": self.backend, **self._cache.stats()}
+
+
+def _json_default(value: Any) -> Any:
+    # Escalares de numpy (salida de los modelos) y fechas
+    if hasattr(value, "item"):
+        return value.item()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+class RedisCacheBackend:
+    """Shared cache stored as JSON in Redis; errors degrade to cache misses"""
+
+    backend = "redis"
+
+    def __init__(self, url: str, prefix: str, ttl_seconds: int):
+        self._client = redis_asyncio.from_url(url)
+        self.prefix = prefix
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        try:
+            raw = await self._client.get(self.prefix + key)
+        except Exception:
+            self.errors += 1
+            raw = None
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    async def set(self, key: str, value: Any) -> None:
+        try:
+            await self._client.set(self.prefix + key, json.dumps(value, default=_json_default), ex=self.ttl_seconds)
+        except Exception:
+            self.errors += 1
+
+    async def invalidate(self, key: str) -> None:
+        try:
+            await self._client.delete(self.prefix + key)
+        except Exception:
+            self.errors += 1
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+        }
+
+
+def create_cache_backend(prefix: str, max_size: int, ttl_seconds: int, redis_url: Optional[str] = None):
+    """Redis backend when configured and installed, in-process LRU otherwise"""
+    if redis_url and redis_asyncio is not None:
+        return RedisCacheBackend(redis_url, prefix, ttl_seconds)
+    return LocalCacheBackend(max_size, ttl_seconds)
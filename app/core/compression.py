@@ -0,0 +1,129 @@
+import zlib
+from typing import Callable, Optional, Tuple
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # Opcional: sin el paquete brotli solo se comprime con gzip
+    brotli = None
+
+# Solo texto: las fotos y los PDF ya van comprimidos y text/event-stream tiene que salir
+# evento a evento (el compresor los retendría en su buffer)
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "image/svg+xml",
+    "text/html",
+    "text/css",
+    "text/plain",
+)
+
+Encoder = Tuple[Callable[[bytes], bytes], Callable[[], bytes]]
+
+
+def accepted_encodings(accept_encoding: str) -> set:
+    """Codings listed in Accept-Encoding, except those refused with q=0"""
+    accepted = set()
+    for item in accept_encoding.split(","):
+        coding, _, param = item.partition(";")
+        param = param.replace(" ", "").lower()
+        if param.startswith("q="):
+            try:
+                if float(param[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        if coding.strip():
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def is_compressible(headers: Headers) -> bool:
+    content_type = headers.get("content-type", "").split(";", 1)[0].strip().lower()
+    return content_type in COMPRESSIBLE_TYPES and "content-encoding" not in headers
+
+
+class CompressionMiddleware:
+    """Brotli (if installed) or gzip for text responses of at least ``minimum_size`` bytes.
+
+    Streaming responses (NDJSON) are compressed chunk by chunk; event
+    streams, images and PDFs pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _encoding(self, scope: Scope) -> Optional[str]:
+        accepted = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    def _encoder(self, encoding: str) -> Encoder:
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=self.brotli_quality)
+            return compressor.process, compressor.finish
+        # wbits=31: formato gzip (cabecera y CRC)
+        compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)
+        return compressor.compress, compressor.flush
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        encoding = self._encoding(scope) if scope["type"] == "http" else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        encoder: Optional[Encoder] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, encoder, passthrough
+            if message["type"] == "http.response.start":
+                # Se retiene hasta ver el primer trozo del cuerpo: de él depende si se comprime
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if encoder is None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                compressible = is_compressible(headers)
+                if compressible:
+                    headers.add_vary_header("Accept-Encoding")
+                if not compressible or (not more_body and len(body) < self.minimum_size):
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                encoder = self._encoder(encoding)
+                headers["Content-Encoding"] = encoding
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    # Los bytes comprimidos ya no son los del ETag fuerte; If-None-Match compara en débil
+                    headers["ETag"] = "W/" + etag
+                del headers["Content-Length"]
+                compress, finish = encoder
+                data = compress(body) + (b"" if more_body else finish())
+                if not more_body:
+                    headers["Content-Length"] = str(len(data))
+                await send(start_message)
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+                return
+
+            compress, finish = encoder
+            data = compress(body) + (b"" if more_body else finish())
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
@@ -8,6 +8,95 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # Argon2 (cambiar estos valores rehashea las contraseñas en el siguiente login)
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536
+    ARGON2_PARALLELISM: int = 4
+    
+    # Pool de hashing: hilos dedicados y peticiones en espera antes de responder 429
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 16
+    
+    # Caché de usuarios autenticados (por proceso)
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_SIZE: int = 10000
+    
+    # Caché de permisos usuario -> {baby_id: rol} (por proceso). Un bebé que falta se comprueba
+    # en la BD antes del 403; las bajas llegan a los demás workers con EVENTS_BACKEND="postgres"
+    # (con "local", al caducar la entrada)
+    ACCESS_CACHE_TTL_SECONDS: int = 300
+    ACCESS_CACHE_MAX_SIZE: int = 10000
+    
+    # Caché de estadísticas (la clave incluye la versión de datos del bebé)
+    STATISTICS_CACHE_TTL_SECONDS: int = 3600
+    STATISTICS_CACHE_MAX_SIZE: int = 2000
+    
+    # Caché de insights: Redis compartido si hay REDIS_URL, si no LRU en proceso.
+    # La salida de los modelos se guarda por data_version; los campos relativos al reloj ("horas
+    # desde la última toma") se recalculan en cada petición y el ETag cambia con cada tramo
+    INSIGHTS_CACHE_TTL_SECONDS: int = 3600
+    INSIGHTS_CACHE_MAX_SIZE: int = 2000
+    INSIGHTS_CACHE_BUCKET_SECONDS: int = 600
+    REDIS_URL: Optional[str] = None
+    
+    # Pool de procesos para los modelos de ML (0 = ejecutar en el propio proceso)
+    ML_POOL_WORKERS: int = 2
+    ML_MODEL_TIMEOUT_SECONDS: float = 10.0
+    
+    # Modelos entrenados por bebé en disco: se reentrenan al llegar suficientes
+    # muestras nuevas o al caducar (ML_TRAIN_ON_REQUEST=False: solo los entrena el scheduler)
+    MODEL_STORE_DIR: str = "model_store"
+    MODEL_RETRAIN_MIN_NEW_SAMPLES: int = 20
+    MODEL_MAX_AGE_HOURS: float = 24
+    ML_TRAIN_ON_REQUEST: bool = True
+    
+    # Scheduler de reentrenamiento (en la API o con "python -m app.cli worker").
+    # TRAINING_CONCURRENCY=0 usa tantos procesos como CPUs
+    TRAINING_SCHEDULER_ENABLED: bool = False
+    TRAINING_CONCURRENCY: int = 0
+    TRAINING_POLL_SECONDS: int = 60
+    TRAINING_RETRAIN_EVERY_N_WRITES: int = 20
+    TRAINING_INTERVAL_MINUTES: int = 360
+    TRAINING_ACTIVE_DAYS: int = 7
+    
+    # Lápidas de actividades borradas para /activities/changes: se purgan con
+    # "python -m app.cli prune-tombstones"; un since más antiguo recibe 410 (resincronizar)
+    TOMBSTONE_RETENTION_DAYS: int = 90
+    
+    # Eventos en tiempo real (SSE). EVENTS_BACKEND="postgres" reparte los eventos
+    # entre workers con LISTEN/NOTIFY (sin asyncpg o sin Postgres el arranque falla);
+    # "local" solo llega a los clientes del mismo proceso
+    EVENTS_BACKEND: str = "local"
+    EVENTS_QUEUE_SIZE: int = 100
+    EVENTS_KEEPALIVE_SECONDS: int = 15
+    
+    # Informes PDF: se generan en memoria hasta este tamaño y a partir de ahí en disco
+    REPORT_SPOOL_MAX_BYTES: int = 1024 * 1024
+    # Trabajos de informe: se renderizan en un pool de procesos (0 = en un hilo del propio
+    # proceso) y el PDF se guarda por (bebé, rango, versión de datos, versión de plantilla)
+    REPORT_WORKERS: int = 1
+    REPORT_STORE_DIR: str = "report_store"
+    REPORT_MAX_AGE_HOURS: float = 72
+
+    # Fotos de bebés y perfiles: se guardan en disco por contenido (original + miniatura)
+    # y la API devuelve su URL en vez del base64
+    MEDIA_STORE_DIR: str = "media_store"
+    MEDIA_MAX_BYTES: int = 5 * 1024 * 1024
+    MEDIA_THUMBNAIL_SIZE: int = 256
+
+    # Serializar las respuestas JSON con orjson (viene en requirements.txt; sin el paquete
+    # o con False se usa el json estándar)
+    ORJSON_RESPONSES: bool = True
+
+    # Compresión de respuestas de texto a partir de este tamaño: Brotli si el cliente lo
+    # acepta y está instalado el paquete brotli (pip install brotli), si no gzip
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # /metrics solo responde con "Authorization: Bearer <METRICS_TOKEN>"; sin token configurado da 404
+    METRICS_TOKEN: Optional[str] = None
+
     APP_NAME: str = "BabyCare API"
     DEBUG: bool = True
     
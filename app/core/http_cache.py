@@ -0,0 +1,31 @@
+import hashlib
+from typing import Dict
+from fastapi import Request, Response, status
+
+# Respuestas que cambian con los datos: el cliente las guarda pero revalida siempre con If-None-Match
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True when the client's If-None-Match already names this ETag (answer 304)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Comparación débil: se ignora el prefijo W/
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def version_etag(*parts) -> str:
+    """Strong ETag for a representation fully determined by ``parts`` (e.g. baby, data version, query)"""
+    raw = ":".join(str(part) for part in parts)
+    return f'"{hashlib.sha256(raw.encode()).hexdigest()[:32]}"'
+
+
+def revalidate_headers(etag: str) -> Dict[str, str]:
+    return {"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=revalidate_headers(etag))
@@ -0,0 +1,30 @@
+import re
+from typing import Optional
+
+# Nombres del media store: dirección de 128 bits (HMAC del contenido) + extensión.
+# La URL es la credencial: quien la tiene puede descargar la imagen sin token
+THUMBNAIL_SUFFIX = "_thumb.jpg"
+MEDIA_URL_PREFIX = "/media/"
+MEDIA_NAME_PATTERN = r"^[0-9a-f]{32}(_thumb)?\.(jpg|png|webp|gif)$"
+_media_name = re.compile(MEDIA_NAME_PATTERN)
+
+
+def is_media_name(name: str) -> bool:
+    return _media_name.match(name) is not None
+
+
+def thumbnail_name(name: str) -> str:
+    return name.split(".", 1)[0] + THUMBNAIL_SUFFIX
+
+
+def media_url(name: Optional[str]) -> Optional[str]:
+    """Public URL of a stored image (legacy inline data URLs are returned as they are)"""
+    if not name or name.startswith("data:"):
+        return name
+    return MEDIA_URL_PREFIX + name
+
+
+def thumbnail_url(name: Optional[str]) -> Optional[str]:
+    if not name or name.startswith("data:"):
+        return name
+    return MEDIA_URL_PREFIX + thumbnail_name(name)
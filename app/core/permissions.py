@@ -0,0 +1,56 @@
+from fastapi import Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Optional
+from ..database import get_db
+from ..models.user import User
+from ..models.user_baby import UserBaby
+from .cache import TTLCache
+from .config import settings
+from .security import get_current_user
+
+# user_id -> {baby_id: role}; se carga entero en la primera comprobación del usuario
+access_cache = TTLCache(settings.ACCESS_CACHE_MAX_SIZE, settings.ACCESS_CACHE_TTL_SECONDS)
+
+
+async def get_user_baby_roles(user_id: int, db: AsyncSession) -> Dict[int, str]:
+    """Return the baby-id -> role map for a user, loading it once per TTL"""
+    roles = access_cache.get(user_id)
+    if roles is None:
+        rows = (await db.execute(
+            select(UserBaby.baby_id, UserBaby.role).where(UserBaby.user_id == user_id)
+        )).all()
+        roles = {baby_id: role for baby_id, role in rows}
+        access_cache.set(user_id, roles)
+    return roles
+
+async def lookup_baby_role(db: AsyncSession, user_id: int, baby_id: int) -> Optional[str]:
+    """Role straight from the database, bypassing the cache (None without access)"""
+    return await db.scalar(select(UserBaby.role).where(
+        UserBaby.user_id == user_id,
+        UserBaby.baby_id == baby_id
+    ))
+
+def invalidate_baby_access(*user_ids: int) -> None:
+    """Forget cached roles after caregivers or babies change"""
+    for user_id in user_ids:
+        access_cache.invalidate(user_id)
+
+async def get_baby_role(
+    baby_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> str:
+    """Dependency: the caller's role for the baby in the path, or 403"""
+    roles = await get_user_baby_roles(current_user.id, db)
+    role = roles.get(baby_id)
+    if role is None:
+        # El mapa puede ser anterior a un alta hecha en otro worker: se confirma en la BD antes del 403
+        role = await lookup_baby_role(db, current_user.id, baby_id)
+        if role is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You don't have access to this baby"
+            )
+        access_cache.set(current_user.id, {**roles, baby_id: role})
+    return role
@@ -0,0 +1,49 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Type
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only
+
+
+def response_fields(schema: Type[BaseModel]) -> Set[str]:
+    return set(schema.model_fields) | set(schema.model_computed_fields)
+
+
+def parse_fields(fields: Optional[str], schema: Type[BaseModel], always: Iterable[str] = ("id",)) -> Optional[Set[str]]:
+    """Sparse fieldset from ``?fields=a,b``; None means every field of the schema"""
+    if fields is None:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - response_fields(schema)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+    return requested | set(always)
+
+
+def columns_for(model, fields: Iterable[str], sources: Dict[str, Sequence[str]] = {}) -> List[Any]:
+    """Mapped columns behind some response fields (computed fields name their columns in ``sources``)"""
+    names = set()
+    for field in fields:
+        names.update(sources.get(field, (field,)))
+    return [getattr(model, column.key) for column in model.__table__.columns if column.key in names]
+
+
+def load_response_columns(
+    model,
+    schema: Type[BaseModel],
+    fields: Optional[Iterable[str]] = None,
+    sources: Dict[str, Sequence[str]] = {}
+):
+    """``load_only`` option that fetches just the columns a response (or a sparse fieldset of it) uses"""
+    return load_only(*columns_for(model, response_fields(schema) if fields is None else fields, sources))
+
+
+def dump_sparse(schema: Type[BaseModel], obj, fields: Set[str]) -> Dict[str, Any]:
+    """Serialize ``fields`` of a partially loaded row with the schema's own serializers"""
+    # Solo se leen atributos ya cargados: uno diferido lanzaría una consulta (o fallaría en async)
+    unloaded = inspect(obj).unloaded
+    values = {name: getattr(obj, name) for name in schema.model_fields if name not in unloaded}
+    return schema.model_construct(**values).model_dump(mode="json", include=fields)
@@ -0,0 +1,52 @@
+import json
+from typing import Any, Dict, Iterable, Mapping, Optional, Sequence
+from fastapi.responses import JSONResponse, ORJSONResponse
+from .config import settings
+
+try:
+    import orjson
+except ImportError:  # Está en requirements.txt; sin él (instalación mínima) se usa el json estándar
+    orjson = None
+
+FAST_JSON = orjson is not None and settings.ORJSON_RESPONSES
+
+# Clase de respuesta por defecto de la app (la validación del response_model se mantiene)
+DefaultJSONResponse = ORJSONResponse if FAST_JSON else JSONResponse
+
+
+def _encode_default(value: Any) -> Any:
+    # Fechas de las filas de la BD (naive UTC), igual que las serializa pydantic
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _dumps(content: Any) -> bytes:
+    if FAST_JSON:
+        return orjson.dumps(content)
+    # Mismo formato compacto que JSONResponse, sin el paso por jsonable_encoder
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_encode_default).encode()
+
+
+class TrustedJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return _dumps(content)
+
+
+def rows_as_dicts(rows: Iterable[Sequence[Any]], names: Sequence[str]) -> list:
+    """Column rows to dicts keyed by ``names`` (trailing extra columns, e.g. for a cursor, are dropped)"""
+    return [dict(zip(names, row)) for row in rows]
+
+
+def trusted_json_response(content: Any, headers: Optional[Mapping[str, str]] = None) -> TrustedJSONResponse:
+    """Response for data already shaped like the response model, e.g. rows of its own columns.
+
+    Skips the response_model validation and the jsonable_encoder pass:
+    datetimes and JSON columns are encoded directly (with orjson if installed).
+    """
+    return TrustedJSONResponse(content, headers=headers)
+
+
+def json_line(content: Dict[str, Any]) -> bytes:
+    """One NDJSON line"""
+    return _dumps(content) + b"\n"
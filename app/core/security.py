@@ -1,16 +1,94 @@
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, make_transient_to_detached
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import asyncio
 from ..database import get_db
 from ..models.user import User
 from .config import settings
+from .cache import TTLCache
 
 # Password hashing
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__rounds=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
+)
+
+
+class PasswordHashingPool:
+    """Bounded thread pool for Argon2 work so hashing never runs on the event loop"""
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        # argon2-cffi libera el GIL, así que los hilos trabajan en paralelo
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="argon2")
+
+    async def run(self, fn, *args):
+        """Run fn(*args) in the pool, answering 429 when the queue is full"""
+        if self.in_flight >= self.max_workers + self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Server busy, please try again",
+                headers={"Retry-After": "1"},
+            )
+
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._executor, partial(fn, *args))
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+        self.completed += 1
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "in_flight": self.in_flight,
+            "queued": max(0, self.in_flight - self.max_workers),
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+
+password_pool = PasswordHashingPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
+
+# Caché de usuarios por id: evita la consulta a "users" en cada petición autenticada
+user_cache = TTLCache(settings.USER_CACHE_MAX_SIZE, settings.USER_CACHE_TTL_SECONDS)
+
+# Columnas que carga una petición autenticada: ni el hash ni los tokens de reseteo
+# (quien los necesite los pide explícitamente)
+PRINCIPAL_COLUMNS = (User.id, User.email, User.name, User.profile_picture, User.created_at, User.updated_at)
+
+
+def cache_user(user: User) -> None:
+    """Store a column snapshot of the user in the principal cache"""
+    user_cache.set(user.id, {column.key: getattr(user, column.key) for column in PRINCIPAL_COLUMNS})
+
+def invalidate_user_cache(user_id: int) -> None:
+    """Drop a user from the principal cache after it changes"""
+    user_cache.invalidate(user_id)
 
 # OAuth2 scheme - hacer auto_error=False para manejar manualmente
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login", auto_error=False)
@@ -23,6 +101,18 @@ def get_password_hash(password: str) -> str:
     """Hash a password"""
     return pwd_context.hash(password)
 
+async def hash_password_async(password: str) -> str:
+    """Hash a password in the hashing pool"""
+    return await password_pool.run(pwd_context.hash, password)
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password in the hashing pool.
+
+    Returns (valid, new_hash); new_hash is set when the stored hash uses
+    outdated Argon2 parameters and should be replaced.
+    """
+    return await password_pool.run(pwd_context.verify_and_update, plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -38,7 +128,7 @@ def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
 async def get_current_user(
     request: Request,
     token: Optional[str] = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> User:
     """Get current authenticated user - supports token from header or query param"""
     
@@ -56,6 +146,7 @@ async def get_current_user(
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         email: str = payload.get("sub")
+        user_id: Optional[int] = payload.get("uid")
         if email is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -67,11 +158,20 @@ async def get_current_user(
             detail="Could not validate credentials"
         )
     
-    user = db.query(User).filter(User.email == email).first()
+    # Camino rápido: usuario en caché (tokens con claim "uid")
+    snapshot = user_cache.get(user_id) if user_id is not None else None
+    if snapshot is not None and snapshot["email"] == email:
+        user = User(**snapshot)
+        make_transient_to_detached(user)
+        db.add(user)
+        return user
+    
+    user = await db.scalar(select(User).options(load_only(*PRINCIPAL_COLUMNS)).where(User.email == email))
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
     
+    cache_user(user)
     return user
\ No newline at end of file
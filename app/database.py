@@ -1,6 +1,7 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import declarative_base
+from datetime import datetime, timezone
+from typing import Optional
 import os
 from dotenv import load_dotenv
 
@@ -8,19 +9,41 @@ load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,  
-    echo=True 
+
+def get_async_database_url(url: str) -> str:
+    """Rewrite a plain Postgres URL so it uses the asyncpg driver"""
+    for prefix in ("postgres://", "postgresql://", "postgresql+psycopg2://"):
+        if url.startswith(prefix):
+            url = "postgresql+asyncpg://" + url[len(prefix):]
+            break
+    # asyncpg no entiende "sslmode", usa "ssl"
+    if url.startswith("postgresql+asyncpg://"):
+        url = url.replace("sslmode=", "ssl=")
+    return url
+
+
+def to_naive_utc(dt: Optional[datetime]) -> Optional[datetime]:
+    """Normalize a datetime to naive UTC (asyncpg rejects aware values for TIMESTAMP columns)"""
+    if dt is None or dt.tzinfo is None:
+        return dt
+    return dt.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+engine = create_async_engine(
+    get_async_database_url(DATABASE_URL),
+    pool_pre_ping=True,
+    echo=True
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = async_sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
 
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
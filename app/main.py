@@ -1,10 +1,23 @@
-from fastapi import FastAPI
+import hmac
+from fastapi import Depends, FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from .routers import auth, babies, activities, caregivers, insights
+from .routers import auth, babies, activities, caregivers, insights, statistics, events, reports, media
+from .core.security import password_pool, user_cache
+from .core.permissions import access_cache
+from .services.statistics_service import statistics_cache
+from .services.insights_service import insights_cache
+from .services.ml_pool import ml_pool
+from .services.training_scheduler import training_scheduler
+from .services.event_hub import event_hub
+from .services.report_jobs import report_jobs
+from .services.media_store import media_store
+from .core.config import settings
+from .core.compression import CompressionMiddleware
+from .core.responses import DefaultJSONResponse
 
 
-app = FastAPI(title="BabyCare API", version="1.0.0")
+app = FastAPI(title="BabyCare API", version="1.0.0", default_response_class=DefaultJSONResponse)
 
 
 app.add_middleware(
@@ -16,11 +29,46 @@ app.add_middleware(
 )
 
 
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+)
+
+
 app.include_router(auth.router)
 app.include_router(babies.router)
 app.include_router(activities.router)
 app.include_router(caregivers.router)
 app.include_router(insights.router)
+app.include_router(statistics.router)
+app.include_router(events.router)
+app.include_router(reports.router)
+app.include_router(media.router)
+
+
+@app.on_event("startup")
+async def start_training_scheduler():
+    if settings.TRAINING_SCHEDULER_ENABLED:
+        training_scheduler.start()
+
+
+@app.on_event("startup")
+async def start_event_hub():
+    await event_hub.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_ml_pool():
+    await training_scheduler.stop()
+    ml_pool.shutdown()
+    report_jobs.shutdown()
+
+
+@app.on_event("shutdown")
+async def stop_event_hub():
+    await event_hub.stop()
 
 
 @app.get("/health")
@@ -30,4 +78,34 @@ async def health_check():
     return {"status": "ok", "service": "BabyCare API"}
 
 
+def require_metrics_token(request: Request) -> None:
+    """Only the configured scraper may read /metrics; without METRICS_TOKEN the endpoint does not exist"""
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    expected = f"Bearer {settings.METRICS_TOKEN}"
+    if not hmac.compare_digest(request.headers.get("authorization", "").encode(), expected.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(require_metrics_token)])
+async def metrics():
+    """Internal pool and cache counters"""
+    return {
+        "password_hashing": password_pool.stats(),
+        "user_cache": user_cache.stats(),
+        "access_cache": access_cache.stats(),
+        "statistics_cache": statistics_cache.stats(),
+        "insights_cache": insights_cache.stats(),
+        "ml_pool": ml_pool.stats(),
+        "training": training_scheduler.stats(),
+        "events": event_hub.stats(),
+        "reports": report_jobs.stats(),
+        "media": media_store.stats(),
+    }
+
+
 app.mount("/", StaticFiles(directory="frontend_dist", html=True), name="static")
\ No newline at end of file
@@ -2,5 +2,8 @@ from .user import User
 from .baby import Baby
 from .user_baby import UserBaby
 from .activity import Activity
+from .daily_activity_stats import DailyActivityStats
+from .interval_estimator import IntervalEstimator
+from .activity_tombstone import ActivityTombstone
 
-__all__ = ["User", "Baby", "UserBaby", "Activity"]
\ No newline at end of file
+__all__ = ["User", "Baby", "UserBaby", "Activity", "DailyActivityStats", "IntervalEstimator", "ActivityTombstone"]
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, JSON
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from ..database import Base
@@ -9,11 +9,24 @@ class Activity(Base):
     id = Column(Integer, primary_key=True, index=True)
     baby_id = Column(Integer, ForeignKey("babies.id", ondelete="CASCADE"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
-    type = Column(String, nullable=False, index=True)  # feeding, sleep, diaper, health
+    type = Column(String, nullable=False)  # feeding, sleep, diaper, health
     timestamp = Column(DateTime, nullable=False, index=True)
     data = Column(JSON, nullable=True)
     notes = Column(String, nullable=True)
+    # Clave enviada por el cliente en las cargas por lotes: un reintento no duplica filas
+    idempotency_key = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # data_version del bebé en la última escritura: los clientes piden los cambios posteriores a su token
+    version = Column(Integer, nullable=False, default=0, server_default="0")
     
     # Relaciones
-    baby = relationship("Baby", back_populates="activities")
\ No newline at end of file
+    baby = relationship("Baby", back_populates="activities")
+    
+    # Las consultas filtran siempre por bebé + rango de fechas (y a menudo tipo)
+    __table_args__ = (
+        Index("ix_activities_baby_id_timestamp", "baby_id", "timestamp"),
+        Index("ix_activities_baby_id_type_timestamp", "baby_id", "type", "timestamp"),
+        Index("ux_activities_baby_id_idempotency_key", "baby_id", "idempotency_key", unique=True),
+        Index("ix_activities_baby_id_version", "baby_id", "version"),
+    )
\ No newline at end of file
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index
+from datetime import datetime
+from ..database import Base
+
+class ActivityTombstone(Base):
+    """Deleted activity, kept so delta-sync clients can drop it from their copy"""
+    __tablename__ = "activity_tombstones"
+    
+    activity_id = Column(Integer, primary_key=True)
+    baby_id = Column(Integer, ForeignKey("babies.id", ondelete="CASCADE"), nullable=False)
+    # data_version del bebé en el borrado
+    version = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("ix_activity_tombstones_baby_id_version", "baby_id", "version"),
+    )
@@ -12,7 +12,11 @@ class Baby(Base):
     photo = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Se incrementa con cada escritura de actividades; sirve como clave de caché
+    data_version = Column(Integer, nullable=False, default=0, server_default="0")
+    # Versión hasta la que se purgaron las lápidas: un sync_token anterior ya no se puede servir
+    tombstones_pruned_version = Column(Integer, nullable=False, default=0, server_default="0")
     
     # Relaciones
-    user_babies = relationship("UserBaby", back_populates="baby")
-    activities = relationship("Activity", back_populates="baby")
\ No newline at end of file
+    user_babies = relationship("UserBaby", back_populates="baby", passive_deletes=True)
+    activities = relationship("Activity", back_populates="baby", passive_deletes=True)
\ No newline at end of file
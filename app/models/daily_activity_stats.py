@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Date, Float
+from ..database import Base
+
+class DailyActivityStats(Base):
+    """Per-baby, per-day, per-type rollup of activities (maintained on every write)"""
+    __tablename__ = "daily_activity_stats"
+    
+    baby_id = Column(Integer, ForeignKey("babies.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    type = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    quantity_ml = Column(Float, nullable=False, default=0)
+    duration_hours = Column(Float, nullable=False, default=0)
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float, Boolean, JSON
+from ..database import Base
+
+class IntervalEstimator(Base):
+    """Online (Welford / EWM) estimate of the time between activities of one type"""
+    __tablename__ = "interval_estimators"
+    
+    baby_id = Column(Integer, ForeignKey("babies.id", ondelete="CASCADE"), primary_key=True)
+    type = Column(String, primary_key=True)  # feeding, diaper
+    last_timestamp = Column(DateTime, nullable=True)
+    # Welford: número de intervalos, media y suma de cuadrados de las desviaciones (horas)
+    count = Column(Integer, nullable=False, default=0)
+    mean = Column(Float, nullable=False, default=0)
+    m2 = Column(Float, nullable=False, default=0)
+    # Media y varianza con decaimiento exponencial (pesa más lo reciente)
+    ewm_mean = Column(Float, nullable=False, default=0)
+    ewm_var = Column(Float, nullable=False, default=0)
+    # [count, mean, m2] por franja horaria en la que empieza el intervalo
+    hour_buckets = Column(JSON, nullable=False)
+    # Ediciones, borrados o inserciones fuera de orden: se recalcula en la siguiente lectura
+    stale = Column(Boolean, nullable=False, default=False)
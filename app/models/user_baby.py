@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from ..database import Base
@@ -14,4 +14,8 @@ class UserBaby(Base):
     
     # Relaciones
     user = relationship("User", back_populates="user_babies")
-    baby = relationship("Baby", back_populates="user_babies")
\ No newline at end of file
+    baby = relationship("Baby", back_populates="user_babies")
+    
+    __table_args__ = (
+        Index("ix_user_babies_user_id_baby_id", "user_id", "baby_id", unique=True),
+    )
\ No newline at end of file
@@ -1,36 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple
 from datetime import datetime
-from ..database import get_db
+import base64
+from ..database import get_db, to_naive_utc, SessionLocal
 from ..models.user import User
 from ..models.activity import Activity
-from ..models.user_baby import UserBaby
-from ..schemas.activity import ActivityCreate, ActivityResponse
+from ..models.baby import Baby
+from ..models.activity_tombstone import ActivityTombstone
+from ..schemas.activity import (
+    ActivityCreate, ActivityResponse, ActivityBatchCreate, ActivityBatchResponse, ActivityChange,
+    ActivityChangesResponse
+)
 from ..core.security import get_current_user
+from ..core.permissions import get_baby_role
+from ..core.http_cache import etag_matches, not_modified, revalidate_headers, version_etag
+from ..core.projection import parse_fields
+from ..core.responses import json_line, rows_as_dicts, trusted_json_response
+from ..services.rollup_service import activity_delta
+from ..services.activity_writes import get_data_version, lock_data_version, record_activity_changes
+from ..services.event_hub import activity_event, event_hub
 
 router = APIRouter(tags=["activities"])
 
+MAX_PAGE_SIZE = 500
+NDJSON_BATCH_SIZE = 500
+
+# Campos de las respuestas de lectura: se consultan como columnas con estos mismos nombres
+ACTIVITY_FIELDS = list(ActivityResponse.model_fields)
+CHANGE_FIELDS = list(ActivityChange.model_fields)
+
 @router.post("/babies/{baby_id}/activities", response_model=ActivityResponse, status_code=status.HTTP_201_CREATED)
 async def create_activity(
     baby_id: int,
     activity: ActivityCreate,
+    role: str = Depends(get_baby_role),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new activity for a baby"""
-    # Check if user has access to this baby
-    user_baby = db.query(UserBaby).filter(
-        UserBaby.user_id == current_user.id,
-        UserBaby.baby_id == baby_id
-    ).first()
-
-    if not user_baby:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You don't have access to this baby"
-        )
-
     db_activity = Activity(
         baby_id=baby_id,
         user_id=current_user.id,
@@ -41,69 +52,284 @@ async def create_activity(
     )
 
     db.add(db_activity)
-    db.commit()
-    db.refresh(db_activity)
+    await record_activity_changes(
+        db, baby_id, [activity_delta(db_activity)],
+        added=[(db_activity.type, db_activity.timestamp)],
+        changed=[db_activity]
+    )
+    await db.commit()
+    await db.refresh(db_activity)
+    await event_hub.publish(baby_id, activity_event("created", [db_activity.id], db_activity.version))
 
     return db_activity
 
+@router.post("/babies/{baby_id}/activities:batch", response_model=ActivityBatchResponse)
+async def create_activities_batch(
+    baby_id: int,
+    batch: ActivityBatchCreate,
+    role: str = Depends(get_baby_role),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Create many activities in one transaction (items with an idempotency key are never duplicated)"""
+    # La fila del bebé se bloquea primero (como en record_activity_changes) y las filas llevan
+    # ya la versión que tendrá: sin un UPDATE por fila al confirmar. Solo se sube si algo se inserta
+    version = await lock_data_version(db, baby_id) + 1
+
+    def row(item):
+        return {
+            "baby_id": baby_id,
+            "user_id": current_user.id,
+            "type": item.type,
+            "timestamp": item.timestamp,
+            "data": item.data,
+            "notes": item.notes,
+            "idempotency_key": item.idempotency_key,
+            "version": version,
+        }
+
+    # La primera aparición de cada clave se inserta; las repeticiones en el mismo lote son duplicados
+    first_index = {}
+    keyed_rows = []
+    plain = []
+    for index, item in enumerate(batch.items):
+        if item.idempotency_key is None:
+            plain.append(index)
+        elif item.idempotency_key not in first_index:
+            first_index[item.idempotency_key] = index
+            keyed_rows.append(row(item))
+
+    results = [None] * len(batch.items)
+
+    if plain:
+        created = (await db.scalars(
+            insert(Activity).returning(Activity, sort_by_parameter_order=True),
+            [row(batch.items[index]) for index in plain]
+        )).all()
+        for index, activity in zip(plain, created):
+            results[index] = ("created", activity)
+
+    by_key = {}
+    if keyed_rows:
+        dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+        stmt = dialect.insert(Activity).on_conflict_do_nothing(
+            index_elements=["baby_id", "idempotency_key"]
+        ).returning(Activity)
+        for activity in (await db.scalars(stmt, keyed_rows)).all():
+            by_key[activity.idempotency_key] = activity
+            results[first_index[activity.idempotency_key]] = ("created", activity)
+
+        # Claves que ya existían (reintentos de un lote anterior)
+        existing_keys = [key for key in first_index if key not in by_key]
+        if existing_keys:
+            existing = (await db.scalars(select(Activity).where(
+                Activity.baby_id == baby_id,
+                Activity.idempotency_key.in_(existing_keys)
+            ))).all()
+            by_key.update({activity.idempotency_key: activity for activity in existing})
+
+    for index, item in enumerate(batch.items):
+        if results[index] is None:
+            results[index] = ("duplicate", by_key[item.idempotency_key])
+
+    created = [activity for status_, activity in results if status_ == "created"]
+    if created:
+        await record_activity_changes(
+            db, baby_id, [activity_delta(activity) for activity in created],
+            added=[(activity.type, activity.timestamp) for activity in created]
+        )
+    await db.commit()
+    if created:
+        await event_hub.publish(baby_id, activity_event("created", [activity.id for activity in created], created[0].version))
+
+    return {
+        "created": len(created),
+        "duplicates": len(results) - len(created),
+        "results": [
+            {"index": index, "status": status_, "activity": activity}
+            for index, (status_, activity) in enumerate(results)
+        ],
+    }
+
+def _encode_cursor(activity) -> str:
+    """Opaque keyset cursor for the (timestamp, id) position of an activity"""
+    raw = f"{activity.timestamp.isoformat()}|{activity.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        timestamp, activity_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(timestamp), int(activity_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+async def _stream_ndjson(query, names: List[str], limit: Optional[int] = None):
+    """Yield activities as NDJSON lines using a server-side cursor (plus a next_cursor line past ``limit``)"""
+    # Las cabeceras ya salieron al empezar el stream: el cursor va en una última línea
+    async with SessionLocal() as session:
+        rows = await session.stream(query.execution_options(yield_per=NDJSON_BATCH_SIZE))
+        sent = 0
+        last = None
+        async for row in rows:
+            if limit is not None and sent == limit:
+                yield json_line({"next_cursor": _encode_cursor(last)})
+                break
+            yield json_line(dict(zip(names, row)))
+            sent += 1
+            last = row
+
 @router.get("/babies/{baby_id}/activities", response_model=List[ActivityResponse])
 async def get_baby_activities(
+    request: Request,
     baby_id: int,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
     activity_type: Optional[str] = None,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    fields: Optional[str] = Query(None, description="Comma separated subset of the response fields"),
+    role: str = Depends(get_baby_role),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get all activities for a baby with optional filters"""
-    # Check if user has access
-    user_baby = db.query(UserBaby).filter(
-        UserBaby.user_id == current_user.id,
-        UserBaby.baby_id == baby_id
-    ).first()
-
-    if not user_baby:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You don't have access to this baby"
-        )
+    """Get activities for a baby, newest first, with optional filters.
 
-    query = db.query(Activity).filter(Activity.baby_id == baby_id)
+    Passing ``limit`` enables keyset pagination: the ``X-Next-Cursor``
+    response header holds the value to send as ``cursor`` for the next
+    page. ``format=ndjson`` streams one activity per line instead; with
+    ``limit`` a last ``{"next_cursor": ...}`` line follows when there are
+    more activities.
+    ``fields=id,type,timestamp`` returns (and reads) only those fields.
+    Responses carry an ETag; If-None-Match answers 304 until the baby's
+    activities change.
+    """
+    sparse = parse_fields(fields, ActivityResponse)
+    # Filas de columnas, no objetos ORM: se serializan tal cual, sin validar cada instancia
+    names = [name for name in ACTIVITY_FIELDS if sparse is None or name in sparse]
+    # timestamp e id hacen falta para el cursor: si no se pidieron van al final y no se devuelven
+    keyset = [name for name in ("timestamp", "id") if name not in names]
+    query = select(*(getattr(Activity, name) for name in names + keyset)).where(Activity.baby_id == baby_id)
 
     if start_date:
-        query = query.filter(Activity.timestamp >= start_date)
+        query = query.where(Activity.timestamp >= to_naive_utc(start_date))
     if end_date:
-        query = query.filter(Activity.timestamp <= end_date)
+        query = query.where(Activity.timestamp <= to_naive_utc(end_date))
     if activity_type:
-        query = query.filter(Activity.type == activity_type)
+        query = query.where(Activity.type == activity_type)
+    if cursor:
+        cursor_timestamp, cursor_id = _decode_cursor(cursor)
+        query = query.where(tuple_(Activity.timestamp, Activity.id) < tuple_(cursor_timestamp, cursor_id))
 
-    activities = query.order_by(Activity.timestamp.desc()).all()
+    query = query.order_by(Activity.timestamp.desc(), Activity.id.desc())
 
-    return activities
+    # La versión se lee antes que las filas: si entra una escritura entre medias el ETag
+    # queda por detrás y la siguiente petición devuelve 200, nunca un 304 con datos viejos
+    etag = version_etag("activities", baby_id, await get_data_version(db, baby_id), request.url.query)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    headers = revalidate_headers(etag)
 
-@router.get("/babies/{baby_id}/activities/{activity_id}", response_model=ActivityResponse)
-async def get_activity(
+    if format == "ndjson":
+        if limit:
+            # Fila extra para saber si hay otra página, como en JSON
+            query = query.limit(limit + 1)
+        return StreamingResponse(_stream_ndjson(query, names, limit), media_type="application/x-ndjson", headers=headers)
+
+    if limit is None:
+        rows = (await db.execute(query)).all()
+    else:
+        # Se pide una fila extra para saber si hay otra página
+        rows = (await db.execute(query.limit(limit + 1))).all()
+        if len(rows) > limit:
+            rows = rows[:limit]
+            headers["X-Next-Cursor"] = _encode_cursor(rows[-1])
+
+    return trusted_json_response(rows_as_dicts(rows, names), headers=headers)
+
+@router.get("/babies/{baby_id}/activities/changes", response_model=ActivityChangesResponse)
+async def get_activity_changes(
     baby_id: int,
-    activity_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    since: Optional[int] = Query(None, ge=0),
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    role: str = Depends(get_baby_role),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get a specific activity"""
-    user_baby = db.query(UserBaby).filter(
-        UserBaby.user_id == current_user.id,
-        UserBaby.baby_id == baby_id
-    ).first()
+    """Activities created, updated or deleted after the ``since`` sync token.
 
-    if not user_baby:
+    Without ``since`` every activity is returned (initial sync). Send the
+    returned ``sync_token`` as ``since`` next time and keep fetching while
+    ``has_more`` is true. Clients apply ``deleted`` before ``upserted``.
+    A ``since`` older than the deletion retention answers 410: drop the
+    local copy and sync again without ``since``.
+    """
+    # El token se lee antes que los cambios: lo que se confirme entre medias llega en la siguiente petición
+    sync_token, pruned_version = (await db.execute(
+        select(Baby.data_version, Baby.tombstones_pruned_version).where(Baby.id == baby_id)
+    )).one()
+    if since is not None and since < pruned_version:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You don't have access to this baby"
+            status_code=status.HTTP_410_GONE,
+            detail="Sync token expired: resync required (fetch the changes again without since)"
         )
 
-    activity = db.query(Activity).filter(
+    query = select(*(getattr(Activity, name) for name in CHANGE_FIELDS)).where(
+        Activity.baby_id == baby_id, Activity.version <= sync_token
+    )
+    tombstones = select(ActivityTombstone.activity_id, ActivityTombstone.version).where(
+        ActivityTombstone.baby_id == baby_id, ActivityTombstone.version <= sync_token
+    )
+    if since is not None:
+        query = query.where(Activity.version > since)
+        tombstones = tombstones.where(ActivityTombstone.version > since)
+    upserted = (await db.execute(query.order_by(Activity.version, Activity.id).limit(limit + 1))).all()
+    # Sin since no hay borrados que enviar: el cliente parte de cero
+    deleted = (await db.execute(
+        tombstones.order_by(ActivityTombstone.version, ActivityTombstone.activity_id).limit(limit + 1)
+    )).all() if since is not None else []
+
+    # Altas y borrados comparten el límite; las páginas se cortan entre versiones para que
+    # el token nunca deje una escritura a medias
+    versions = sorted([row.version for row in upserted] + [row.version for row in deleted])
+    has_more = len(versions) > limit
+    if has_more:
+        boundary = versions[limit]
+        if versions[0] < boundary:
+            sync_token = boundary - 1
+            upserted = [row for row in upserted if row.version < boundary]
+            deleted = [row for row in deleted if row.version < boundary]
+        else:
+            # Una sola escritura (lote) con más filas que el límite: se devuelve entera
+            sync_token = boundary
+            upserted = (await db.execute(
+                query.where(Activity.version == boundary).order_by(Activity.id)
+            )).all()
+            deleted = (await db.execute(
+                tombstones.where(ActivityTombstone.version == boundary).order_by(ActivityTombstone.activity_id)
+            )).all() if since is not None else []
+
+    return trusted_json_response({
+        "sync_token": sync_token,
+        "has_more": has_more,
+        "upserted": rows_as_dicts(upserted, CHANGE_FIELDS),
+        "deleted": [row.activity_id for row in deleted],
+    })
+
+@router.get("/babies/{baby_id}/activities/{activity_id}", response_model=ActivityResponse)
+async def get_activity(
+    baby_id: int,
+    activity_id: int,
+    role: str = Depends(get_baby_role),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a specific activity"""
+    activity = await db.scalar(select(Activity).where(
         Activity.id == activity_id,
         Activity.baby_id == baby_id
-    ).first()
+    ))
 
     if not activity:
         raise HTTPException(
@@ -118,25 +344,14 @@ async def update_activity(
     baby_id: int,
     activity_id: int,
     activity_update: ActivityCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    role: str = Depends(get_baby_role),
+    db: AsyncSession = Depends(get_db)
 ):
     """Update an activity"""
-    user_baby = db.query(UserBaby).filter(
-        UserBaby.user_id == current_user.id,
-        UserBaby.baby_id == baby_id
-    ).first()
-
-    if not user_baby:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You don't have access to this baby"
-        )
-
-    activity = db.query(Activity).filter(
+    activity = await db.scalar(select(Activity).where(
         Activity.id == activity_id,
         Activity.baby_id == baby_id
-    ).first()
+    ))
 
     if not activity:
         raise HTTPException(
@@ -144,13 +359,24 @@ async def update_activity(
             detail="Activity not found"
         )
 
+    rollup_deltas = [activity_delta(activity, -1)]
+    removed = [(activity.type, activity.timestamp)]
+
     activity.type = activity_update.type
     activity.timestamp = activity_update.timestamp
     activity.data = activity_update.data
     activity.notes = activity_update.notes
 
-    db.commit()
-    db.refresh(activity)
+    rollup_deltas.append(activity_delta(activity))
+    await record_activity_changes(
+        db, baby_id, rollup_deltas,
+        added=[(activity.type, activity.timestamp)],
+        removed=removed,
+        changed=[activity]
+    )
+    await db.commit()
+    await db.refresh(activity)
+    await event_hub.publish(baby_id, activity_event("updated", [activity.id], activity.version))
 
     return activity
 
@@ -158,25 +384,14 @@ async def update_activity(
 async def delete_activity(
     baby_id: int,
     activity_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    role: str = Depends(get_baby_role),
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete an activity"""
-    user_baby = db.query(UserBaby).filter(
-        UserBaby.user_id == current_user.id,
-        UserBaby.baby_id == baby_id
-    ).first()
-
-    if not user_baby:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You don't have access to this baby"
-        )
-
-    activity = db.query(Activity).filter(
+    activity = await db.scalar(select(Activity).where(
         Activity.id == activity_id,
         Activity.baby_id == baby_id
-    ).first()
+    ))
 
     if not activity:
         raise HTTPException(
@@ -184,7 +399,13 @@ async def delete_activity(
             detail="Activity not found"
         )
 
-    db.delete(activity)
-    db.commit()
+    version = await record_activity_changes(
+        db, baby_id, [activity_delta(activity, -1)],
+        removed=[(activity.type, activity.timestamp)],
+        deleted_ids=[activity.id]
+    )
+    await db.delete(activity)
+    await db.commit()
+    await event_hub.publish(baby_id, activity_event("deleted", [activity_id], version))
 
     return None
\ No newline at end of file
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta, datetime
 import secrets
 from ..database import get_db
@@ -10,17 +11,21 @@ from ..schemas.user import (
     ForgotPasswordRequest, ForgotPasswordResponse,
     ResetPasswordRequest, ResetPasswordResponse
 )
-from ..core.security import verify_password, get_password_hash, create_access_token, get_current_user
+from ..core.security import (
+    hash_password_async, verify_and_update_password, create_access_token, get_current_user,
+    invalidate_user_cache
+)
 from ..core.config import settings
 from ..services.email_service import send_reset_password_email, send_password_changed_confirmation
+from .media import store_upload
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register(user: UserCreate, db: Session = Depends(get_db)):
+async def register(user: UserCreate, db: AsyncSession = Depends(get_db)):
     """Register a new user"""
     # Check if email already exists
-    existing_user = db.query(User).filter(User.email == user.email).first()
+    existing_user = await db.scalar(select(User).where(User.email == user.email))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -28,7 +33,7 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await hash_password_async(user.password)
     db_user = User(
         email=user.email,
         password_hash=hashed_password,
@@ -36,8 +41,8 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
     )
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     
     return db_user
 
@@ -45,21 +50,31 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
 @router.post("/login", response_model=Token)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Login user and return access token"""
-    user = db.query(User).filter(User.email == form_data.username).first()
+    user = await db.scalar(select(User).where(User.email == form_data.username))
+    
+    valid, new_hash = (False, None)
+    if user:
+        valid, new_hash = await verify_and_update_password(form_data.password, user.password_hash)
     
-    if not user or not verify_password(form_data.password, user.password_hash):
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Rehash transparente si cambiaron los parámetros de Argon2
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
+        invalidate_user_cache(user.id)
+    
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data={"sub": user.email, "uid": user.id}, expires_delta=access_token_expires
     )
     
     return {"access_token": access_token, "token_type": "bearer"}
@@ -79,7 +94,7 @@ async def get_current_user_profile(
 async def update_current_user(
     user_update: UserUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update current user profile"""
     # Update name if provided
@@ -88,11 +103,11 @@ async def update_current_user(
     
     # Update profile picture if provided
     if user_update.profile_picture is not None:
-        current_user.profile_picture = user_update.profile_picture
+        current_user.profile_picture = await store_upload(user_update.profile_picture)
     
     # Update email if provided and not already taken
     if user_update.email and user_update.email != current_user.email:
-        existing_user = db.query(User).filter(User.email == user_update.email).first()
+        existing_user = await db.scalar(select(User).where(User.email == user_update.email))
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -100,8 +115,9 @@ async def update_current_user(
             )
         current_user.email = user_update.email
     
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    await db.refresh(current_user)
+    invalidate_user_cache(current_user.id)
     
     return current_user
 
@@ -111,19 +127,24 @@ async def update_current_user(
 async def change_password(
     password_change: PasswordChange,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Change user password"""
+    # get_current_user no carga el hash: se lee solo aquí
+    password_hash = await db.scalar(select(User.password_hash).where(User.id == current_user.id))
+    
     # Verify current password
-    if not verify_password(password_change.current_password, current_user.password_hash):
+    valid, _ = await verify_and_update_password(password_change.current_password, password_hash)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect"
         )
     
     # Update password
-    current_user.password_hash = get_password_hash(password_change.new_password)
-    db.commit()
+    current_user.password_hash = await hash_password_async(password_change.new_password)
+    await db.commit()
+    invalidate_user_cache(current_user.id)
     
     return {"message": "Password changed successfully"}
 
@@ -135,14 +156,14 @@ async def change_password(
 @router.post("/forgot-password", response_model=ForgotPasswordResponse)
 async def forgot_password(
     request: ForgotPasswordRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Endpoint para solicitar recuperación de contraseña.
     Genera un token y envía un email con el link de recuperación.
     """
     # 1. Buscar usuario por email
-    user = db.query(User).filter(User.email == request.email).first()
+    user = await db.scalar(select(User).where(User.email == request.email))
     
     # Por seguridad, siempre devolver el mismo mensaje
     # (no revelar si el email existe o no)
@@ -161,7 +182,7 @@ async def forgot_password(
     # 4. Guardar token y expiración en la base de datos
     user.reset_token = reset_token
     user.reset_token_expiry = expiry_time
-    db.commit()
+    await db.commit()
     
     # 5. Enviar email
     try:
@@ -184,13 +205,13 @@ async def forgot_password(
 @router.post("/reset-password", response_model=ResetPasswordResponse)
 async def reset_password(
     request: ResetPasswordRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Endpoint para restablecer la contraseña usando el token recibido por email.
     """
     # 1. Buscar usuario por token
-    user = db.query(User).filter(User.reset_token == request.token).first()
+    user = await db.scalar(select(User).where(User.reset_token == request.token))
     
     if not user:
         raise HTTPException(
@@ -203,7 +224,7 @@ async def reset_password(
         # Limpiar token expirado
         user.reset_token = None
         user.reset_token_expiry = None
-        db.commit()
+        await db.commit()
         
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -218,13 +239,14 @@ async def reset_password(
         )
     
     # 4. Actualizar contraseña
-    user.password_hash = get_password_hash(request.new_password)
+    user.password_hash = await hash_password_async(request.new_password)
     
     # 5. Limpiar token (ya fue usado)
     user.reset_token = None
     user.reset_token_expiry = None
     
-    db.commit()
+    await db.commit()
+    invalidate_user_cache(user.id)
     
     # 6. Enviar email de confirmación
     try:
@@ -1,35 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from ..database import get_db
 from ..models.user import User
 from ..models.baby import Baby
 from ..models.user_baby import UserBaby
-from ..models.activity import Activity
-from ..schemas.baby import BabyCreate, BabyResponse
+from ..schemas.baby import BabyCreate, BabyDashboardEntry, BabyResponse
 from ..core.security import get_current_user
-from ..services.pdf_generator import generate_pediatric_report
+from ..core.permissions import get_baby_role, get_user_baby_roles
+from ..core.http_cache import etag_matches, not_modified
+from ..core.projection import dump_sparse, load_response_columns, parse_fields
+from ..core.responses import trusted_json_response
+from ..services.dashboard_service import load_dashboard
+from ..services.event_hub import event_hub
+from ..services.model_store import model_store
+from ..services.report_jobs import current_report_key, report_jobs
+from .media import store_upload
+from .reports import get_baby_or_404, report_etag, report_file_response
 
 router = APIRouter(prefix="/babies", tags=["babies"])
 
+# Campos calculados de BabyResponse -> columnas de las que salen
+BABY_FIELD_SOURCES = {"photo_thumbnail": ("photo",)}
+
 @router.post("", response_model=BabyResponse, status_code=status.HTTP_201_CREATED)
 async def create_baby(
     baby: BabyCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new baby"""
     db_baby = Baby(
         name=baby.name,
         birth_date=baby.birth_date,
-        photo=baby.photo  # Ahora sí existe en BabyCreate
+        photo=await store_upload(baby.photo)
     )
     
     db.add(db_baby)
-    db.commit()
-    db.refresh(db_baby)
+    await db.commit()
+    await db.refresh(db_baby)
     
     # Associate baby with current user
     user_baby = UserBaby(
@@ -38,41 +48,45 @@ async def create_baby(
         role="owner"
     )
     db.add(user_baby)
-    db.commit()
+    await db.commit()
+    await event_hub.publish_access_change([current_user.id])
     
     return db_baby
 @router.get("", response_model=List[BabyResponse])
 async def get_my_babies(
+    fields: Optional[str] = Query(None, description="Comma separated subset of the response fields"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get all babies associated with current user"""
-    user_babies = db.query(UserBaby).filter(UserBaby.user_id == current_user.id).all()
-    baby_ids = [ub.baby_id for ub in user_babies]
-    babies = db.query(Baby).filter(Baby.id.in_(baby_ids)).all()
-    
+    """Get all babies associated with current user (``fields=id,name`` returns only those fields)"""
+    sparse = parse_fields(fields, BabyResponse)
+    baby_ids = list(await get_user_baby_roles(current_user.id, db))
+    babies = (await db.scalars(
+        select(Baby)
+        .where(Baby.id.in_(baby_ids))
+        .options(load_response_columns(Baby, BabyResponse, sparse, BABY_FIELD_SOURCES))
+    )).all()
+    
+    if sparse is not None:
+        return trusted_json_response([dump_sparse(BabyResponse, baby, sparse) for baby in babies])
     return babies
 
+@router.get("/dashboard", response_model=List[BabyDashboardEntry])
+async def get_dashboard(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Home screen data in one request: each baby with the caller's role, caregiver count and latest activity per type"""
+    return await load_dashboard(db, current_user.id)
+
 @router.get("/{baby_id}", response_model=BabyResponse)
 async def get_baby(
     baby_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    role: str = Depends(get_baby_role),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get a specific baby"""
-    # Check if user has access to this baby
-    user_baby = db.query(UserBaby).filter(
-        UserBaby.user_id == current_user.id,
-        UserBaby.baby_id == baby_id
-    ).first()
-    
-    if not user_baby:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You don't have access to this baby"
-        )
-    
-    baby = db.query(Baby).filter(Baby.id == baby_id).first()
+    baby = await db.scalar(select(Baby).where(Baby.id == baby_id))
     if not baby:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -85,23 +99,11 @@ async def get_baby(
 async def update_baby(
     baby_id: int,
     baby_update: BabyCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    role: str = Depends(get_baby_role),
+    db: AsyncSession = Depends(get_db)
 ):
     """Update a baby's information"""
-    # Check if user has access
-    user_baby = db.query(UserBaby).filter(
-        UserBaby.user_id == current_user.id,
-        UserBaby.baby_id == baby_id
-    ).first()
-    
-    if not user_baby:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You don't have access to this baby"
-        )
-    
-    baby = db.query(Baby).filter(Baby.id == baby_id).first()
+    baby = await db.scalar(select(Baby).where(Baby.id == baby_id))
     if not baby:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -111,130 +113,68 @@ async def update_baby(
     baby.name = baby_update.name
     baby.birth_date = baby_update.birth_date
     if baby_update.photo:
-        baby.photo = baby_update.photo
+        baby.photo = await store_upload(baby_update.photo)
     
-    db.commit()
-    db.refresh(baby)
+    await db.commit()
+    await db.refresh(baby)
     
     return baby
 
 @router.delete("/{baby_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_baby(
     baby_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    role: str = Depends(get_baby_role),
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete a baby"""
-    user_baby = db.query(UserBaby).filter(
-        UserBaby.user_id == current_user.id,
-        UserBaby.baby_id == baby_id,
-        UserBaby.role == "owner"
-    ).first()
-    
-    if not user_baby:
+    if role != "owner":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only the owner can delete a baby"
         )
     
-    baby = db.query(Baby).filter(Baby.id == baby_id).first()
+    baby = await db.scalar(select(Baby).where(Baby.id == baby_id))
     if not baby:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Baby not found"
         )
     
-    db.delete(baby)
-    db.commit()
+    member_ids = (await db.scalars(select(UserBaby.user_id).where(UserBaby.baby_id == baby_id))).all()
+    
+    await db.delete(baby)
+    await db.commit()
+    await event_hub.publish_access_change(member_ids)
+    model_store.remove_baby(baby_id)
+    report_jobs.remove_baby(baby_id)
     
     return None
 
 @router.get("/{baby_id}/report")
 async def generate_baby_report(
+    request: Request,
     baby_id: int,
-    days: int = 30,
+    days: int = Query(30, ge=1, le=366),
     token: str = None,  # Token opcional por URL
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Generate PDF report for baby"""
-    # Check access
-    user_baby = db.query(UserBaby).filter(
-        UserBaby.user_id == current_user.id,
-        UserBaby.baby_id == baby_id
-    ).first()
-    
-    if not user_baby:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You don't have access to this baby"
-        )
-    
-    # Get baby
-    baby = db.query(Baby).filter(Baby.id == baby_id).first()
-    if not baby:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Baby not found"
-        )
-    
-    # Get activities
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=days)
-    
-    activities = db.query(Activity).filter(
-        Activity.baby_id == baby_id,
-        Activity.timestamp >= start_date,
-        Activity.timestamp <= end_date
-    ).order_by(Activity.timestamp.desc()).all()
-    
-    # Generate PDF
-    pdf_buffer = generate_pediatric_report(baby, activities, start_date, end_date)
-    
-    # Return PDF
-    filename = f"informe_{baby.name}_{datetime.now().strftime('%Y%m%d')}.pdf"
-    
-    return StreamingResponse(
-        pdf_buffer,
-        media_type="application/pdf",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
-    )
-@router.put("/{baby_id}", response_model=BabyResponse)
-async def update_baby(
-    baby_id: int,
-    baby: BabyCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    role: str = Depends(get_baby_role),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Update a baby"""
-    # Check if user has access to this baby
-    user_baby = db.query(UserBaby).filter(
-        UserBaby.user_id == current_user.id,
-        UserBaby.baby_id == baby_id
-    ).first()
-    
-    if not user_baby:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You don't have access to this baby"
-        )
+    """Generate PDF report for baby (repeated downloads come from the report store)"""
+    baby = await get_baby_or_404(db, baby_id)
+    # Mismo informe que el que ya tiene el cliente: 304 sin cargar actividades ni tocar el PDF
+    etag = report_etag(current_report_key(baby, days))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    job = await report_jobs.submit(db, baby, days)
+    # La sesión ya no hace falta: no se retiene su conexión mientras se genera el PDF
+    await db.close()
     
-    # Get baby
-    db_baby = db.query(Baby).filter(Baby.id == baby_id).first()
-    if not db_baby:
+    await report_jobs.wait(job["id"])
+    if job["status"] != "done":
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Baby not found"
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Could not generate the report"
         )
     
-    # Update baby
-    db_baby.name = baby.name
-    db_baby.birth_date = baby.birth_date
-    if baby.photo is not None:
-        db_baby.photo = baby.photo
-    db_baby.updated_at = datetime.now(timezone.utc)
-    
-    db.commit()
-    db.refresh(db_baby)
-    
-    return db_baby
\ No newline at end of file
+    return report_file_response(baby, job["id"])
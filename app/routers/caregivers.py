@@ -1,39 +1,30 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from ..database import get_db
 from ..models.user import User
 from ..models.baby import Baby
 from ..models.user_baby import UserBaby
 from ..core.security import get_current_user
+from ..core.permissions import get_baby_role
+from ..services.event_hub import event_hub
 
 router = APIRouter(prefix="/babies/{baby_id}/caregivers", tags=["caregivers"])
 
 @router.get("")
 async def get_baby_caregivers(
     baby_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    role: str = Depends(get_baby_role),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get all caregivers for a baby"""
-    # Check if user has access to this baby
-    user_baby = db.query(UserBaby).filter(
-        UserBaby.user_id == current_user.id,
-        UserBaby.baby_id == baby_id
-    ).first()
-    
-    if not user_baby:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You don't have access to this baby"
-        )
-    
     # Get all caregivers
-    caregivers = db.query(UserBaby, User).join(
+    caregivers = (await db.execute(select(UserBaby, User).join(
         User, UserBaby.user_id == User.id
-    ).filter(
+    ).where(
         UserBaby.baby_id == baby_id
-    ).all()
+    ))).all()
     
     result = []
     for user_baby, user in caregivers:
@@ -51,18 +42,12 @@ async def get_baby_caregivers(
 async def add_caregiver(
     baby_id: int,
     caregiver_data: dict,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    caller_role: str = Depends(get_baby_role),
+    db: AsyncSession = Depends(get_db)
 ):
     """Add a new caregiver to a baby (only owner can do this)"""
     # Check if user is owner
-    user_baby = db.query(UserBaby).filter(
-        UserBaby.user_id == current_user.id,
-        UserBaby.baby_id == baby_id,
-        UserBaby.role == "owner"
-    ).first()
-    
-    if not user_baby:
+    if caller_role != "owner":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only the owner can add caregivers"
@@ -72,7 +57,7 @@ async def add_caregiver(
     caregiver_email = caregiver_data.get("email")
     role = caregiver_data.get("role", "caregiver")
     
-    caregiver = db.query(User).filter(User.email == caregiver_email).first()
+    caregiver = await db.scalar(select(User).where(User.email == caregiver_email))
     
     if not caregiver:
         raise HTTPException(
@@ -81,10 +66,10 @@ async def add_caregiver(
         )
     
     # Check if already a caregiver
-    existing = db.query(UserBaby).filter(
+    existing = await db.scalar(select(UserBaby).where(
         UserBaby.user_id == caregiver.id,
         UserBaby.baby_id == baby_id
-    ).first()
+    ))
     
     if existing:
         raise HTTPException(
@@ -100,7 +85,8 @@ async def add_caregiver(
     )
     
     db.add(new_user_baby)
-    db.commit()
+    await db.commit()
+    await event_hub.publish_access_change([caregiver.id])
     
     return {
         "id": caregiver.id,
@@ -114,18 +100,13 @@ async def add_caregiver(
 async def remove_caregiver(
     baby_id: int,
     caregiver_id: int,
+    caller_role: str = Depends(get_baby_role),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Remove a caregiver from a baby (only owner can do this)"""
     # Check if user is owner
-    user_baby = db.query(UserBaby).filter(
-        UserBaby.user_id == current_user.id,
-        UserBaby.baby_id == baby_id,
-        UserBaby.role == "owner"
-    ).first()
-    
-    if not user_baby:
+    if caller_role != "owner":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only the owner can remove caregivers"
@@ -139,10 +120,10 @@ async def remove_caregiver(
         )
     
     # Find and delete the caregiver relationship
-    caregiver_relation = db.query(UserBaby).filter(
+    caregiver_relation = await db.scalar(select(UserBaby).where(
         UserBaby.user_id == caregiver_id,
         UserBaby.baby_id == baby_id
-    ).first()
+    ))
     
     if not caregiver_relation:
         raise HTTPException(
@@ -150,7 +131,8 @@ async def remove_caregiver(
             detail="Caregiver not found"
         )
     
-    db.delete(caregiver_relation)
-    db.commit()
+    await db.delete(caregiver_relation)
+    await db.commit()
+    await event_hub.publish_access_change([caregiver_id])
     
     return None
\ No newline at end of file
@@ -0,0 +1,77 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
+import json
+import time
+from ..database import get_db, SessionLocal
+from ..models.user import User
+from ..core.config import settings
+from ..core.permissions import get_baby_role, lookup_baby_role
+from ..core.security import get_current_user
+from ..services.event_hub import ACCESS_CHECK, event_hub
+
+router = APIRouter(prefix="/babies/{baby_id}/events", tags=["events"])
+
+# Último evento de un stream cuyo usuario ya no tiene acceso al bebé (el cliente no debe reconectar)
+ACCESS_REVOKED_EVENT = json.dumps({"type": "access.revoked"})
+
+
+async def _still_has_access(user_id: int, baby_id: int) -> bool:
+    async with SessionLocal() as session:
+        return await lookup_baby_role(session, user_id, baby_id) is not None
+
+
+@router.get("")
+async def stream_baby_events(
+    baby_id: int,
+    role: str = Depends(get_baby_role),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Server-Sent Events stream of activity changes made by any caregiver of the baby.
+
+    Each event carries the ``sync_token`` of the change; clients call
+    ``/activities/changes?since=...`` to fetch it (also after a ``resync``
+    event or a reconnect). Accepts the token as ``?token=`` for EventSource.
+    The stream ends with an ``access.revoked`` event if the caller is
+    removed as a caregiver.
+    """
+    # La sesión solo se usa para comprobar permisos: se libera su conexión antes de quedarse escuchando
+    await db.close()
+    user_id = current_user.id
+
+    async def stream():
+        queue = event_hub.subscribe(baby_id, user_id)
+        # Además del aviso del hub, el acceso se comprueba cada ACCESS_CACHE_TTL_SECONDS
+        # por si se perdió (NOTIFY de otro worker con el listener reconectando)
+        recheck_at = time.monotonic() + settings.ACCESS_CACHE_TTL_SECONDS
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), settings.EVENTS_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    message = None
+
+                if message is ACCESS_CHECK or time.monotonic() >= recheck_at:
+                    recheck_at = time.monotonic() + settings.ACCESS_CACHE_TTL_SECONDS
+                    if not await _still_has_access(user_id, baby_id):
+                        yield f"data: {ACCESS_REVOKED_EVENT}\n\n"
+                        return
+                    if message is ACCESS_CHECK:
+                        continue
+
+                if message is None:
+                    # Comentario SSE: mantiene viva la conexión a través de proxies
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"data: {message}\n\n"
+        finally:
+            event_hub.unsubscribe(baby_id, user_id, queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,35 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..database import get_db
-from ..models.user import User
-from ..models.user_baby import UserBaby
-from ..core.security import get_current_user
+from ..core.http_cache import etag_matches, not_modified, revalidate_headers, version_etag
+from ..core.permissions import get_baby_role
+from ..core.responses import DefaultJSONResponse
 from ..services.insights_service import InsightsService
 
 router = APIRouter(prefix="/babies/{baby_id}/insights", tags=["insights"])
 
 @router.get("")
 async def get_baby_insights(
+    request: Request,
     baby_id: int,
     days: int = 14,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    role: str = Depends(get_baby_role),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get insights and recommendations for a baby"""
-    # Check if user has access to this baby
-    user_baby = db.query(UserBaby).filter(
-        UserBaby.user_id == current_user.id,
-        UserBaby.baby_id == baby_id
-    ).first()
-    
-    if not user_baby:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You don't have access to this baby"
-        )
-    
-    # Generate insights
+    """Get insights and recommendations for a baby (If-None-Match answers 304 while they are unchanged)"""
     insights_service = InsightsService(db)
-    insights = insights_service.generate_insights(baby_id, days)
-    
-    return insights
\ No newline at end of file
+    # Sin escrituras nuevas ni cambio de tramo el cliente ya tiene la respuesta: 304 sin calcular nada
+    key = await insights_service.insights_key(baby_id, days, datetime.now(timezone.utc))
+    etag = version_etag("insights", key.cache_key, key.bucket)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    # Generate insights
+    insights = await insights_service.generate_insights(baby_id, days, key)
+
+    return DefaultJSONResponse(insights, headers=revalidate_headers(etag))
@@ -0,0 +1,50 @@
+from fastapi import APIRouter, HTTPException, Path, Request, Response, status
+from fastapi.responses import FileResponse
+from typing import Optional
+from ..core.http_cache import etag_matches
+from ..core.media_urls import MEDIA_NAME_PATTERN
+from ..services.media_store import MEDIA_TYPES, InvalidImage, media_store
+
+router = APIRouter(prefix="/media", tags=["media"])
+
+# El nombre depende del contenido: la misma URL nunca cambia de imagen. "private": solo la
+# guarda el navegador o la app, nunca una caché compartida (la URL es la credencial)
+MEDIA_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+
+async def store_upload(value: Optional[str]) -> Optional[str]:
+    """Store an uploaded photo and return the media name to keep in the row"""
+    try:
+        return await media_store.ingest(value)
+    except InvalidImage as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(exc)
+        )
+
+
+@router.get("/{name}")
+async def get_media(
+    request: Request,
+    name: str = Path(..., pattern=MEDIA_NAME_PATTERN)
+):
+    """Stored photo or thumbnail, without authentication: the URL is a capability.
+
+    Media names are a 128-bit HMAC of the content keyed with SECRET_KEY, so
+    they cannot be guessed or derived from the image, and the API only hands
+    them to users with access to the baby. Anyone holding the URL can fetch
+    the image, though, and a URL that leaked stays valid: replacing the photo
+    changes the URL but does not delete the old file (other rows may share it).
+    """
+    etag = f'"{name}"'
+    headers = {"ETag": etag, "Cache-Control": MEDIA_CACHE_CONTROL}
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    path = media_store.path(name)
+    if not path.exists():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Image not found"
+        )
+    return FileResponse(path, media_type=MEDIA_TYPES[name.rsplit(".", 1)[1]], headers=headers)
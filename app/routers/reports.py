@@ -0,0 +1,98 @@
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response, status
+from fastapi.responses import FileResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from ..database import get_db
+from ..models.baby import Baby
+from ..core.http_cache import etag_matches, not_modified, revalidate_headers
+from ..core.permissions import get_baby_role
+from ..services.report_jobs import report_jobs
+
+router = APIRouter(prefix="/babies/{baby_id}/reports", tags=["reports"])
+
+JOB_ID = Path(..., pattern="^[0-9a-f]{32}$")
+
+
+async def get_baby_or_404(db: AsyncSession, baby_id: int) -> Baby:
+    baby = await db.scalar(select(Baby).where(Baby.id == baby_id))
+    if not baby:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Baby not found"
+        )
+    return baby
+
+
+def report_etag(job_id: str) -> str:
+    # La clave del informe ya fija su contenido (bebé, rango, versión de datos y de plantilla)
+    return f'"{job_id}"'
+
+
+def report_file_response(baby: Baby, job_id: str) -> FileResponse:
+    """Stored PDF as a download (FileResponse streams it from disk with Content-Length)"""
+    path = report_jobs.artifact_path(baby.id, job_id)
+    if not path.exists():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report not found"
+        )
+    filename = f"informe_{baby.name}_{datetime.now().strftime('%Y%m%d')}.pdf"
+    return FileResponse(path, media_type="application/pdf", filename=filename, headers=revalidate_headers(report_etag(job_id)))
+
+
+def job_response(job: dict) -> dict:
+    return {**job, "download_url": f"/babies/{job['baby_id']}/reports/{job['id']}/download"}
+
+
+@router.post("", status_code=status.HTTP_202_ACCEPTED)
+async def create_report_job(
+    baby_id: int,
+    response: Response,
+    days: int = Query(30, ge=1, le=366),
+    role: str = Depends(get_baby_role),
+    db: AsyncSession = Depends(get_db)
+):
+    """Request a PDF report; poll the returned job until its status is done, then download it"""
+    baby = await get_baby_or_404(db, baby_id)
+    job = await report_jobs.submit(db, baby, days)
+    if job["status"] == "done":
+        response.status_code = status.HTTP_200_OK
+    return job_response(job)
+
+
+@router.get("/{job_id}")
+async def get_report_job(
+    baby_id: int,
+    job_id: str = JOB_ID,
+    role: str = Depends(get_baby_role)
+):
+    """Status of a report job"""
+    job = report_jobs.get(baby_id, job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report job not found"
+        )
+    return job_response(job)
+
+
+@router.get("/{job_id}/download")
+async def download_report(
+    request: Request,
+    baby_id: int,
+    job_id: str = JOB_ID,
+    role: str = Depends(get_baby_role),
+    db: AsyncSession = Depends(get_db)
+):
+    """Download a finished report"""
+    if etag_matches(request, report_etag(job_id)):
+        return not_modified(report_etag(job_id))
+    job = report_jobs.get(baby_id, job_id)
+    if job is not None and job["status"] != "done":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Report is {job['status']}"
+        )
+    baby = await get_baby_or_404(db, baby_id)
+    return report_file_response(baby, job_id)
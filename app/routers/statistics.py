@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_db
+from ..core.permissions import get_baby_role
+from ..services.statistics_service import StatisticsService
+
+router = APIRouter(prefix="/babies/{baby_id}/statistics", tags=["statistics"])
+
+@router.get("")
+async def get_baby_statistics(
+    baby_id: int,
+    days: int = Query(7, ge=1, le=366),
+    role: str = Depends(get_baby_role),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get per-day activity statistics for charts"""
+    statistics_service = StatisticsService(db)
+    return await statistics_service.get_statistics(baby_id, days)
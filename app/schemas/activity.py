@@ -1,6 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Literal
+from ..database import to_naive_utc
 
 class ActivityCreate(BaseModel):
     type: str
@@ -8,6 +9,17 @@ class ActivityCreate(BaseModel):
     data: Optional[Dict[str, Any]] = None
     notes: Optional[str] = None
 
+    @field_validator('timestamp')
+    @classmethod
+    def normalize_timestamp(cls, dt: datetime) -> datetime:
+        return to_naive_utc(dt)
+
+class ActivityBatchItem(ActivityCreate):
+    idempotency_key: Optional[str] = Field(None, max_length=128)
+
+class ActivityBatchCreate(BaseModel):
+    items: List[ActivityBatchItem] = Field(..., min_length=1, max_length=500)
+
 class ActivityResponse(BaseModel):
     id: int
     baby_id: int
@@ -19,4 +31,25 @@ class ActivityResponse(BaseModel):
     created_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ActivityBatchResult(BaseModel):
+    index: int
+    status: Literal["created", "duplicate"]
+    activity: ActivityResponse
+
+class ActivityBatchResponse(BaseModel):
+    created: int
+    duplicates: int
+    results: List[ActivityBatchResult]
+
+class ActivityChange(ActivityResponse):
+    updated_at: Optional[datetime]
+    version: int
+
+class ActivityChangesResponse(BaseModel):
+    # Token a enviar como ``since`` en la siguiente petición
+    sync_token: int
+    has_more: bool
+    upserted: List[ActivityChange]
+    deleted: List[int]
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, field_serializer
+from pydantic import BaseModel, computed_field, field_serializer
 from datetime import date, datetime
-from typing import Optional
+from typing import Any, Dict, Optional
+from ..core.media_urls import media_url, thumbnail_url
 
 class BabyCreate(BaseModel):
     name: str
@@ -15,9 +16,27 @@ class BabyResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    @field_serializer('created_at', 'updated_at')
-    def serialize_datetime(self, dt: datetime, _info):
-        return dt.isoformat()
+    # La foto se guarda en el media store: se devuelven URLs, no el base64
+    @field_serializer('photo')
+    def serialize_photo(self, photo: Optional[str], _info):
+        return media_url(photo)
+
+    @computed_field
+    @property
+    def photo_thumbnail(self) -> Optional[str]:
+        return thumbnail_url(self.photo)
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class LatestActivity(BaseModel):
+    id: int
+    type: str
+    timestamp: datetime
+    data: Optional[Dict[str, Any]] = None
+
+class BabyDashboardEntry(BabyResponse):
+    role: Optional[str] = None
+    caregiver_count: int
+    # Última actividad de cada tipo registrado (feeding, sleep, ...)
+    latest_activities: Dict[str, LatestActivity]
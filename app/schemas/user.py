@@ -1,6 +1,7 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, computed_field, field_serializer
 from datetime import datetime
 from typing import Optional
+from ..core.media_urls import media_url, thumbnail_url
 
 class UserCreate(BaseModel):
     email: EmailStr
@@ -14,6 +15,15 @@ class UserResponse(BaseModel):
     profile_picture: Optional[str] = None
     created_at: datetime
 
+    @field_serializer('profile_picture')
+    def serialize_profile_picture(self, profile_picture: Optional[str], _info):
+        return media_url(profile_picture)
+
+    @computed_field
+    @property
+    def profile_picture_thumbnail(self) -> Optional[str]:
+        return thumbnail_url(self.profile_picture)
+
     class Config:
         from_attributes = True
 
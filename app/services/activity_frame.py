@@ -0,0 +1,137 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Iterable, Optional, Tuple
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import to_naive_utc
+from ..models.activity import Activity
+from .rollup_service import DailyStats, empty_day
+
+# Códigos de tipo (columna type_code); cualquier otro tipo queda como -1
+TYPE_CODES = {"feeding": 0, "sleep": 1, "diaper": 2, "health": 3, "medical": 4}
+DIAPER_KINDS = {"wet": 1, "dirty": 2}
+
+US_PER_HOUR = 3_600_000_000
+US_PER_DAY = 24 * US_PER_HOUR
+EPOCH = datetime(1970, 1, 1)
+EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+EPOCH_DATE = date(1970, 1, 1)
+ONE_US = timedelta(microseconds=1)
+
+
+def _number(value: Any) -> float:
+    """Numeric JSON value or NaN (missing, strings, booleans and nulls)"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return np.nan
+
+
+def to_us(dt: datetime) -> int:
+    """Microseconds since the epoch for a naive-UTC (or aware) datetime"""
+    return (to_naive_utc(dt) - EPOCH) // ONE_US
+
+
+def to_datetime(us: int) -> datetime:
+    """Aware UTC datetime for a microsecond epoch value"""
+    return EPOCH_UTC + timedelta(microseconds=int(us))
+
+
+def now_us() -> int:
+    return to_us(datetime.now(timezone.utc))
+
+
+class ActivityFrame:
+    """Chronologically sorted, columnar view of activities shared by every analysis"""
+
+    def __init__(self, ts_us, type_code, quantity_ml, duration_hours, has_data, diaper_kind):
+        self.ts_us = np.asarray(ts_us, dtype=np.int64)
+        self.type_code = np.asarray(type_code, dtype=np.int8)
+        self.quantity_ml = np.asarray(quantity_ml, dtype=np.float64)
+        self.duration_hours = np.asarray(duration_hours, dtype=np.float64)
+        self.has_data = np.asarray(has_data, dtype=bool)
+        self.diaper_kind = np.asarray(diaper_kind, dtype=np.int8)
+        # 1970-01-01 fue jueves (weekday 3)
+        days = self.ts_us // US_PER_DAY
+        self.hour = (self.ts_us // US_PER_HOUR) % 24
+        self.weekday = (days + 3) % 7
+
+    def __len__(self) -> int:
+        return len(self.ts_us)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[datetime, str, Optional[dict]]]) -> "ActivityFrame":
+        """Build the frame from (timestamp, type, data) tuples, already sorted by timestamp"""
+        rows = list(rows)
+        # Se rellenan listas de Python y se convierten al final: asignar elemento a elemento en numpy es lento
+        ts_us = [to_us(row[0]) for row in rows]
+        type_code = [TYPE_CODES.get(row[1], -1) for row in rows]
+        quantity_ml = []
+        duration_hours = []
+        has_data = []
+        diaper_kind = []
+
+        for row in rows:
+            data = row[2] or {}
+            has_data.append(bool(data))
+            quantity_ml.append(_number(data.get("quantity_ml")))
+            duration_hours.append(_number(data.get("duration_hours")))
+            kind = data.get("type")
+            diaper_kind.append(DIAPER_KINDS.get(kind, 0) if isinstance(kind, str) else 0)
+
+        return cls(ts_us, type_code, quantity_ml, duration_hours, has_data, diaper_kind)
+
+    @classmethod
+    def from_activities(cls, activities: Iterable[Activity]) -> "ActivityFrame":
+        ordered = sorted(activities, key=lambda a: a.timestamp)
+        return cls.from_rows((a.timestamp, a.type, a.data) for a in ordered)
+
+    def of_type(self, activity_type: str) -> np.ndarray:
+        """Boolean mask for one activity type"""
+        return self.type_code == TYPE_CODES[activity_type]
+
+    def daily_stats(self) -> DailyStats:
+        """Same {day: {...}} structure as the rollup, computed from the columns"""
+        if not len(self):
+            return {}
+
+        day_index = self.ts_us // US_PER_DAY
+        days, inverse = np.unique(day_index, return_inverse=True)
+        size = len(days)
+        feeding = self.of_type("feeding")
+        sleep = self.of_type("sleep")
+        health = self.of_type("health") | self.of_type("medical")
+
+        def count(mask):
+            return np.bincount(inverse, weights=mask.astype(np.float64), minlength=size)
+
+        def total(mask, values):
+            return np.bincount(inverse, weights=np.where(mask, np.nan_to_num(values), 0.0), minlength=size)
+
+        columns = {
+            "total_activities": np.bincount(inverse, minlength=size),
+            "feeding_count": count(feeding),
+            "feeding_ml": total(feeding, self.quantity_ml),
+            "sleep_count": count(sleep),
+            "sleep_hours": total(sleep, self.duration_hours),
+            "diaper_count": count(self.of_type("diaper")),
+            "health_count": count(health),
+        }
+
+        daily: DailyStats = {}
+        for i, day in enumerate(days):
+            values = empty_day()
+            for field, column in columns.items():
+                value = column[i].item()
+                values[field] = int(value) if field.endswith("_count") or field == "total_activities" else value
+            daily[EPOCH_DATE + timedelta(days=int(day))] = values
+        return daily
+
+
+async def load_activity_frame(db: AsyncSession, baby_id: int, start_date: datetime, end_date: datetime) -> ActivityFrame:
+    """Project only timestamp/type/data for the window (no ORM objects) into a frame"""
+    rows = (await db.execute(select(Activity.timestamp, Activity.type, Activity.data).where(
+        Activity.baby_id == baby_id,
+        Activity.timestamp >= to_naive_utc(start_date),
+        Activity.timestamp <= to_naive_utc(end_date)
+    ).order_by(Activity.timestamp, Activity.id))).all()
+    return ActivityFrame.from_rows(rows)
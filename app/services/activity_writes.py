@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models.activity import Activity
+from ..models.activity_tombstone import ActivityTombstone
+from ..models.baby import Baby
+from .rollup_service import apply_rollup_deltas
+from .interval_service import ActivityEvent, apply_interval_changes
+
+
+async def bump_data_version(db: AsyncSession, baby_id: int) -> int:
+    """Increment the baby's data version inside the current transaction"""
+    return await db.scalar(
+        update(Baby)
+        .where(Baby.id == baby_id)
+        .values(data_version=Baby.data_version + 1, updated_at=Baby.updated_at)
+        .returning(Baby.data_version)
+    )
+
+
+async def lock_data_version(db: AsyncSession, baby_id: int) -> int:
+    """Lock the baby row (SELECT ... FOR UPDATE) and return its current data version"""
+    return await db.scalar(select(Baby.data_version).where(Baby.id == baby_id).with_for_update()) or 0
+
+
+async def get_data_version(db: AsyncSession, baby_id: int) -> int:
+    """Current data version of a baby (changes on every activity write)"""
+    return await db.scalar(select(Baby.data_version).where(Baby.id == baby_id)) or 0
+
+
+async def record_activity_changes(
+    db: AsyncSession,
+    baby_id: int,
+    rollup_deltas: Iterable[Dict[str, Any]],
+    added: Iterable[ActivityEvent] = (),
+    removed: Iterable[ActivityEvent] = (),
+    changed: Iterable[Activity] = (),
+    deleted_ids: Iterable[int] = ()
+) -> int:
+    """Side effects shared by every activity write, applied before commit.
+
+    ``added``/``removed`` are the (type, timestamp) of the activities created
+    or deleted (an update is both). ``changed`` (created or updated rows) are
+    stamped with the new data version and ``deleted_ids`` get a tombstone, so
+    the change feed can return them. Returns the new data version of the
+    baby.
+    """
+    # La fila del bebé se bloquea antes que rollups y estimadores: mismo orden en todas las
+    # escrituras (lotes incluidos), sin interbloqueos entre ellas en Postgres
+    version = await bump_data_version(db, baby_id)
+    await apply_rollup_deltas(db, rollup_deltas)
+    await apply_interval_changes(db, baby_id, added, removed)
+
+    for activity in changed:
+        activity.version = version
+
+    tombstones = [{"activity_id": activity_id, "baby_id": baby_id, "version": version} for activity_id in deleted_ids]
+    if tombstones:
+        dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+        stmt = dialect.insert(ActivityTombstone).values(tombstones)
+        # Un id reutilizado (SQLite) que se vuelve a borrar actualiza su lápida
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["activity_id"],
+            set_={"baby_id": stmt.excluded.baby_id, "version": stmt.excluded.version, "deleted_at": stmt.excluded.deleted_at},
+        )
+        await db.execute(stmt)
+    return version
+
+
+async def prune_tombstones(db: AsyncSession, retention_days: int) -> int:
+    """Delete tombstones older than ``retention_days``; returns how many were removed.
+
+    Each baby remembers the highest pruned version: the change feed answers
+    410 to a ``since`` below it, since those deletions can no longer be sent.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    horizons = (await db.execute(
+        select(ActivityTombstone.baby_id, func.max(ActivityTombstone.version))
+        .where(or_(ActivityTombstone.deleted_at < cutoff, ActivityTombstone.deleted_at.is_(None)))
+        .group_by(ActivityTombstone.baby_id)
+    )).all()
+
+    removed = 0
+    for baby_id, version in horizons:
+        await db.execute(
+            update(Baby)
+            .where(Baby.id == baby_id, Baby.tombstones_pruned_version < version)
+            .values(tombstones_pruned_version=version, updated_at=Baby.updated_at)
+        )
+        # Por versión y no por fecha: todo lo anterior al horizonte desaparece a la vez
+        result = await db.execute(delete(ActivityTombstone).where(
+            ActivityTombstone.baby_id == baby_id,
+            ActivityTombstone.version <= version
+        ))
+        removed += result.rowcount
+        await db.commit()
+    return removed
@@ -0,0 +1,92 @@
+from typing import Any, Dict, List
+from sqlalchemy import func, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models.activity import Activity
+from ..models.baby import Baby
+from ..models.daily_activity_stats import DailyActivityStats
+from ..models.user_baby import UserBaby
+
+BABY_COLUMNS = (Baby.id, Baby.name, Baby.birth_date, Baby.photo, Baby.created_at, Baby.updated_at)
+
+
+def _latest_activities(dialect_name: str, baby_ids):
+    """Most recent activity of each type for the given babies, as a subquery"""
+    # Los tipos con actividades de cada bebé salen de la tabla de rollups (una fila por día y
+    # tipo), no de recorrer todas las actividades
+    pairs = (
+        select(DailyActivityStats.baby_id, DailyActivityStats.type)
+        .where(DailyActivityStats.baby_id.in_(baby_ids))
+        .distinct()
+        .subquery("pairs")
+    )
+    # Por cada (bebé, tipo) un LIMIT 1 que recorre ix_activities_baby_id_type_timestamp hacia
+    # atrás desde el final: no se leen ni ordenan las demás actividades
+    newest_first = (Activity.timestamp.desc(), Activity.id.desc())
+    columns = (Activity.id, Activity.baby_id, Activity.type, Activity.timestamp, Activity.data)
+    if dialect_name == "postgresql":
+        newest = (
+            select(*columns)
+            .where(Activity.baby_id == pairs.c.baby_id, Activity.type == pairs.c.type)
+            .order_by(*newest_first)
+            .limit(1)
+            .lateral("newest")
+        )
+        return select(*newest.c).select_from(pairs).join(newest, true()).subquery("latest")
+    # Sin LATERAL (SQLite): el id de la última actividad como subconsulta correlacionada
+    latest_id = (
+        select(Activity.id)
+        .where(Activity.baby_id == pairs.c.baby_id, Activity.type == pairs.c.type)
+        .order_by(*newest_first)
+        .limit(1)
+        .correlate(pairs)
+        .scalar_subquery()
+    )
+    return select(*columns).select_from(pairs).join(Activity, Activity.id == latest_id).subquery("latest")
+
+
+async def load_dashboard(db: AsyncSession, user_id: int) -> List[Dict[str, Any]]:
+    """The user's babies with role, caregiver count and latest activity per type, in one query"""
+    my_baby_ids = select(UserBaby.baby_id).where(UserBaby.user_id == user_id)
+    latest = _latest_activities(db.bind.dialect.name, my_baby_ids)
+    caregiver_count = (
+        select(func.count())
+        .where(UserBaby.baby_id == Baby.id)
+        .correlate(Baby)
+        .scalar_subquery()
+    )
+
+    # Una fila por (bebé, tipo con actividad); los bebés sin actividades salen con latest a NULL
+    rows = (await db.execute(
+        select(
+            *BABY_COLUMNS,
+            UserBaby.role,
+            caregiver_count.label("caregiver_count"),
+            latest.c.id.label("latest_id"),
+            latest.c.type.label("latest_type"),
+            latest.c.timestamp.label("latest_timestamp"),
+            latest.c.data.label("latest_data"),
+        )
+        .join(UserBaby, UserBaby.baby_id == Baby.id)
+        .outerjoin(latest, latest.c.baby_id == Baby.id)
+        .where(UserBaby.user_id == user_id)
+        .order_by(Baby.id)
+    )).all()
+
+    babies: Dict[int, Dict[str, Any]] = {}
+    for row in rows:
+        baby = babies.get(row.id)
+        if baby is None:
+            baby = babies[row.id] = {
+                **{column.key: getattr(row, column.key) for column in BABY_COLUMNS},
+                "role": row.role,
+                "caregiver_count": row.caregiver_count,
+                "latest_activities": {},
+            }
+        if row.latest_id is not None:
+            baby["latest_activities"][row.latest_type] = {
+                "id": row.latest_id,
+                "type": row.latest_type,
+                "timestamp": row.latest_timestamp,
+                "data": row.latest_data,
+            }
+    return list(babies.values())
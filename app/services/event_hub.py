@@ -0,0 +1,215 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Optional, Set
+from sqlalchemy import text
+from ..core.config import settings
+from ..core.permissions import invalidate_baby_access
+from ..database import DATABASE_URL, engine
+
+try:
+    import asyncpg
+except ImportError:  # Solo hace falta con EVENTS_BACKEND="postgres"
+    asyncpg = None
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "babycare_events"
+# Cambios de permisos (altas y bajas de cuidadores): cada worker olvida los roles cacheados
+ACCESS_CHANNEL = "babycare_access"
+RECONNECT_SECONDS = 5
+
+# Evento que recibe un cliente que no da abasto: debe volver a pedir /changes
+RESYNC_EVENT = json.dumps({"type": "resync"})
+# Marca interna para los streams de un usuario cuyos permisos cambiaron: vuelven a comprobar su acceso
+ACCESS_CHECK = object()
+
+
+def activity_event(kind: str, activity_ids: Iterable[int], sync_token: int) -> Dict[str, Any]:
+    """Event payload for created/updated/deleted activities; clients fetch /changes?since=<their token>"""
+    return {"type": f"activity.{kind}", "activity_ids": list(activity_ids), "sync_token": sync_token}
+
+
+class LocalEventHub:
+    """In-process pub/sub: one bounded queue per connected client, grouped by baby"""
+
+    backend = "local"
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = defaultdict(set)
+        self._user_queues: Dict[int, Set[asyncio.Queue]] = defaultdict(set)
+        self.published = 0
+        self.delivered = 0
+        self.overflows = 0
+
+    def subscribe(self, baby_id: int, user_id: int) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[baby_id].add(queue)
+        self._user_queues[user_id].add(queue)
+        return queue
+
+    def unsubscribe(self, baby_id: int, user_id: int, queue: asyncio.Queue) -> None:
+        for index, key in ((self._subscribers, baby_id), (self._user_queues, user_id)):
+            queues = index.get(key)
+            if queues is None:
+                continue
+            queues.discard(queue)
+            if not queues:
+                del index[key]
+
+    def _put(self, queue: asyncio.Queue, message: Any) -> None:
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Cliente lento: se descartan sus eventos pendientes y se le pide resincronizar
+            self.overflows += 1
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(RESYNC_EVENT)
+            if message is ACCESS_CHECK and not queue.full():
+                queue.put_nowait(message)
+
+    def deliver(self, baby_id: int, message: str) -> None:
+        """Fan a serialized event out to every subscriber of the baby without blocking"""
+        for queue in self._subscribers.get(baby_id, ()):
+            self._put(queue, message)
+            self.delivered += 1
+
+    async def publish(self, baby_id: int, event: Dict[str, Any]) -> None:
+        """Send an event to the baby's subscribers (call after the write is committed)"""
+        self.published += 1
+        # Se serializa una sola vez para todos los suscriptores
+        self.deliver(baby_id, json.dumps(event))
+
+    def access_changed(self, user_ids: Iterable[int]) -> None:
+        """Apply a role change in this process: drop the users' cached roles and recheck their streams"""
+        user_ids = list(user_ids)
+        invalidate_baby_access(*user_ids)
+        for user_id in user_ids:
+            for queue in self._user_queues.get(user_id, ()):
+                self._put(queue, ACCESS_CHECK)
+
+    async def publish_access_change(self, user_ids: Iterable[int]) -> None:
+        """Tell every worker that these users' baby roles changed (call after the write is committed)"""
+        self.access_changed(user_ids)
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend,
+            "babies": len(self._subscribers),
+            "connections": sum(len(subscribers) for subscribers in self._subscribers.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "overflows": self.overflows,
+        }
+
+
+class PostgresEventHub(LocalEventHub):
+    """Fan-out across workers: publish with NOTIFY, each worker LISTENs and delivers locally"""
+
+    backend = "postgres"
+
+    def __init__(self, dsn: str, queue_size: int):
+        super().__init__(queue_size)
+        self.dsn = dsn
+        self.errors = 0
+        self._listener: Optional[asyncio.Task] = None
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        baby_id, _, message = payload.partition(":")
+        self.deliver(int(baby_id), message)
+
+    def _on_access_notify(self, connection, pid, channel, payload: str) -> None:
+        self.access_changed(int(user_id) for user_id in payload.split(",") if user_id)
+
+    async def _listen(self) -> None:
+        # Conexión dedicada de asyncpg (LISTEN no funciona con las conexiones del pool)
+        while True:
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                try:
+                    closed = asyncio.Event()
+                    connection.add_termination_listener(lambda _: closed.set())
+                    await connection.add_listener(NOTIFY_CHANNEL, self._on_notify)
+                    await connection.add_listener(ACCESS_CHANNEL, self._on_access_notify)
+                    await closed.wait()
+                finally:
+                    await connection.close()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.errors += 1
+                logger.exception("Event listener connection failed")
+            await asyncio.sleep(RECONNECT_SECONDS)
+
+    async def _notify(self, channel: str, payload: str) -> None:
+        async with engine.connect() as connection:
+            await connection.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": channel, "payload": payload}
+            )
+            await connection.commit()
+
+    async def publish(self, baby_id: int, event: Dict[str, Any]) -> None:
+        self.published += 1
+        try:
+            await self._notify(NOTIFY_CHANNEL, f"{baby_id}:{json.dumps(event)}")
+        except Exception:
+            # El cambio ya está guardado: los clientes lo verán en su próximo /changes
+            self.errors += 1
+            logger.exception("Could not publish event for baby %s", baby_id)
+
+    async def publish_access_change(self, user_ids: Iterable[int]) -> None:
+        user_ids = list(user_ids)
+        # Este worker no espera a su propio NOTIFY
+        self.access_changed(user_ids)
+        try:
+            await self._notify(ACCESS_CHANNEL, ",".join(str(user_id) for user_id in user_ids))
+        except Exception:
+            # Los demás workers lo verán al caducar su caché (ACCESS_CACHE_TTL_SECONDS)
+            self.errors += 1
+            logger.exception("Could not publish access change for users %s", user_ids)
+
+    async def start(self) -> None:
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+
+    def stats(self) -> dict:
+        return {**super().stats(), "errors": self.errors}
+
+
+def create_event_hub(backend: str, queue_size: int):
+    """Postgres LISTEN/NOTIFY hub or in-process hub, as configured.
+
+    Raises RuntimeError when the Postgres backend is requested but can't be
+    used: falling back to the local hub would silently stop cross-worker
+    events and access revocations.
+    """
+    if backend == "local":
+        return LocalEventHub(queue_size)
+    if backend != "postgres":
+        raise RuntimeError(f"Unknown EVENTS_BACKEND {backend!r} (expected 'local' or 'postgres')")
+    if asyncpg is None:
+        raise RuntimeError("EVENTS_BACKEND=postgres needs the asyncpg package")
+    if not DATABASE_URL.startswith(("postgres://", "postgresql")):
+        raise RuntimeError("EVENTS_BACKEND=postgres needs a PostgreSQL DATABASE_URL")
+    # asyncpg espera una URL libpq, sin el "+driver" de SQLAlchemy
+    scheme, _, rest = DATABASE_URL.partition("://")
+    return PostgresEventHub(f"{scheme.split('+')[0]}://{rest}", queue_size)
+
+
+event_hub = create_event_hub(settings.EVENTS_BACKEND, settings.EVENTS_QUEUE_SIZE)
@@ -1,123 +1,171 @@
 from datetime import datetime, timedelta, timezone
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
-from ..models.activity import Activity
-from ..models.baby import Baby
-from typing import Dict, List, Any
-from .ml_service import MLService
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Any, NamedTuple, Optional
+import numpy as np
+from .activity_frame import DIAPER_KINDS, ActivityFrame, US_PER_HOUR, load_activity_frame, now_us, to_us
+from .ml_pool import ml_pool
+from .interval_service import load_interval_states, predict_diaper_change, predict_next_feeding
+from .rollup_service import load_daily_stats
+from .activity_writes import get_data_version
+from ..core.cache import create_cache_backend
+from ..core.config import settings
+
+# Salida de los modelos por (bebé, días, data_version): cualquier escritura deja obsoletas las
+# entradas viejas y, sin escrituras, los modelos no se vuelven a ejecutar
+insights_cache = create_cache_backend(
+    "insights:",
+    settings.INSIGHTS_CACHE_MAX_SIZE,
+    settings.INSIGHTS_CACHE_TTL_SECONDS,
+    settings.REDIS_URL
+)
+
+
+class InsightsKey(NamedTuple):
+    cache_key: str
+    data_version: int
+    # Tramo de los campos relativos al reloj ("horas desde la última toma"); solo para el ETag
+    bucket: int
 
 
 class InsightsService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def _make_aware(self, dt: datetime) -> datetime:
-        """Convert naive datetime to aware datetime with UTC timezone"""
-        if dt.tzinfo is None:
-            return dt.replace(tzinfo=timezone.utc)
-        return dt
+    async def insights_key(self, baby_id: int, days: int, end_date: datetime) -> InsightsKey:
+        """Cache key of the model output (per data version) plus the time bucket at end_date"""
+        version = await get_data_version(self.db, baby_id)
+        bucket = int(end_date.timestamp() // settings.INSIGHTS_CACHE_BUCKET_SECONDS)
+        return InsightsKey(f"{baby_id}:{days}:{version}", version, bucket)
     
-    def generate_insights(self, baby_id: int, days: int = 14) -> Dict[str, Any]:
-        """Generate insights and recommendations for a baby"""
+    async def generate_insights(self, baby_id: int, days: int = 14, key: Optional[InsightsKey] = None) -> Dict[str, Any]:
+        """Generate insights and recommendations for a baby.
+
+        The analysis and model output are cached per data version; the
+        clock-relative fields (time since the last feeding, next feeding and
+        diaper change) are recomputed on every call on top of them.
+        """
         end_date = datetime.now(timezone.utc)
+        if key is None:
+            key = await self.insights_key(baby_id, days, end_date)
+        
+        analysis = await insights_cache.get(key.cache_key)
+        if analysis is None:
+            analysis = await self._compute_insights(baby_id, days, end_date, key.data_version)
+            await insights_cache.set(key.cache_key, analysis)
+        return await self._with_clock_fields(baby_id, analysis)
+    
+    async def _compute_insights(self, baby_id: int, days: int, end_date: datetime, data_version: int) -> Dict[str, Any]:
+        """Run the pattern analysis and ML models over the window ending at end_date"""
         start_date = end_date - timedelta(days=days)
         
-        # Get all activities in period
-        activities = self.db.query(Activity).filter(
-            Activity.baby_id == baby_id,
-            Activity.timestamp >= start_date,
-            Activity.timestamp <= end_date
-        ).all()
+        # Todas las actividades del periodo, en columnas (una sola pasada)
+        frame = await load_activity_frame(self.db, baby_id, start_date, end_date)
         
-        if not activities:
+        if not len(frame):
             return {
                 "insights": [],
                 "alerts": [],
                 "patterns": {},
                 "recommendations": [],
-                "ml_insights": []
+                "ml_results": None,
+                "last_feeding_us": None
             }
         
         # Generate different types of insights
         insights = []
         alerts = []
-        patterns = self._detect_patterns(activities, days)
-        recommendations = self._generate_recommendations(activities, patterns)
+        patterns = self._detect_patterns(frame, days)
+        recommendations = self._generate_recommendations(frame, patterns)
         
-        # Generate ML insights
-        ml_insights = self._generate_ml_insights(activities)
+        # ML models (los modelos diarios leen la tabla de rollups)
+        daily = await load_daily_stats(self.db, baby_id, start_date, end_date)
+        ml_results = await ml_pool.run_models(frame, daily, (baby_id, days, data_version))
         
         # Analyze feeding
-        feeding_insights = self._analyze_feeding(activities, days)
+        feeding_insights = self._analyze_feeding(frame, days)
         insights.extend(feeding_insights.get("insights", []))
         alerts.extend(feeding_insights.get("alerts", []))
         
         # Analyze sleep
-        sleep_insights = self._analyze_sleep(activities, days)
+        sleep_insights = self._analyze_sleep(frame, days)
         insights.extend(sleep_insights.get("insights", []))
         alerts.extend(sleep_insights.get("alerts", []))
         
         # Analyze diaper changes
-        diaper_insights = self._analyze_diapers(activities, days)
+        diaper_insights = self._analyze_diapers(frame, days)
         insights.extend(diaper_insights.get("insights", []))
         
+        feeding_ts = frame.ts_us[frame.of_type('feeding')]
         return {
             "insights": insights,
             "alerts": alerts,
             "patterns": patterns,
             "recommendations": recommendations,
-            "ml_insights": ml_insights
+            "ml_results": ml_results,
+            "last_feeding_us": int(feeding_ts[-1]) if len(feeding_ts) else None
         }
     
-    def _detect_patterns(self, activities: List[Activity], days: int) -> Dict[str, Any]:
+    async def _with_clock_fields(self, baby_id: int, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Response for a cached analysis, with the fields that depend on the current time"""
+        alerts = list(analysis["alerts"])
+        if analysis["last_feeding_us"] is not None:
+            hours_since = (now_us() - analysis["last_feeding_us"]) / US_PER_HOUR
+            if hours_since > 4:
+                # Va primero, como cuando se calculaba en _analyze_feeding
+                alerts.insert(0, {
+                    "type": "alert",
+                    "title": "Tiempo desde última toma",
+                    "message": f"Han pasado {hours_since:.1f} horas desde la última toma",
+                    "icon": "alarm"
+                })
+        
+        ml_results = analysis["ml_results"]
+        return {
+            "insights": analysis["insights"],
+            "alerts": alerts,
+            "patterns": analysis["patterns"],
+            "recommendations": analysis["recommendations"],
+            "ml_insights": await self._generate_ml_insights(baby_id, ml_results) if ml_results is not None else []
+        }
+    
+    def _detect_patterns(self, frame: ActivityFrame, days: int) -> Dict[str, Any]:
         """Detect patterns in activities"""
         patterns = {}
         
         # Pattern: Best sleep time
-        sleep_activities = [a for a in activities if a.type == 'sleep']
-        if sleep_activities:
-            # Group by hour
-            hours_count = {}
-            for activity in sleep_activities:
-                hour = self._make_aware(activity.timestamp).hour
-                duration = activity.data.get('duration_hours', 0) if activity.data else 0
-                if hour not in hours_count:
-                    hours_count[hour] = []
-                hours_count[hour].append(duration)
-            
-            # Find hour with longest average sleep
-            if hours_count:
-                best_hour = max(hours_count.items(), key=lambda x: sum(x[1]) / len(x[1]))
-                patterns['best_sleep_hour'] = {
-                    'hour': best_hour[0],
-                    'avg_duration': sum(best_hour[1]) / len(best_hour[1])
-                }
+        sleep = frame.of_type('sleep')
+        if sleep.any():
+            # Group by hour (en caso de empate gana la hora que aparece antes)
+            hours = frame.hour[sleep]
+            durations = np.nan_to_num(frame.duration_hours[sleep])
+            totals = np.bincount(hours, weights=durations, minlength=24)
+            counts = np.bincount(hours, minlength=24)
+            unique_hours, first_seen = np.unique(hours, return_index=True)
+            ordered_hours = unique_hours[np.argsort(first_seen)]
+            averages = totals[ordered_hours] / counts[ordered_hours]
+            best = int(np.argmax(averages))
+            patterns['best_sleep_hour'] = {
+                'hour': int(ordered_hours[best]),
+                'avg_duration': float(averages[best])
+            }
         
         # Pattern: Feeding frequency
-        feeding_activities = [a for a in activities if a.type == 'feeding']
-        if len(feeding_activities) > 1:
+        feeding_ts = frame.ts_us[frame.of_type('feeding')]
+        if len(feeding_ts) > 1:
             # Calculate average time between feedings
-            feeding_activities.sort(key=lambda x: x.timestamp)
-            intervals = []
-            for i in range(1, len(feeding_activities)):
-                ts1 = self._make_aware(feeding_activities[i-1].timestamp)
-                ts2 = self._make_aware(feeding_activities[i].timestamp)
-                diff = (ts2 - ts1).total_seconds() / 3600
-                intervals.append(diff)
-            
-            if intervals:
-                patterns['avg_feeding_interval'] = sum(intervals) / len(intervals)
+            intervals = np.diff(feeding_ts) / US_PER_HOUR
+            patterns['avg_feeding_interval'] = float(intervals.mean())
         
         return patterns
     
-    def _analyze_feeding(self, activities: List[Activity], days: int) -> Dict[str, Any]:
+    def _analyze_feeding(self, frame: ActivityFrame, days: int) -> Dict[str, Any]:
         """Analyze feeding patterns"""
         insights = []
         alerts = []
         
-        feeding_activities = [a for a in activities if a.type == 'feeding']
+        feeding_ts = frame.ts_us[frame.of_type('feeding')]
         
-        if not feeding_activities:
+        if not len(feeding_ts):
             alerts.append({
                 "type": "warning",
                 "title": "Sin registros de alimentación",
@@ -127,14 +175,10 @@ class InsightsService:
             return {"insights": insights, "alerts": alerts}
         
         # Calculate daily average
-        daily_avg = len(feeding_activities) / days
+        daily_avg = len(feeding_ts) / days
         
         # Calculate total quantity
-        total_ml = sum([
-            a.data.get('quantity_ml', 0) 
-            for a in feeding_activities 
-            if a.data and a.data.get('quantity_ml')
-        ])
+        total_ml = np.nansum(frame.quantity_ml[frame.of_type('feeding')])
         
         if total_ml > 0:
             avg_ml_per_day = total_ml / days
@@ -145,33 +189,16 @@ class InsightsService:
                 "icon": "restaurant"
             })
         
-        # Check last feeding
-        last_feeding = max(feeding_activities, key=lambda x: x.timestamp)
-        last_timestamp = self._make_aware(last_feeding.timestamp)
-        hours_since = (datetime.now(timezone.utc) - last_timestamp).total_seconds() / 3600
-        
-        if hours_since > 4:
-            alerts.append({
-                "type": "alert",
-                "title": "Tiempo desde última toma",
-                "message": f"Han pasado {hours_since:.1f} horas desde la última toma",
-                "icon": "alarm"
-            })
+        # El aviso de horas desde la última toma depende del reloj: _with_clock_fields
         
         # Compare with previous period
-        mid_point = datetime.now(timezone.utc) - timedelta(days=days/2)
-        recent_feedings = [
-            a for a in feeding_activities 
-            if self._make_aware(a.timestamp) >= mid_point
-        ]
-        old_feedings = [
-            a for a in feeding_activities 
-            if self._make_aware(a.timestamp) < mid_point
-        ]
-        
-        if old_feedings and recent_feedings:
-            recent_avg = len(recent_feedings) / (days/2)
-            old_avg = len(old_feedings) / (days/2)
+        mid_point = to_us(datetime.now(timezone.utc) - timedelta(days=days/2))
+        recent_count = int((feeding_ts >= mid_point).sum())
+        old_count = len(feeding_ts) - recent_count
+        
+        if old_count and recent_count:
+            recent_avg = recent_count / (days/2)
+            old_avg = old_count / (days/2)
             change = ((recent_avg - old_avg) / old_avg) * 100
             
             if abs(change) > 20:
@@ -185,22 +212,18 @@ class InsightsService:
         
         return {"insights": insights, "alerts": alerts}
     
-    def _analyze_sleep(self, activities: List[Activity], days: int) -> Dict[str, Any]:
+    def _analyze_sleep(self, frame: ActivityFrame, days: int) -> Dict[str, Any]:
         """Analyze sleep patterns"""
         insights = []
         alerts = []
         
-        sleep_activities = [a for a in activities if a.type == 'sleep']
+        sleep = frame.of_type('sleep')
         
-        if not sleep_activities:
+        if not sleep.any():
             return {"insights": insights, "alerts": alerts}
         
         # Calculate total sleep hours
-        total_hours = sum([
-            a.data.get('duration_hours', 0) 
-            for a in sleep_activities 
-            if a.data
-        ])
+        total_hours = np.nansum(frame.duration_hours[sleep])
         
         avg_hours_per_day = total_hours / days
         
@@ -222,16 +245,16 @@ class InsightsService:
         
         return {"insights": insights, "alerts": alerts}
     
-    def _analyze_diapers(self, activities: List[Activity], days: int) -> Dict[str, Any]:
+    def _analyze_diapers(self, frame: ActivityFrame, days: int) -> Dict[str, Any]:
         """Analyze diaper change patterns"""
         insights = []
         
-        diaper_activities = [a for a in activities if a.type == 'diaper']
+        diaper = frame.of_type('diaper')
         
-        if not diaper_activities:
+        if not diaper.any():
             return {"insights": insights}
         
-        daily_avg = len(diaper_activities) / days
+        daily_avg = int(diaper.sum()) / days
         
         insights.append({
             "type": "info",
@@ -241,8 +264,9 @@ class InsightsService:
         })
         
         # Analyze types
-        wet_count = len([a for a in diaper_activities if a.data and a.data.get('type') == 'wet'])
-        dirty_count = len([a for a in diaper_activities if a.data and a.data.get('type') == 'dirty'])
+        kinds = frame.diaper_kind[diaper]
+        wet_count = int((kinds == DIAPER_KINDS['wet']).sum())
+        dirty_count = int((kinds == DIAPER_KINDS['dirty']).sum())
         
         if wet_count > 0 or dirty_count > 0:
             insights.append({
@@ -254,12 +278,18 @@ class InsightsService:
         
         return {"insights": insights}
     
-    def _generate_ml_insights(self, activities: List[Activity]) -> List[Dict[str, Any]]:
-        """Generate ML-powered insights"""
+    async def _generate_ml_insights(self, baby_id: int, model_results: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Generate ML-powered insights from the (cached) model results"""
         ml_insights = []
+        results = dict(model_results)
+        
+        # Próxima toma y próximo pañal: estado guardado, sin recorrer el historial
+        interval_states = await load_interval_states(self.db, baby_id)
+        results["predict_next_feeding"] = predict_next_feeding(interval_states["feeding"])
+        results["predict_diaper_change"] = predict_diaper_change(interval_states["diaper"])
         
         # 1. ML Prediction: Next feeding
-        feeding_pred = MLService.predict_next_feeding(activities)
+        feeding_pred = results["predict_next_feeding"]
         if feeding_pred.get("has_prediction"):
             if feeding_pred.get("is_overdue"):
                 ml_insights.append({
@@ -281,7 +311,7 @@ class InsightsService:
                     })
         
         # 2. ML Detection: Feeding anomalies
-        anomalies = MLService.detect_feeding_anomalies(activities)
+        anomalies = results["detect_feeding_anomalies"]
         if anomalies.get("has_analysis") and anomalies.get("anomalies_detected", 0) > 0:
             ml_insights.append({
                 "type": "ml_warning",
@@ -292,7 +322,7 @@ class InsightsService:
             })
         
         # 3. ML Classification: Sleep quality
-        sleep_quality = MLService.classify_sleep_quality(activities)
+        sleep_quality = results["classify_sleep_quality"]
         if sleep_quality.get("has_classification"):
             ml_insights.append({
                 "type": "ml_classification",
@@ -303,7 +333,7 @@ class InsightsService:
             })
         
         # 4. ML Prediction: Sleep duration
-        sleep_pred = MLService.predict_sleep_duration(activities)
+        sleep_pred = results["predict_sleep_duration"]
         if sleep_pred.get("has_prediction"):
             ml_insights.append({
                 "type": "ml_prediction",
@@ -314,7 +344,7 @@ class InsightsService:
             })
         
         # 5. NEW: ML Prediction: Optimal feeding amount (Random Forest)
-        optimal_feeding = MLService.predict_optimal_feeding_amount(activities)
+        optimal_feeding = results["predict_optimal_feeding_amount"]
         if optimal_feeding.get("has_prediction"):
             ml_insights.append({
                 "type": "ml_prediction",
@@ -325,7 +355,7 @@ class InsightsService:
             })
         
         # 6. NEW: ML Clustering: Routine patterns (K-Means)
-        routines = MLService.identify_routine_clusters(activities)
+        routines = results["identify_routine_clusters"]
         if routines.get("has_analysis"):
             current_type = routines.get("current_pattern_type", "Desconocido")
             ml_insights.append({
@@ -337,7 +367,7 @@ class InsightsService:
             })
         
         # 7. NEW: ML Correlation: Feeding-Sleep analysis
-        correlation = MLService.analyze_feeding_sleep_correlation(activities)
+        correlation = results["analyze_feeding_sleep_correlation"]
         if correlation.get("has_analysis") and correlation.get("insights"):
             insights_text = " | ".join(correlation['insights'][:2])
             ml_insights.append({
@@ -349,7 +379,7 @@ class InsightsService:
             })
         
         # 8. NEW: ML Prediction: Next diaper change (Logistic Regression)
-        diaper_pred = MLService.predict_diaper_change(activities)
+        diaper_pred = results["predict_diaper_change"]
         if diaper_pred.get("has_prediction"):
             if diaper_pred.get("is_overdue"):
                 ml_insights.append({
@@ -369,7 +399,7 @@ class InsightsService:
                 })
         
         # 9. NEW: Time Series Forecast: Next week patterns
-        forecast = MLService.forecast_next_week(activities)
+        forecast = results["forecast_next_week"]
         if forecast.get("has_forecast"):
             fc = forecast['next_week_forecast']
             ml_insights.append({
@@ -382,7 +412,7 @@ class InsightsService:
         
         return ml_insights
     
-    def _generate_recommendations(self, activities: List[Activity], patterns: Dict[str, Any]) -> List[Dict[str, str]]:
+    def _generate_recommendations(self, frame: ActivityFrame, patterns: Dict[str, Any]) -> List[Dict[str, str]]:
         """Generate personalized recommendations"""
         recommendations = []
         
@@ -405,8 +435,7 @@ class InsightsService:
             })
         
         # General recommendations
-        sleep_activities = [a for a in activities if a.type == 'sleep']
-        if len(sleep_activities) > 0:
+        if frame.of_type('sleep').any():
             recommendations.append({
                 "title": "Consejo de rutina",
                 "message": "Mantener horarios consistentes ayuda a establecer mejores patrones de sueño y alimentación.",
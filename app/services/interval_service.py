@@ -0,0 +1,248 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import math
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import to_naive_utc
+from ..models.activity import Activity
+from ..models.interval_estimator import IntervalEstimator
+
+# Tipos cuyo intervalo entre registros se predice
+TRACKED_TYPES = ("feeding", "diaper")
+
+EWM_ALPHA = 0.2
+BUCKET_HOURS = 6
+# Mínimo de intervalos en una franja horaria para preferirla a la media global
+MIN_BUCKET_SAMPLES = 5
+
+STATE_FIELDS = ("last_timestamp", "count", "mean", "m2", "ewm_mean", "ewm_var", "hour_buckets")
+
+# (tipo, timestamp) de una actividad creada o eliminada
+ActivityEvent = Tuple[str, datetime]
+
+
+def empty_state() -> Dict[str, Any]:
+    return {
+        "last_timestamp": None,
+        "count": 0,
+        "mean": 0.0,
+        "m2": 0.0,
+        "ewm_mean": 0.0,
+        "ewm_var": 0.0,
+        "hour_buckets": [[0, 0.0, 0.0] for _ in range(24 // BUCKET_HOURS)],
+    }
+
+
+def _welford(count: int, mean: float, m2: float, value: float) -> List[float]:
+    count += 1
+    delta = value - mean
+    mean += delta / count
+    m2 += delta * (value - mean)
+    return [count, mean, m2]
+
+
+def push_timestamp(state: Dict[str, Any], timestamp: datetime) -> None:
+    """O(1) update of the estimator with a new latest activity"""
+    last = state["last_timestamp"]
+    if last is not None:
+        hours = (timestamp - last).total_seconds() / 3600
+        state["count"], state["mean"], state["m2"] = _welford(state["count"], state["mean"], state["m2"], hours)
+
+        if state["count"] == 1:
+            state["ewm_mean"], state["ewm_var"] = hours, 0.0
+        else:
+            diff = hours - state["ewm_mean"]
+            increment = EWM_ALPHA * diff
+            state["ewm_mean"] += increment
+            state["ewm_var"] = (1 - EWM_ALPHA) * (state["ewm_var"] + diff * increment)
+
+        # Lista nueva para que SQLAlchemy detecte el cambio en la columna JSON
+        buckets = [list(bucket) for bucket in state["hour_buckets"]]
+        slot = last.hour // BUCKET_HOURS
+        buckets[slot] = _welford(*buckets[slot], hours)
+        state["hour_buckets"] = buckets
+
+    state["last_timestamp"] = timestamp
+
+
+def state_from_timestamps(timestamps: Iterable[datetime]) -> Dict[str, Any]:
+    """Recompute an estimator from scratch (verification / backfill)"""
+    state = empty_state()
+    for timestamp in timestamps:
+        push_timestamp(state, timestamp)
+    return state
+
+
+async def rebuild_interval_estimator(db: AsyncSession, baby_id: int, activity_type: str) -> Dict[str, Any]:
+    """Rebuild one estimator from the full history and store it (caller commits)"""
+    # Bloquea la fila (si existe) para que ninguna escritura concurrente se intercale
+    await db.execute(select(IntervalEstimator.baby_id).where(
+        IntervalEstimator.baby_id == baby_id,
+        IntervalEstimator.type == activity_type
+    ).with_for_update())
+
+    timestamps = (await db.scalars(select(Activity.timestamp).where(
+        Activity.baby_id == baby_id,
+        Activity.type == activity_type
+    ).order_by(Activity.timestamp))).all()
+    state = state_from_timestamps(timestamps)
+
+    dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(IntervalEstimator).values(baby_id=baby_id, type=activity_type, stale=False, **state)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["baby_id", "type"],
+        set_={**{field: stmt.excluded[field] for field in STATE_FIELDS}, "stale": False},
+    )
+    await db.execute(stmt)
+    return state
+
+
+async def load_interval_states(db: AsyncSession, baby_id: int) -> Dict[str, Dict[str, Any]]:
+    """Stored estimator state per tracked type, rebuilding missing or stale ones"""
+    rows = (await db.scalars(select(IntervalEstimator).where(
+        IntervalEstimator.baby_id == baby_id
+    ))).all()
+    states = {row.type: {field: getattr(row, field) for field in STATE_FIELDS} for row in rows if not row.stale}
+
+    missing = [activity_type for activity_type in TRACKED_TYPES if activity_type not in states]
+    for activity_type in missing:
+        states[activity_type] = await rebuild_interval_estimator(db, baby_id, activity_type)
+    if missing:
+        await db.commit()
+    return states
+
+
+async def apply_interval_changes(
+    db: AsyncSession,
+    baby_id: int,
+    added: Iterable[ActivityEvent] = (),
+    removed: Iterable[ActivityEvent] = ()
+) -> None:
+    """Keep the estimators in sync with an activity write, within the caller's transaction"""
+    added = [(t, to_naive_utc(ts)) for t, ts in added if t in TRACKED_TYPES]
+    removed = [(t, to_naive_utc(ts)) for t, ts in removed if t in TRACKED_TYPES]
+
+    # Cambios que se anulan (p. ej. editar solo las notas) no afectan a los intervalos
+    for event in list(removed):
+        if event in added:
+            added.remove(event)
+            removed.remove(event)
+
+    # Un borrado o edición cambia intervalos intermedios: se recalcula al leer
+    stale_types = {activity_type for activity_type, _ in removed}
+    if stale_types:
+        await db.execute(update(IntervalEstimator).where(
+            IntervalEstimator.baby_id == baby_id,
+            IntervalEstimator.type.in_(stale_types)
+        ).values(stale=True))
+
+    # Una lectura por tipo aunque lleguen muchas actividades (cargas por lotes)
+    for activity_type in {activity_type for activity_type, _ in added} - stale_types:
+        timestamps = sorted(ts for t, ts in added if t == activity_type)
+        row = await db.scalar(select(IntervalEstimator).where(
+            IntervalEstimator.baby_id == baby_id,
+            IntervalEstimator.type == activity_type
+        ).with_for_update())
+        # Sin fila (se construirá desde el historial al leer) o ya pendiente de recalcular
+        if row is None or row.stale:
+            continue
+        if row.last_timestamp is not None and timestamps[0] < row.last_timestamp:
+            row.stale = True
+            continue
+
+        state = {field: getattr(row, field) for field in STATE_FIELDS}
+        for timestamp in timestamps:
+            push_timestamp(state, timestamp)
+        for field, value in state.items():
+            setattr(row, field, value)
+
+
+def expected_interval(state: Dict[str, Any]) -> Optional[Tuple[float, float, str]]:
+    """(mean, std, method) in hours: time-of-day bucket when it has enough samples, else EWM"""
+    if state["count"] == 0 or state["last_timestamp"] is None:
+        return None
+
+    count, mean, m2 = state["hour_buckets"][state["last_timestamp"].hour // BUCKET_HOURS]
+    if count >= MIN_BUCKET_SAMPLES:
+        return mean, math.sqrt(m2 / count), "time_of_day"
+    return state["ewm_mean"], math.sqrt(max(0.0, state["ewm_var"])), "ewm"
+
+
+def predict_next_feeding(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Next feeding from the stored estimator, same shape as MLService.predict_next_feeding"""
+    estimate = expected_interval(state)
+    if state["count"] < 2 or estimate is None or estimate[0] <= 0:
+        return {
+            "has_prediction": False,
+            "message": "Necesitas al menos 3 registros de alimentación para predicciones"
+        }
+
+    avg_interval, std_interval, method = estimate
+    now = datetime.now(timezone.utc)
+    last_feeding_ts = state["last_timestamp"].replace(tzinfo=timezone.utc)
+    hours_since = (now - last_feeding_ts).total_seconds() / 3600
+    predicted_next = last_feeding_ts + timedelta(hours=avg_interval)
+    confidence = max(0, min(100, 100 - (std_interval * 10)))
+
+    return {
+        "has_prediction": True,
+        "avg_interval_hours": round(avg_interval, 1),
+        "std_interval_hours": round(std_interval, 1),
+        "hours_since_last": round(hours_since, 1),
+        "hours_until_next": round(avg_interval - hours_since, 1),
+        "predicted_time": predicted_next.isoformat(),
+        "confidence": round(confidence, 0),
+        "is_overdue": hours_since > avg_interval + std_interval,
+        "method": method,
+        "overall_avg_interval_hours": round(state["mean"], 1),
+        "intervals_observed": state["count"]
+    }
+
+
+def predict_diaper_change(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Next diaper change from the stored estimator, same shape as MLService.predict_diaper_change"""
+    estimate = expected_interval(state)
+    if state["count"] < 4 or estimate is None or estimate[0] <= 0:
+        return {
+            "has_prediction": False,
+            "message": "Necesitas al menos 5 registros de pañal"
+        }
+
+    avg_interval, _, method = estimate
+    now = datetime.now(timezone.utc)
+    last_diaper_time = state["last_timestamp"].replace(tzinfo=timezone.utc)
+    hours_since = (now - last_diaper_time).total_seconds() / 3600
+    predicted_next = last_diaper_time + timedelta(hours=avg_interval)
+    minutes_until = (avg_interval - hours_since) * 60
+
+    if hours_since >= avg_interval:
+        probability = min(95, 50 + (hours_since - avg_interval) * 20)
+    else:
+        probability = (hours_since / avg_interval) * 50
+
+    return {
+        "has_prediction": True,
+        "avg_interval_hours": round(avg_interval, 1),
+        "hours_since_last": round(hours_since, 1),
+        "minutes_until_next": round(max(0, minutes_until), 0),
+        "probability": round(probability, 0),
+        "is_overdue": hours_since > avg_interval,
+        "predicted_time": predicted_next.isoformat(),
+        "method": method,
+        "intervals_observed": state["count"]
+    }
+
+
+async def rebuild_all_interval_estimators(db: AsyncSession, baby_id: Optional[int] = None) -> int:
+    """Recompute every estimator from history (backfill / verification)"""
+    query = select(Activity.baby_id).where(Activity.type.in_(TRACKED_TYPES)).distinct()
+    if baby_id is not None:
+        query = query.where(Activity.baby_id == baby_id)
+    baby_ids = (await db.scalars(query)).all()
+
+    for current_id in baby_ids:
+        for activity_type in TRACKED_TYPES:
+            await rebuild_interval_estimator(db, current_id, activity_type)
+        await db.commit()
+    return len(baby_ids)
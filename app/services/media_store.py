@@ -0,0 +1,161 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import io
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+from fastapi.concurrency import run_in_threadpool
+from PIL import Image, ImageOps, UnidentifiedImageError
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..core.config import settings
+from ..core.media_urls import MEDIA_URL_PREFIX, THUMBNAIL_SUFFIX, is_media_name, thumbnail_name
+from ..models.baby import Baby
+from ..models.user import User
+
+# Formatos aceptados -> (extensión, media type)
+IMAGE_FORMATS = {
+    "JPEG": ("jpg", "image/jpeg"),
+    "PNG": ("png", "image/png"),
+    "WEBP": ("webp", "image/webp"),
+    "GIF": ("gif", "image/gif"),
+}
+MEDIA_TYPES = {ext: media_type for ext, media_type in IMAGE_FORMATS.values()}
+
+
+class InvalidImage(ValueError):
+    pass
+
+
+def _decode_upload(value: str) -> bytes:
+    # Acepta "data:image/...;base64,<datos>" o el base64 sin prefijo
+    payload = value.split(",", 1)[1] if value.startswith("data:") else value
+    try:
+        return base64.b64decode(payload, validate=True)
+    except (binascii.Error, ValueError):
+        raise InvalidImage("Image must be base64 encoded")
+
+
+class MediaStore:
+    """Content-addressed image store on disk: each original plus a JPEG thumbnail"""
+
+    def __init__(self, root: str, max_bytes: int, thumbnail_size: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.thumbnail_size = thumbnail_size
+        self.stored = 0
+        self.deduplicated = 0
+        self.rejected = 0
+
+    def path(self, name: str) -> Path:
+        return self.root / name[:2] / name
+
+    def _address(self, data: bytes) -> str:
+        # HMAC en vez de un hash plano: quien tenga la foto no puede deducir su URL
+        return hmac.new(settings.SECRET_KEY.encode(), data, hashlib.sha256).hexdigest()[:32]
+
+    def _write(self, path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Escritura atómica: nunca se sirve una imagen a medias
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                out.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def _thumbnail(self, image: Image.Image) -> bytes:
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((self.thumbnail_size, self.thumbnail_size))
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        out = io.BytesIO()
+        image.save(out, "JPEG", quality=85, optimize=True)
+        return out.getvalue()
+
+    def save(self, data: bytes) -> str:
+        """Store an image and its thumbnail; returns its media name"""
+        if len(data) > self.max_bytes:
+            raise InvalidImage(f"Image is larger than {self.max_bytes} bytes")
+        try:
+            image = Image.open(io.BytesIO(data))
+            image_format = image.format
+            if image_format not in IMAGE_FORMATS:
+                raise InvalidImage(f"Unsupported image format: {image_format}")
+            image.load()
+        except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+            raise InvalidImage("Invalid image")
+
+        name = f"{self._address(data)}.{IMAGE_FORMATS[image_format][0]}"
+        path = self.path(name)
+        if path.exists():
+            self.deduplicated += 1
+            return name
+        self._write(self.path(thumbnail_name(name)), self._thumbnail(image))
+        self._write(path, data)
+        self.stored += 1
+        return name
+
+    def _ingest(self, value: str) -> str:
+        if value.startswith(MEDIA_URL_PREFIX):
+            # El cliente reenvía la URL que recibió: la imagen no cambia
+            name = value[len(MEDIA_URL_PREFIX):]
+            if is_media_name(name) and not name.endswith(THUMBNAIL_SUFFIX) and self.path(name).exists():
+                return name
+            raise InvalidImage("Unknown media URL")
+        return self.save(_decode_upload(value))
+
+    async def ingest(self, value: Optional[str]) -> Optional[str]:
+        """Media name for an uploaded image (data URL or base64); a media URL we served is kept as is"""
+        if not value:
+            return None
+        try:
+            # Decodificar y redimensionar es CPU: fuera del event loop
+            return await run_in_threadpool(self._ingest, value)
+        except InvalidImage:
+            self.rejected += 1
+            raise
+
+    def stats(self) -> dict:
+        return {
+            "stored": self.stored,
+            "deduplicated": self.deduplicated,
+            "rejected": self.rejected,
+        }
+
+
+media_store = MediaStore(settings.MEDIA_STORE_DIR, settings.MEDIA_MAX_BYTES, settings.MEDIA_THUMBNAIL_SIZE)
+
+
+async def migrate_inline_media(db: AsyncSession, batch_size: int = 50) -> Dict[str, int]:
+    """Move photos still stored inline as data URLs into the media store; returns counts"""
+    counts = {"migrated": 0, "invalid": 0}
+    for model, column in ((Baby, Baby.photo), (User, User.profile_picture)):
+        last_id = 0
+        while True:
+            # Por lotes: cada fila puede traer megas de base64
+            rows = (await db.execute(
+                select(model.id, column)
+                .where(model.id > last_id, column.like("data:%"))
+                .order_by(model.id)
+                .limit(batch_size)
+            )).all()
+            if not rows:
+                break
+            for row_id, value in rows:
+                last_id = row_id
+                try:
+                    name = await media_store.ingest(value)
+                except InvalidImage:
+                    counts["invalid"] += 1
+                    continue
+                await db.execute(update(model).where(model.id == row_id).values({column.key: name}))
+                counts["migrated"] += 1
+            await db.commit()
+    return counts
@@ -0,0 +1,183 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional, Tuple
+from ..core.config import settings
+from .activity_frame import ActivityFrame
+from .rollup_service import DailyStats
+
+logger = logging.getLogger(__name__)
+
+# Modelo de MLService -> si recibe los agregados diarios.
+# Las predicciones de próxima toma/pañal salen de los estimadores online (interval_service)
+MODELS = {
+    "detect_feeding_anomalies": False,
+    "classify_sleep_quality": False,
+    "predict_sleep_duration": False,
+    "predict_optimal_feeding_amount": False,
+    "identify_routine_clusters": True,
+    "analyze_feeding_sleep_correlation": True,
+    "forecast_next_week": True,
+}
+
+
+def _feeding_samples(frame: ActivityFrame, daily: Optional[DailyStats]) -> int:
+    return int(frame.of_type("feeding").sum())
+
+
+def _routine_samples(frame: ActivityFrame, daily: Optional[DailyStats]) -> int:
+    days = daily if daily is not None else frame.daily_stats()
+    return int(sum(day["total_activities"] for day in days.values()))
+
+
+# Modelos entrenados que se guardan en el model store: nombre -> (método de ajuste, nº de muestras)
+STORED_MODELS = {
+    "detect_feeding_anomalies": ("fit_feeding_anomaly_model", _feeding_samples),
+    "predict_optimal_feeding_amount": ("fit_feeding_amount_model", _feeding_samples),
+    "identify_routine_clusters": ("fit_routine_model", _routine_samples),
+}
+
+# (baby_id, días de la ventana, data_version)
+StoreKey = Tuple[int, int, int]
+
+
+def stored_model_name(name: str, days: int) -> str:
+    """Model store entry for a model trained on a `days` window"""
+    return f"{name}_{days}d"
+
+
+def warm_worker() -> None:
+    # Importar sklearn/pandas una sola vez al arrancar cada proceso
+    from . import ml_service  # noqa: F401
+
+
+def _run_model(
+    name: str,
+    frame: ActivityFrame,
+    daily: Optional[DailyStats],
+    store_key: Optional[StoreKey]
+) -> Tuple[Dict[str, Any], Optional[str]]:
+    """Run one model; returns (result, "hit" | "trained" | None for unstored models)"""
+    from .ml_service import MLService
+    run = getattr(MLService, name)
+    args = (frame, daily) if MODELS[name] else (frame,)
+    if store_key is None or name not in STORED_MODELS:
+        return run(*args), None
+
+    from .model_store import model_store
+    baby_id, days, data_version = store_key
+    fit_name, count_samples = STORED_MODELS[name]
+    hits = model_store.hits
+    model = model_store.get_or_train(
+        baby_id,
+        stored_model_name(name, days),
+        data_version,
+        count_samples(frame, daily),
+        lambda: getattr(MLService, fit_name)(*args)
+    )
+    return run(*args, model=model), "hit" if model_store.hits > hits else "trained"
+
+
+class MLModelPool:
+    """Process pool that runs the MLService models concurrently, off the event loop"""
+
+    def __init__(self, max_workers: int, timeout_seconds: float):
+        self.max_workers = max_workers
+        self.timeout_seconds = timeout_seconds
+        self.completed = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.stored_hits = 0
+        self.stored_trained = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Se crea al primer uso; "spawn" evita hacer fork de un proceso con hilos y conexiones abiertas
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=warm_worker,
+            )
+        return self._executor
+
+    def _count(self, store_event: Optional[str]) -> None:
+        if store_event == "hit":
+            self.stored_hits += 1
+        elif store_event == "trained":
+            self.stored_trained += 1
+
+    async def _run_one(
+        self,
+        name: str,
+        frame: ActivityFrame,
+        daily: Optional[DailyStats],
+        store_key: Optional[StoreKey]
+    ) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        try:
+            result, store_event = await asyncio.wait_for(
+                loop.run_in_executor(executor, _run_model, name, frame, daily, store_key),
+                timeout=self.timeout_seconds,
+            )
+        except BrokenProcessPool:
+            # Un worker murió (p. ej. OOM): se recrea el pool en la siguiente petición
+            self.failures += 1
+            logger.exception("ML pool broken while running %s", name)
+            if self._executor is executor:
+                self.shutdown()
+            return {}
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            logger.warning("ML model %s timed out after %ss", name, self.timeout_seconds)
+            return {}
+        except Exception:
+            self.failures += 1
+            logger.exception("ML model %s failed", name)
+            return {}
+        self.completed += 1
+        self._count(store_event)
+        return result
+
+    async def run_models(
+        self,
+        frame: ActivityFrame,
+        daily: Optional[DailyStats] = None,
+        store_key: Optional[StoreKey] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Run every model concurrently; a model that fails or times out yields {}.
+
+        With ``store_key`` the trained models are reused from the model store.
+        """
+        if self.max_workers <= 0:
+            # Sin pool (desarrollo): ejecución en línea como antes
+            results = {}
+            for name in MODELS:
+                results[name], store_event = _run_model(name, frame, daily, store_key)
+                self._count(store_event)
+            return results
+
+        results = await asyncio.gather(*(self._run_one(name, frame, daily, store_key) for name in MODELS))
+        return dict(zip(MODELS, results))
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "timeout_seconds": self.timeout_seconds,
+            "completed": self.completed,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "stored_model_hits": self.stored_hits,
+            "models_trained": self.stored_trained,
+        }
+
+
+ml_pool = MLModelPool(settings.ML_POOL_WORKERS, settings.ML_MODEL_TIMEOUT_SECONDS)
@@ -1,13 +1,14 @@
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 from sklearn.linear_model import LinearRegression, LogisticRegression
 from sklearn.ensemble import IsolationForest, RandomForestRegressor
 from sklearn.cluster import KMeans
 from sklearn.preprocessing import StandardScaler
 from scipy.stats import pearsonr
-from ..models.activity import Activity
+from .activity_frame import ActivityFrame, US_PER_DAY, US_PER_HOUR, now_us, to_datetime, to_us
+from .rollup_service import DailyStats
 
 
 def clean_numpy(data):
@@ -27,47 +28,36 @@ def clean_numpy(data):
     return data
 
 
-def make_aware(dt: datetime) -> datetime:
-    """Convert naive datetime to aware datetime with UTC timezone"""
-    if dt.tzinfo is None:
-        return dt.replace(tzinfo=timezone.utc)
-    return dt
+def _plain_number(value: float) -> Any:
+    """JSON-friendly number: integral values come back as int, like the stored data"""
+    return int(value) if float(value).is_integer() else float(value)
 
 
 class MLService:
     """Machine Learning service for baby care predictions"""
     
     @staticmethod
-    def predict_next_feeding(activities: List[Activity]) -> Dict[str, Any]:
+    def predict_next_feeding(frame: ActivityFrame) -> Dict[str, Any]:
         """Predict when the next feeding will occur"""
-        feeding_activities = [a for a in activities if a.type == 'feeding']
+        feeding_ts = frame.ts_us[frame.of_type('feeding')]
         
-        if len(feeding_activities) < 3:
+        if len(feeding_ts) < 3:
             return {
                 "has_prediction": False,
                 "message": "Necesitas al menos 3 registros de alimentación para predicciones"
             }
         
-        feeding_activities.sort(key=lambda x: x.timestamp)
-        
-        intervals = []
-        for i in range(1, len(feeding_activities)):
-            ts1 = make_aware(feeding_activities[i-1].timestamp)
-            ts2 = make_aware(feeding_activities[i].timestamp)
-            diff = (ts2 - ts1).total_seconds() / 3600
-            intervals.append(diff)
-        
-        if not intervals:
-            return {"has_prediction": False}
+        intervals = np.diff(feeding_ts) / US_PER_HOUR
         
         avg_interval = np.mean(intervals)
         std_interval = np.std(intervals) if len(intervals) > 1 else 0
         
-        last_feeding_ts = make_aware(feeding_activities[-1].timestamp)
-        hours_since = (datetime.now(timezone.utc) - last_feeding_ts).total_seconds() / 3600
+        now = now_us()
+        last_feeding_ts = to_datetime(feeding_ts[-1])
+        hours_since = (now - feeding_ts[-1]) / US_PER_HOUR
         
-        predicted_next = last_feeding_ts + timedelta(hours=avg_interval)
-        hours_until = (predicted_next - datetime.now(timezone.utc)).total_seconds() / 3600
+        predicted_next = last_feeding_ts + timedelta(hours=float(avg_interval))
+        hours_until = avg_interval - hours_since
         
         confidence = max(0, min(100, 100 - (std_interval * 10)))
         
@@ -84,74 +74,82 @@ class MLService:
         return clean_numpy(result)
     
     @staticmethod
-    def detect_feeding_anomalies(activities: List[Activity]) -> Dict[str, Any]:
-        """Detect unusual feeding patterns using Isolation Forest"""
-        feeding_activities = [a for a in activities if a.type == 'feeding']
+    def _feeding_anomaly_features(frame: ActivityFrame) -> np.ndarray:
+        feeding = frame.of_type('feeding')
+        quantities = frame.quantity_ml[feeding]
+        # Sin cantidad registrada se asume una toma típica de 150 ml
+        return np.column_stack([frame.hour[feeding], np.where(np.isnan(quantities), 150, quantities)])
+    
+    @staticmethod
+    def fit_feeding_anomaly_model(frame: ActivityFrame) -> Optional[IsolationForest]:
+        """Fit the Isolation Forest used by detect_feeding_anomalies"""
+        if frame.of_type('feeding').sum() < 10:
+            return None
+        clf = IsolationForest(contamination=0.1, random_state=42)
+        return clf.fit(MLService._feeding_anomaly_features(frame))
+    
+    @staticmethod
+    def detect_feeding_anomalies(frame: ActivityFrame, model: Optional[IsolationForest] = None) -> Dict[str, Any]:
+        """Detect unusual feeding patterns using Isolation Forest (fitted here unless a stored model is given)"""
+        feeding = frame.of_type('feeding')
+        total_feedings = int(feeding.sum())
         
-        if len(feeding_activities) < 10:
+        if total_feedings < 10:
             return {
                 "has_analysis": False,
                 "message": "Necesitas al menos 10 registros para detección de anomalías"
             }
         
-        features = []
-        for activity in feeding_activities:
-            ts = make_aware(activity.timestamp)
-            hour = ts.hour
-            quantity = activity.data.get('quantity_ml', 150) if activity.data else 150
-            features.append([hour, quantity])
-        
-        X = np.array(features)
+        hours = frame.hour[feeding]
+        quantities = frame.quantity_ml[feeding]
+        X = MLService._feeding_anomaly_features(frame)
         
-        clf = IsolationForest(contamination=0.1, random_state=42)
-        predictions = clf.fit_predict(X)
+        if model is None:
+            model = MLService.fit_feeding_anomaly_model(frame)
+        predictions = model.predict(X)
         
         anomalies = []
-        for i, pred in enumerate(predictions):
-            if pred == -1:
-                activity = feeding_activities[i]
-                ts = make_aware(activity.timestamp)
-                anomalies.append({
-                    "timestamp": ts.isoformat(),
-                    "hour": ts.hour,
-                    "quantity_ml": activity.data.get('quantity_ml') if activity.data else None,
-                    "reason": "Patrón inusual detectado por ML"
-                })
+        for i in np.flatnonzero(predictions == -1):
+            quantity = quantities[i]
+            anomalies.append({
+                "timestamp": to_datetime(frame.ts_us[feeding][i]).isoformat(),
+                "hour": int(hours[i]),
+                "quantity_ml": None if np.isnan(quantity) else _plain_number(quantity),
+                "reason": "Patrón inusual detectado por ML"
+            })
         
         result = {
             "has_analysis": True,
-            "total_feedings": len(feeding_activities),
+            "total_feedings": total_feedings,
             "anomalies_detected": len(anomalies),
-            "anomaly_rate": round(len(anomalies) / len(feeding_activities) * 100, 1),
+            "anomaly_rate": round(len(anomalies) / total_feedings * 100, 1),
             "anomalies": anomalies[:5]
         }
         return clean_numpy(result)
     
     @staticmethod
-    def classify_sleep_quality(activities: List[Activity]) -> Dict[str, Any]:
+    def classify_sleep_quality(frame: ActivityFrame) -> Dict[str, Any]:
         """Classify sleep quality based on duration and frequency"""
-        sleep_activities = [a for a in activities if a.type == 'sleep']
+        sleep = frame.of_type('sleep')
+        total_sessions = int(sleep.sum())
         
-        if len(sleep_activities) < 5:
+        if total_sessions < 5:
             return {
                 "has_classification": False,
                 "message": "Necesitas al menos 5 registros de sueño"
             }
         
-        durations = [
-            a.data.get('duration_hours', 0) 
-            for a in sleep_activities 
-            if a.data
-        ]
+        # Los registros con datos pero sin duración cuentan como 0 horas
+        durations = np.nan_to_num(frame.duration_hours[sleep & frame.has_data])
         
-        if not durations:
+        if not len(durations):
             return {"has_classification": False}
         
         avg_duration = np.mean(durations)
-        total_sleep = sum(durations)
+        total_sleep = durations.sum()
         
-        timestamps = [make_aware(a.timestamp) for a in sleep_activities]
-        days = max(1, (max(timestamps) - min(timestamps)).days + 1)
+        timestamps = frame.ts_us[sleep]
+        days = max(1, int((timestamps.max() - timestamps.min()) // US_PER_DAY) + 1)
         sleep_per_day = total_sleep / days
         
         if sleep_per_day >= 12 and avg_duration >= 2:
@@ -178,37 +176,28 @@ class MLService:
             "color": color,
             "avg_duration_hours": round(avg_duration, 1),
             "sleep_per_day_hours": round(sleep_per_day, 1),
-            "total_sleep_sessions": len(sleep_activities),
+            "total_sleep_sessions": total_sessions,
             "recommendation": MLService._get_sleep_recommendation(quality)
         }
         return clean_numpy(result)
     
     @staticmethod
-    def predict_sleep_duration(activities: List[Activity]) -> Dict[str, Any]:
+    def predict_sleep_duration(frame: ActivityFrame) -> Dict[str, Any]:
         """Predict sleep duration based on time of day using Linear Regression"""
-        sleep_activities = [a for a in activities if a.type == 'sleep']
+        sleep = frame.of_type('sleep')
         
-        if len(sleep_activities) < 5:
+        if sleep.sum() < 5:
             return {
                 "has_prediction": False,
                 "message": "Necesitas al menos 5 registros de sueño"
             }
         
-        X = []
-        y = []
-        for activity in sleep_activities:
-            if activity.data and 'duration_hours' in activity.data:
-                ts = make_aware(activity.timestamp)
-                hour = ts.hour
-                duration = activity.data['duration_hours']
-                X.append([hour])
-                y.append(duration)
-        
-        if len(X) < 5:
+        with_duration = sleep & ~np.isnan(frame.duration_hours)
+        if with_duration.sum() < 5:
             return {"has_prediction": False}
         
-        X = np.array(X)
-        y = np.array(y)
+        X = frame.hour[with_duration].reshape(-1, 1)
+        y = frame.duration_hours[with_duration]
         
         model = LinearRegression()
         model.fit(X, y)
@@ -229,52 +218,58 @@ class MLService:
         return clean_numpy(result)
     
     @staticmethod
-    def predict_optimal_feeding_amount(activities: List[Activity]) -> Dict[str, Any]:
-        """Predict optimal feeding amount using Random Forest"""
-        feeding_activities = [a for a in activities if a.type == 'feeding']
+    def _feeding_amount_features(frame: ActivityFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """(X, y) for the feeding amount model: hour, weekday and hours since the previous feeding"""
+        feeding = frame.of_type('feeding')
+        feeding_ts = frame.ts_us[feeding]
+        quantities = frame.quantity_ml[feeding]
+        
+        # Horas desde la toma anterior (la primera toma asume 3h)
+        hours_since_last = np.empty(len(feeding_ts))
+        if len(feeding_ts):
+            hours_since_last[0] = 3.0
+            hours_since_last[1:] = np.diff(feeding_ts) / US_PER_HOUR
+        
+        with_quantity = ~np.isnan(quantities)
+        X = np.column_stack([
+            frame.hour[feeding][with_quantity],
+            frame.weekday[feeding][with_quantity],
+            hours_since_last[with_quantity]
+        ])
+        return X, quantities[with_quantity]
+    
+    @staticmethod
+    def fit_feeding_amount_model(frame: ActivityFrame) -> Optional[RandomForestRegressor]:
+        """Fit the Random Forest used by predict_optimal_feeding_amount"""
+        X, y = MLService._feeding_amount_features(frame)
+        if frame.of_type('feeding').sum() < 10 or len(y) < 10:
+            return None
+        model = RandomForestRegressor(n_estimators=50, random_state=42, max_depth=5)
+        return model.fit(X, y)
+    
+    @staticmethod
+    def predict_optimal_feeding_amount(frame: ActivityFrame, model: Optional[RandomForestRegressor] = None) -> Dict[str, Any]:
+        """Predict optimal feeding amount using Random Forest (fitted here unless a stored model is given)"""
+        feeding = frame.of_type('feeding')
         
-        if len(feeding_activities) < 10:
+        if feeding.sum() < 10:
             return {
                 "has_prediction": False,
                 "message": "Necesitas al menos 10 registros de alimentación"
             }
         
-        X = []
-        y = []
-        for i, activity in enumerate(feeding_activities):
-            if not activity.data or 'quantity_ml' not in activity.data:
-                continue
-            
-            ts = make_aware(activity.timestamp)
-            hour = ts.hour
-            day_of_week = ts.weekday()
-            
-            if i > 0:
-                ts_prev = make_aware(feeding_activities[i-1].timestamp)
-                hours_since_last = (ts - ts_prev).total_seconds() / 3600
-            else:
-                hours_since_last = 3.0
-            
-            X.append([hour, day_of_week, hours_since_last])
-            y.append(activity.data['quantity_ml'])
-        
-        if len(X) < 10:
+        feeding_ts = frame.ts_us[feeding]
+        X, y = MLService._feeding_amount_features(frame)
+        if len(y) < 10:
             return {"has_prediction": False}
         
-        X = np.array(X)
-        y = np.array(y)
-        
-        model = RandomForestRegressor(n_estimators=50, random_state=42, max_depth=5)
-        model.fit(X, y)
+        if model is None:
+            model = MLService.fit_feeding_amount_model(frame)
         
-        current_hour = datetime.now(timezone.utc).hour
-        current_day = datetime.now(timezone.utc).weekday()
-        
-        if feeding_activities:
-            last_feeding_ts = make_aware(max(feeding_activities, key=lambda x: x.timestamp).timestamp)
-            hours_since = (datetime.now(timezone.utc) - last_feeding_ts).total_seconds() / 3600
-        else:
-            hours_since = 3.0
+        now = datetime.now(timezone.utc)
+        current_hour = now.hour
+        current_day = now.weekday()
+        hours_since = (to_us(now) - feeding_ts[-1]) / US_PER_HOUR
         
         predicted_amount = model.predict([[current_hour, current_day, hours_since]])[0]
         
@@ -295,56 +290,56 @@ class MLService:
         return clean_numpy(result)
     
     @staticmethod
-    def identify_routine_clusters(activities: List[Activity]) -> Dict[str, Any]:
-        """Identify daily routine patterns using K-Means clustering"""
-        if len(activities) < 20:
+    def _routine_features(daily: DailyStats) -> np.ndarray:
+        """Feeding count, sleep hours and diaper count per day, in day order"""
+        return np.array([
+            [pattern['feeding_count'], pattern['sleep_hours'], pattern['diaper_count']]
+            for _, pattern in sorted(daily.items())
+        ])
+    
+    @staticmethod
+    def fit_routine_model(frame: ActivityFrame, daily: DailyStats = None) -> Optional[Tuple[StandardScaler, KMeans]]:
+        """Fit the scaler + K-Means used by identify_routine_clusters"""
+        if daily is None:
+            daily = frame.daily_stats()
+        if sum(day['total_activities'] for day in daily.values()) < 20 or len(daily) < 3:
+            return None
+        
+        X = MLService._routine_features(daily)
+        scaler = StandardScaler()
+        X_scaled = scaler.fit_transform(X)
+        kmeans = KMeans(n_clusters=min(3, len(X)), random_state=42, n_init=10)
+        kmeans.fit(X_scaled)
+        return scaler, kmeans
+    
+    @staticmethod
+    def identify_routine_clusters(
+        frame: ActivityFrame,
+        daily: DailyStats = None,
+        model: Optional[Tuple[StandardScaler, KMeans]] = None
+    ) -> Dict[str, Any]:
+        """Identify daily routine patterns using K-Means clustering (fitted here unless a stored model is given)"""
+        if daily is None:
+            daily = frame.daily_stats()
+        
+        if sum(day['total_activities'] for day in daily.values()) < 20:
             return {
                 "has_analysis": False,
                 "message": "Necesitas al menos 20 registros para análisis de rutinas"
             }
         
-        daily_patterns = {}
-        for activity in activities:
-            ts = make_aware(activity.timestamp)
-            date_key = ts.date()
-            if date_key not in daily_patterns:
-                daily_patterns[date_key] = {
-                    'feeding_count': 0,
-                    'sleep_hours': 0,
-                    'diaper_count': 0,
-                    'total_activities': 0
-                }
-            
-            daily_patterns[date_key]['total_activities'] += 1
-            
-            if activity.type == 'feeding':
-                daily_patterns[date_key]['feeding_count'] += 1
-            elif activity.type == 'sleep' and activity.data:
-                daily_patterns[date_key]['sleep_hours'] += activity.data.get('duration_hours', 0)
-            elif activity.type == 'diaper':
-                daily_patterns[date_key]['diaper_count'] += 1
-        
+        daily_patterns = dict(sorted(daily.items()))
         if len(daily_patterns) < 3:
             return {"has_analysis": False}
         
-        X = []
-        dates = []
-        for date, pattern in daily_patterns.items():
-            X.append([
-                pattern['feeding_count'],
-                pattern['sleep_hours'],
-                pattern['diaper_count']
-            ])
-            dates.append(date)
-        
-        X = np.array(X)
+        X = MLService._routine_features(daily_patterns)
         
-        scaler = StandardScaler()
-        X_scaled = scaler.fit_transform(X)
+        if model is None:
+            model = MLService.fit_routine_model(frame, daily_patterns)
+        scaler, kmeans = model
         
-        n_clusters = min(3, len(X))
-        kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
-        labels = kmeans.fit_predict(X_scaled)
+        n_clusters = kmeans.n_clusters
+        labels = kmeans.predict(scaler.transform(X))
         
         clusters_info = []
         for i in range(n_clusters):
@@ -388,43 +383,27 @@ class MLService:
         return clean_numpy(result)
     
     @staticmethod
-    def analyze_feeding_sleep_correlation(activities: List[Activity]) -> Dict[str, Any]:
+    def analyze_feeding_sleep_correlation(frame: ActivityFrame, daily: DailyStats = None) -> Dict[str, Any]:
         """Analyze correlation between feeding and sleep patterns"""
-        feeding_activities = [a for a in activities if a.type == 'feeding']
-        sleep_activities = [a for a in activities if a.type == 'sleep']
+        if daily is None:
+            daily = frame.daily_stats()
+        
+        feeding_total = sum(day['feeding_count'] for day in daily.values())
+        sleep_total = sum(day['sleep_count'] for day in daily.values())
         
-        if len(feeding_activities) < 5 or len(sleep_activities) < 5:
+        if feeding_total < 5 or sleep_total < 5:
             return {
                 "has_analysis": False,
                 "message": "Necesitas al menos 5 registros de cada tipo"
             }
         
-        daily_data = {}
-        
-        for activity in feeding_activities:
-            ts = make_aware(activity.timestamp)
-            date_key = ts.date()
-            if date_key not in daily_data:
-                daily_data[date_key] = {'feeding_count': 0, 'feeding_amount': 0, 'sleep_hours': 0}
-            daily_data[date_key]['feeding_count'] += 1
-            if activity.data and 'quantity_ml' in activity.data:
-                daily_data[date_key]['feeding_amount'] += activity.data['quantity_ml']
-        
-        for activity in sleep_activities:
-            ts = make_aware(activity.timestamp)
-            date_key = ts.date()
-            if date_key not in daily_data:
-                daily_data[date_key] = {'feeding_count': 0, 'feeding_amount': 0, 'sleep_hours': 0}
-            if activity.data:
-                daily_data[date_key]['sleep_hours'] += activity.data.get('duration_hours', 0)
-        
-        valid_days = {k: v for k, v in daily_data.items() if v['feeding_count'] > 0 and v['sleep_hours'] > 0}
+        valid_days = {k: v for k, v in sorted(daily.items()) if v['feeding_count'] > 0 and v['sleep_hours'] > 0}
         
         if len(valid_days) < 3:
             return {"has_analysis": False}
         
         feeding_counts = [v['feeding_count'] for v in valid_days.values()]
-        feeding_amounts = [v['feeding_amount'] for v in valid_days.values()]
+        feeding_amounts = [v['feeding_ml'] for v in valid_days.values()]
         sleep_hours = [v['sleep_hours'] for v in valid_days.values()]
         
         corr_count, p_count = pearsonr(feeding_counts, sleep_hours) if len(feeding_counts) > 2 else (0, 1)
@@ -466,36 +445,25 @@ class MLService:
         return clean_numpy(result)
     
     @staticmethod
-    def predict_diaper_change(activities: List[Activity]) -> Dict[str, Any]:
+    def predict_diaper_change(frame: ActivityFrame) -> Dict[str, Any]:
         """Predict next diaper change"""
-        diaper_activities = [a for a in activities if a.type == 'diaper']
+        diaper_ts = frame.ts_us[frame.of_type('diaper')]
         
-        if len(diaper_activities) < 5:
+        if len(diaper_ts) < 5:
             return {
                 "has_prediction": False,
                 "message": "Necesitas al menos 5 registros de pañal"
             }
         
-        diaper_activities.sort(key=lambda x: x.timestamp)
-        intervals = []
-        for i in range(1, len(diaper_activities)):
-            ts1 = make_aware(diaper_activities[i-1].timestamp)
-            ts2 = make_aware(diaper_activities[i].timestamp)
-            hours = (ts2 - ts1).total_seconds() / 3600
-            intervals.append(hours)
-        
-        if not intervals:
-            return {"has_prediction": False}
+        intervals = np.diff(diaper_ts) / US_PER_HOUR
         
         avg_interval = np.mean(intervals)
-        std_interval = np.std(intervals) if len(intervals) > 1 else 0
         
-        last_diaper = diaper_activities[-1]
-        last_diaper_time = make_aware(last_diaper.timestamp)
-        hours_since = (datetime.now(timezone.utc) - last_diaper_time).total_seconds() / 3600
+        last_diaper_time = to_datetime(diaper_ts[-1])
+        hours_since = (now_us() - diaper_ts[-1]) / US_PER_HOUR
         
-        predicted_next = last_diaper_time + timedelta(hours=avg_interval)
-        minutes_until = (predicted_next - datetime.now(timezone.utc)).total_seconds() / 60
+        predicted_next = last_diaper_time + timedelta(hours=float(avg_interval))
+        minutes_until = (avg_interval - hours_since) * 60
         
         if hours_since >= avg_interval:
             probability = min(95, 50 + (hours_since - avg_interval) * 20)
@@ -514,36 +482,24 @@ class MLService:
         return clean_numpy(result)
     
     @staticmethod
-    def forecast_next_week(activities: List[Activity]) -> Dict[str, Any]:
+    def forecast_next_week(frame: ActivityFrame, daily: DailyStats = None) -> Dict[str, Any]:
         """Forecast patterns for the next week using time series analysis"""
-        if len(activities) < 14:
+        daily_counts = daily if daily is not None else frame.daily_stats()
+        
+        if sum(day['total_activities'] for day in daily_counts.values()) < 14:
             return {
                 "has_forecast": False,
                 "message": "Necesitas al menos 14 días de datos para forecasting"
             }
         
-        daily_counts = {}
-        for activity in activities:
-            ts = make_aware(activity.timestamp)
-            date_key = ts.date()
-            if date_key not in daily_counts:
-                daily_counts[date_key] = {'feeding': 0, 'sleep_hours': 0, 'diaper': 0}
-            
-            if activity.type == 'feeding':
-                daily_counts[date_key]['feeding'] += 1
-            elif activity.type == 'sleep' and activity.data:
-                daily_counts[date_key]['sleep_hours'] += activity.data.get('duration_hours', 0)
-            elif activity.type == 'diaper':
-                daily_counts[date_key]['diaper'] += 1
-        
         if len(daily_counts) < 7:
             return {"has_forecast": False}
         
         sorted_dates = sorted(daily_counts.keys())
         
-        feeding_values = [daily_counts[d]['feeding'] for d in sorted_dates]
+        feeding_values = [daily_counts[d]['feeding_count'] for d in sorted_dates]
         sleep_values = [daily_counts[d]['sleep_hours'] for d in sorted_dates]
-        diaper_values = [daily_counts[d]['diaper'] for d in sorted_dates]
+        diaper_values = [daily_counts[d]['diaper_count'] for d in sorted_dates]
         
         window = min(7, len(feeding_values))
         
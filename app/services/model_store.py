@@ -0,0 +1,114 @@
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+import json
+import logging
+import os
+import shutil
+import tempfile
+import joblib
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ModelStore:
+    """Fitted per-baby models on local disk, reused until enough new data arrives"""
+
+    def __init__(self, root: str, min_new_samples: int, max_age_hours: float, train_on_request: bool = True):
+        self.root = Path(root)
+        # False cuando el scheduler de entrenamiento mantiene los modelos: las peticiones solo leen
+        self.train_on_request = train_on_request
+        self.min_new_samples = min_new_samples
+        self.max_age_hours = max_age_hours
+        self.hits = 0
+        self.trained = 0
+
+    def _paths(self, baby_id: int, name: str):
+        folder = self.root / f"baby_{baby_id}"
+        return folder / f"{name}.joblib", folder / f"{name}.json"
+
+    def _read_meta(self, meta_path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(meta_path.read_text())
+        except (OSError, ValueError):
+            return None
+
+    def _is_fresh(self, meta: Dict[str, Any], data_version: int, n_samples: int) -> bool:
+        if meta["data_version"] == data_version:
+            return True
+        age_hours = (datetime.now(timezone.utc).timestamp() - meta["trained_at"]) / 3600
+        new_samples = abs(n_samples - meta["n_samples"])
+        return age_hours < self.max_age_hours and new_samples < self.min_new_samples
+
+    def _write(self, path: Path, write: Callable[[str], None]) -> None:
+        # Escritura atómica: otro proceso nunca lee un fichero a medias
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        os.close(fd)
+        try:
+            write(tmp)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def get_or_train(
+        self,
+        baby_id: int,
+        name: str,
+        data_version: int,
+        n_samples: int,
+        train: Callable[[], Any]
+    ) -> Any:
+        """Stored model when still fresh (or always, if requests only read), otherwise train(), store and return it"""
+        model_path, meta_path = self._paths(baby_id, name)
+        meta = self._read_meta(meta_path)
+
+        usable = meta is not None and (not self.train_on_request or self._is_fresh(meta, data_version, n_samples))
+        if usable and model_path.exists():
+            try:
+                # mmap: los arrays del modelo se leen de disco bajo demanda
+                model = joblib.load(model_path, mmap_mode="r")
+                self.hits += 1
+                return model
+            except Exception:
+                logger.exception("Could not load stored model %s", model_path)
+
+        model = train()
+        self.save(baby_id, name, data_version, n_samples, model)
+        return model
+
+    def save(self, baby_id: int, name: str, data_version: int, n_samples: int, model: Any) -> None:
+        """Store a freshly trained model (None means not enough data: nothing is stored)"""
+        self.trained += 1
+        if model is None:
+            return
+
+        model_path, meta_path = self._paths(baby_id, name)
+        model_path.parent.mkdir(parents=True, exist_ok=True)
+        self._write(model_path, lambda tmp: joblib.dump(model, tmp))
+        meta = {
+            "data_version": data_version,
+            "n_samples": n_samples,
+            "trained_at": datetime.now(timezone.utc).timestamp(),
+        }
+        self._write(meta_path, lambda tmp: Path(tmp).write_text(json.dumps(meta)))
+
+    def remove_baby(self, baby_id: int) -> None:
+        """Drop every stored model of a deleted baby"""
+        shutil.rmtree(self.root / f"baby_{baby_id}", ignore_errors=True)
+
+    def stats(self) -> dict:
+        return {
+            "root": str(self.root),
+            "hits": self.hits,
+            "trained": self.trained,
+        }
+
+
+model_store = ModelStore(
+    settings.MODEL_STORE_DIR,
+    settings.MODEL_RETRAIN_MIN_NEW_SAMPLES,
+    settings.MODEL_MAX_AGE_HOURS,
+    settings.ML_TRAIN_ON_REQUEST
+)
@@ -1,59 +1,84 @@
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import cm
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, LongTable
 from reportlab.pdfgen import canvas
+from reportlab.pdfbase.pdfmetrics import stringWidth
 from datetime import datetime
-from io import BytesIO
-from typing import List
+from tempfile import SpooledTemporaryFile
+from typing import BinaryIO, List, Optional
+from ..core.config import settings
 from ..models.baby import Baby
 from ..models.activity import Activity
+from .rollup_service import DailyStats, aggregate_daily
+from .report_template import (
+    ACTIVITY_TYPE_LABELS, FEEDING_STYLE, FEEDING_WIDTHS, FOOTER_STYLE, FOOTER_WIDTHS, HEADING_STYLE,
+    HEALTH_STYLE, HEALTH_WIDTHS, OBSERVATION_STYLE, OBSERVATIONS_STYLE, OBSERVATIONS_WIDTHS,
+    PATIENT_HEADER_STYLE, PATIENT_HEADER_WIDTHS, PATIENT_STYLE, PATIENT_WIDTHS, PRIMARY,
+    SLEEP_STYLE, SLEEP_WIDTHS, STATS_STYLE, STATS_WIDTHS, SUBTITLE_STYLE, TITLE_STYLE,
+)
+
+
+PAGE_TOTAL_FORM = "PageTotal"
+# Hueco reservado para el total de páginas ("Página X de " se alinea a su izquierda)
+PAGE_TOTAL_WIDTH = stringWidth("999", "Helvetica", 9)
 
 
 class NumberedCanvas(canvas.Canvas):
     """Canvas personalizado con número de página y header"""
-    def __init__(self, *args, **kwargs):
-        canvas.Canvas.__init__(self, *args, **kwargs)
-        self._saved_page_states = []
 
     def showPage(self):
-        self._saved_page_states.append(dict(self.__dict__))
-        self._startPage()
+        self.draw_page_number()
+        canvas.Canvas.showPage(self)
 
     def save(self):
-        num_pages = len(self._saved_page_states)
-        for state in self._saved_page_states:
-            self.__dict__.update(state)
-            self.draw_page_number(num_pages)
-            canvas.Canvas.showPage(self)
+        # El total se dibuja en un form XObject que todas las páginas referencian
+        # y que se define al final: no hace falta guardar el estado de cada página
+        self.beginForm(PAGE_TOTAL_FORM)
+        self.setFont('Helvetica', 9)
+        self.setFillColor(colors.grey)
+        self.drawString(0, 0, str(self._pageNumber - 1))
+        self.endForm()
         canvas.Canvas.save(self)
 
-    def draw_page_number(self, page_count):
+    def draw_page_number(self):
         # Header con línea decorativa
-        self.setStrokeColor(colors.HexColor('#6BA3E8'))
+        self.setStrokeColor(PRIMARY)
         self.setLineWidth(2)
         self.line(2*cm, A4[1] - 1.5*cm, A4[0] - 2*cm, A4[1] - 1.5*cm)
         
         # Footer con número de página
         self.setFont('Helvetica', 9)
         self.setFillColor(colors.grey)
-        page_num = f"Página {self._pageNumber} de {page_count}"
-        self.drawRightString(A4[0] - 2*cm, 1.5*cm, page_num)
+        total_x = A4[0] - 2*cm - PAGE_TOTAL_WIDTH
+        self.drawRightString(total_x, 1.5*cm, f"Página {self._pageNumber} de ")
+        self.saveState()
+        self.translate(total_x, 1.5*cm)
+        self.doForm(PAGE_TOTAL_FORM)
+        self.restoreState()
         
         # Logo/Marca BabyCare
         self.setFont('Helvetica-Bold', 10)
-        self.setFillColor(colors.HexColor('#6BA3E8'))
+        self.setFillColor(PRIMARY)
         self.drawString(2*cm, 1.5*cm, "BabyCare")
 
 
-def generate_pediatric_report(baby: Baby, activities: List[Activity], start_date: datetime, end_date: datetime) -> BytesIO:
+def generate_pediatric_report(
+    baby: Baby,
+    activities: List[Activity],
+    start_date: datetime,
+    end_date: datetime,
+    daily: Optional[DailyStats] = None
+) -> BinaryIO:
     """
-    Genera un informe médico premium en PDF para el pediatra
+    Genera un informe médico premium en PDF para el pediatra.
+
+    Devuelve un fichero temporal (en memoria hasta REPORT_SPOOL_MAX_BYTES,
+    en disco a partir de ahí) posicionado al inicio; quien lo lee lo cierra.
+    Los estilos vienen de report_template y no se reconstruyen en cada informe.
     """
     
-    buffer = BytesIO()
+    buffer = SpooledTemporaryFile(max_size=settings.REPORT_SPOOL_MAX_BYTES)
     doc = SimpleDocTemplate(
         buffer, 
         pagesize=A4, 
@@ -63,58 +88,6 @@ def generate_pediatric_report(baby: Baby, activities: List[Activity], start_date
         rightMargin=2*cm
     )
     
-    styles = getSampleStyleSheet()
-    
-    # ========== ESTILOS PERSONALIZADOS PREMIUM ==========
-    
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=28,
-        textColor=colors.HexColor('#6BA3E8'),
-        spaceAfter=10,
-        spaceBefore=20,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold',
-        leading=34
-    )
-    
-    subtitle_style = ParagraphStyle(
-        'CustomSubtitle',
-        parent=styles['Normal'],
-        fontSize=12,
-        textColor=colors.HexColor('#666666'),
-        spaceAfter=30,
-        alignment=TA_CENTER,
-        fontName='Helvetica',
-    )
-    
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=16,
-        textColor=colors.HexColor('#1A1A1A'),
-        spaceAfter=16,
-        spaceBefore=20,
-        fontName='Helvetica-Bold',
-        borderWidth=0,
-        borderColor=colors.HexColor('#6BA3E8'),
-        borderPadding=8,
-        backColor=colors.HexColor('#F0F7FF'),
-        leftIndent=10
-    )
-    
-    observation_style = ParagraphStyle(
-        'ObservationStyle',
-        parent=styles['Normal'],
-        fontSize=9,
-        textColor=colors.HexColor('#1A1A1A'),
-        fontName='Helvetica',
-        leading=12,
-        leftIndent=5,
-        rightIndent=5
-    )
-    
     # ========== CONTENIDO DEL PDF ==========
     story = []
     
@@ -122,8 +95,8 @@ def generate_pediatric_report(baby: Baby, activities: List[Activity], start_date
     story.append(Spacer(1, 2*cm))
     
     # Título principal con diseño moderno
-    story.append(Paragraph("INFORME PEDIÁTRICO", title_style))
-    story.append(Paragraph("Registro de Cuidado Infantil", subtitle_style))
+    story.append(Paragraph("INFORME PEDIÁTRICO", TITLE_STYLE))
+    story.append(Paragraph("Registro de Cuidado Infantil", SUBTITLE_STYLE))
     
     # Caja decorativa con información del bebé
     story.append(Spacer(1, 1*cm))
@@ -155,63 +128,38 @@ def generate_pediatric_report(baby: Baby, activities: List[Activity], start_date
         ["Período del informe:", f"{start_date.strftime('%d/%m/%Y')} - {end_date.strftime('%d/%m/%Y')}"]
     ]
     
-    # Tabla de encabezado
-    header_table = Table(patient_info, colWidths=[15*cm])
-    header_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#6BA3E8')),
-        ('TEXTCOLOR', (0, 0), (-1, -1), colors.white),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 14),
-        ('TOPPADDING', (0, 0), (-1, -1), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-    ]))
-    
-    story.append(header_table)
-    
-    # Tabla de datos del paciente
-    patient_table = Table(patient_data, colWidths=[5*cm, 10*cm])
-    patient_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#E8F4F8')),
-        ('BACKGROUND', (1, 0), (1, -1), colors.white),
-        ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#1A1A1A')),
-        ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
-        ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 11),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
-        ('TOPPADDING', (0, 0), (-1, -1), 10),
-        ('LEFTPADDING', (0, 0), (-1, -1), 12),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 12),
-        ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#D0E8F2')),
-        ('LINEBELOW', (0, 0), (-1, -2), 0.5, colors.HexColor('#E8F4F8')),
-    ]))
-    
-    story.append(patient_table)
+    story.append(Table(patient_info, colWidths=PATIENT_HEADER_WIDTHS, style=PATIENT_HEADER_STYLE))
+    story.append(Table(patient_data, colWidths=PATIENT_WIDTHS, style=PATIENT_STYLE))
     story.append(Spacer(1, 1.5*cm))
     
     # ========== RESUMEN ESTADÍSTICO ==========
-    story.append(Paragraph("RESUMEN ESTADÍSTICO", heading_style))
+    story.append(Paragraph("RESUMEN ESTADÍSTICO", HEADING_STYLE))
     story.append(Spacer(1, 0.3*cm))
     
-    # Calcular estadísticas
-    feeding_count = len([a for a in activities if a.type == "feeding"])
-    feeding_total_ml = sum([
-        a.data.get('quantity_ml', 0) 
-        for a in activities 
-        if a.type == 'feeding' and a.data
-    ])
-    
-    sleep_activities = [a for a in activities if a.type == "sleep"]
-    sleep_total_hours = sum([
-        a.data.get('duration_hours', 0) 
-        for a in sleep_activities 
-        if a.data
-    ])
-    
-    diaper_count = len([a for a in activities if a.type == "diaper"])
-    health_count = len([a for a in activities if a.type == "health" or a.type == "medical"])
+    # Calcular estadísticas (a partir de los rollups diarios si se reciben)
+    if daily is None:
+        daily = aggregate_daily(activities)
+    
+    feeding_count = sum(day['feeding_count'] for day in daily.values())
+    feeding_total_ml = sum(day['feeding_ml'] for day in daily.values())
+    sleep_total_hours = sum(day['sleep_hours'] for day in daily.values())
+    diaper_count = sum(day['diaper_count'] for day in daily.values())
+    health_count = sum(day['health_count'] for day in daily.values())
+    
+    # Una sola pasada para repartir las actividades por sección
+    feeding_activities = []
+    sleep_activities = []
+    health_activities = []
+    activities_with_notes = []
+    for activity in activities:
+        if activity.type == "feeding":
+            feeding_activities.append(activity)
+        elif activity.type == "sleep":
+            sleep_activities.append(activity)
+        elif activity.type == "health" or activity.type == "medical":
+            health_activities.append(activity)
+        if activity.notes and activity.notes.strip():
+            activities_with_notes.append(activity)
     
     # Calcular promedios diarios
     days_count = max(1, (end_date - start_date).days + 1)
@@ -225,40 +173,12 @@ def generate_pediatric_report(baby: Baby, activities: List[Activity], start_date
         ["Registros de salud", str(health_count), f"{health_count/days_count:.1f}"],
     ]
     
-    stats_table = Table(stats_data, colWidths=[7*cm, 4*cm, 4*cm])
-    stats_table.setStyle(TableStyle([
-        # Header
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#6BA3E8')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('TOPPADDING', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        
-        # Body
-        ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F9FAFB')]),
-        ('TEXTCOLOR', (0, 1), (-1, -1), colors.HexColor('#1A1A1A')),
-        ('FONTNAME', (0, 1), (0, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (1, 1), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 1), (-1, -1), 10),
-        ('TOPPADDING', (0, 1), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 1), (-1, -1), 10),
-        
-        # Borders
-        ('BOX', (0, 0), (-1, -1), 1.5, colors.HexColor('#6BA3E8')),
-        ('LINEBELOW', (0, 0), (-1, 0), 1.5, colors.white),
-        ('INNERGRID', (0, 1), (-1, -1), 0.5, colors.HexColor('#E5E7EB')),
-    ]))
-    
-    story.append(stats_table)
+    story.append(Table(stats_data, colWidths=STATS_WIDTHS, style=STATS_STYLE))
     story.append(Spacer(1, 1*cm))
     
     # ========== DETALLE DE ALIMENTACIÓN ==========
-    feeding_activities = [a for a in activities if a.type == "feeding"]
     if feeding_activities:
-        story.append(Paragraph("DETALLE DE ALIMENTACIÓN", heading_style))
+        story.append(Paragraph("DETALLE DE ALIMENTACIÓN", HEADING_STYLE))
         story.append(Spacer(1, 0.3*cm))
         
         data = [['Fecha/Hora', 'Tipo', 'Cantidad', 'Notas']]
@@ -276,38 +196,12 @@ def generate_pediatric_report(baby: Baby, activities: List[Activity], start_date
                 notes
             ])
         
-        table = Table(data, colWidths=[3.5*cm, 3.5*cm, 2.5*cm, 5.5*cm])
-        table.setStyle(TableStyle([
-            # Header
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4CAF50')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('ALIGN', (2, 0), (2, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('TOPPADDING', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-            
-            # Body
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F1F8F4')]),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('TOPPADDING', (0, 1), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
-            ('LEFTPADDING', (0, 0), (-1, -1), 8),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-            
-            # Borders
-            ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#4CAF50')),
-            ('LINEBELOW', (0, 0), (-1, 0), 1.5, colors.white),
-            ('INNERGRID', (0, 1), (-1, -1), 0.5, colors.HexColor('#E8F5E9')),
-        ]))
-        
-        story.append(table)
+        story.append(Table(data, colWidths=FEEDING_WIDTHS, style=FEEDING_STYLE))
         story.append(Spacer(1, 0.8*cm))
     
     # ========== DETALLE DE SUEÑO ==========
     if sleep_activities:
-        story.append(Paragraph("DETALLE DE SUEÑO", heading_style))
+        story.append(Paragraph("DETALLE DE SUEÑO", HEADING_STYLE))
         story.append(Spacer(1, 0.3*cm))
         
         data = [['Fecha/Hora', 'Duración', 'Notas']]
@@ -322,39 +216,12 @@ def generate_pediatric_report(baby: Baby, activities: List[Activity], start_date
                 notes
             ])
         
-        table = Table(data, colWidths=[3.5*cm, 2.5*cm, 9*cm])
-        table.setStyle(TableStyle([
-            # Header
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#9C27B0')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('ALIGN', (1, 0), (1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('TOPPADDING', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-            
-            # Body
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F3E5F5')]),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('TOPPADDING', (0, 1), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
-            ('LEFTPADDING', (0, 0), (-1, -1), 8),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-            
-            # Borders
-            ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#9C27B0')),
-            ('LINEBELOW', (0, 0), (-1, 0), 1.5, colors.white),
-            ('INNERGRID', (0, 1), (-1, -1), 0.5, colors.HexColor('#E1BEE7')),
-        ]))
-        
-        story.append(table)
+        story.append(Table(data, colWidths=SLEEP_WIDTHS, style=SLEEP_STYLE))
         story.append(Spacer(1, 0.8*cm))
     
     # ========== REGISTROS DE SALUD ==========
-    health_activities = [a for a in activities if a.type == "health" or a.type == "medical"]
     if health_activities:
-        story.append(Paragraph("REGISTROS DE SALUD Y MEDICAMENTOS", heading_style))
+        story.append(Paragraph("REGISTROS DE SALUD Y MEDICAMENTOS", HEADING_STYLE))
         story.append(Spacer(1, 0.3*cm))
         
         data = [['Fecha/Hora', 'Tipo', 'Detalles']]
@@ -383,69 +250,24 @@ def generate_pediatric_report(baby: Baby, activities: List[Activity], start_date
                 detail_str if detail_str else notes
             ])
         
-        table = Table(data, colWidths=[3.5*cm, 3*cm, 8.5*cm])
-        table.setStyle(TableStyle([
-            # Header
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#FF5252')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('TOPPADDING', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-            
-            # Body
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#FFEBEE')]),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('TOPPADDING', (0, 1), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
-            ('LEFTPADDING', (0, 0), (-1, -1), 8),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-            
-            # Borders
-            ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#FF5252')),
-            ('LINEBELOW', (0, 0), (-1, 0), 1.5, colors.white),
-            ('INNERGRID', (0, 1), (-1, -1), 0.5, colors.HexColor('#FFCDD2')),
-        ]))
-        
-        story.append(table)
+        # Sin límite de filas: LongTable parte la tabla entre páginas sin recalcular todas las filas restantes
+        story.append(LongTable(data, colWidths=HEALTH_WIDTHS, style=HEALTH_STYLE, repeatRows=1))
         story.append(Spacer(1, 0.8*cm))
     
     # ========== OBSERVACIONES IMPORTANTES ==========
-    activities_with_notes = [a for a in activities if a.notes and a.notes.strip()]
     if activities_with_notes:
-        story.append(Paragraph("OBSERVACIONES IMPORTANTES", heading_style))
+        story.append(Paragraph("OBSERVACIONES IMPORTANTES", HEADING_STYLE))
         story.append(Spacer(1, 0.3*cm))
         
+        # Una sola tabla con una fila por observación
+        rows = []
         for activity in activities_with_notes[:8]:
             date_str = activity.timestamp.strftime('%d/%m/%Y %H:%M')
-            type_labels = {
-                'feeding': 'Alimentación',
-                'sleep': 'Sueño',
-                'diaper': 'Pañal',
-                'health': 'Salud',
-                'medical': 'Médico'
-            }
-            type_label = type_labels.get(activity.type, activity.type)
-            
-            # Crear caja de observación con mejor manejo de texto
+            type_label = ACTIVITY_TYPE_LABELS.get(activity.type, activity.type)
             obs_text = f"<b>{date_str} - {type_label}:</b><br/>{activity.notes}"
-            
-            obs_data = [[Paragraph(obs_text, observation_style)]]
-            obs_table = Table(obs_data, colWidths=[15*cm])
-            obs_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (0, 0), colors.HexColor('#F9FAFB')),
-                ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#1A1A1A')),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                ('TOPPADDING', (0, 0), (-1, -1), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
-                ('LEFTPADDING', (0, 0), (-1, -1), 10),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 10),
-                ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#D0E8F2')),
-            ]))
-            story.append(obs_table)
-            story.append(Spacer(1, 0.4*cm))
+            rows.append([Paragraph(obs_text, OBSERVATION_STYLE)])
+        
+        story.append(Table(rows, colWidths=OBSERVATIONS_WIDTHS, style=OBSERVATIONS_STYLE))
     
     # ========== PIE DE PÁGINA ==========
     story.append(Spacer(1, 1*cm))
@@ -453,22 +275,13 @@ def generate_pediatric_report(baby: Baby, activities: List[Activity], start_date
     footer_data = [[
         f"Informe generado el {datetime.now().strftime('%d/%m/%Y a las %H:%M')} | BabyCare - Aplicación de seguimiento infantil",
     ]]
+    story.append(Table(footer_data, colWidths=FOOTER_WIDTHS, style=FOOTER_STYLE))
     
-    footer_table = Table(footer_data, colWidths=[15*cm])
-    footer_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#F0F7FF')),
-        ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#666666')),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('TOPPADDING', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
-        ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#D0E8F2')),
-    ]))
-    story.append(footer_table)
-    
-
-    doc.build(story, canvasmaker=NumberedCanvas)
+    try:
+        doc.build(story, canvasmaker=NumberedCanvas)
+    except BaseException:
+        buffer.close()
+        raise
     buffer.seek(0)
     
-    return buffer
\ No newline at end of file
+    return buffer
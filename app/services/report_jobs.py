@@ -0,0 +1,249 @@
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime, time as day_time, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..models.activity import Activity
+from ..models.baby import Baby
+from .activity_writes import get_data_version
+from .pdf_generator import generate_pediatric_report
+from .report_template import REPORT_TEMPLATE_VERSION
+from .rollup_service import DailyStats, load_daily_stats
+
+logger = logging.getLogger(__name__)
+
+# Trabajos terminados que se recuerdan para consultar su estado
+FINISHED_JOBS_MAX_SIZE = 1000
+FINISHED_JOBS_TTL_SECONDS = 3600
+
+
+class ReportBaby(NamedTuple):
+    name: str
+    birth_date: date
+
+
+class ReportActivity(NamedTuple):
+    type: str
+    timestamp: datetime
+    data: Optional[Dict[str, Any]]
+    notes: Optional[str]
+
+
+def report_window(days: int) -> Tuple[datetime, datetime]:
+    """Whole UTC days ending today, so every download of the same day shares one PDF"""
+    today = datetime.now(timezone.utc).date()
+    return datetime.combine(today - timedelta(days=days), day_time.min), datetime.combine(today, day_time.max)
+
+
+def report_key(baby_id: int, baby: ReportBaby, start_date: datetime, end_date: datetime, data_version: int) -> str:
+    """Content address of a report: same inputs, same PDF"""
+    # Nombre y fecha de nacimiento salen en el PDF y editarlos no cambia data_version
+    raw = (
+        f"{baby_id}:{baby.name}:{baby.birth_date}:{start_date.date()}:{end_date.date()}:"
+        f"{data_version}:{REPORT_TEMPLATE_VERSION}"
+    )
+    return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+
+def current_report_key(baby: Baby, days: int) -> str:
+    """Key of the report a request for the last ``days`` days gets right now (also its ETag)"""
+    start_date, end_date = report_window(days)
+    return report_key(baby.id, ReportBaby(baby.name, baby.birth_date), start_date, end_date, baby.data_version or 0)
+
+
+def _render_report(
+    path: str,
+    baby: ReportBaby,
+    activities: List[ReportActivity],
+    start_date: datetime,
+    end_date: datetime,
+    daily: DailyStats
+) -> int:
+    """Render a report straight into the store (runs in a worker process); returns its size"""
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    report = generate_pediatric_report(baby, activities, start_date, end_date, daily)
+    # Escritura atómica: nunca se sirve un PDF a medias
+    fd, tmp = tempfile.mkstemp(dir=target.parent, suffix=".tmp")
+    try:
+        with report, os.fdopen(fd, "wb") as out:
+            shutil.copyfileobj(report, out)
+        os.replace(tmp, target)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    return target.stat().st_size
+
+
+class ReportJobs:
+    """Renders PDF reports in a worker pool and keeps them on disk by content address"""
+
+    def __init__(self, root: str, max_workers: int, max_age_hours: float):
+        self.root = Path(root)
+        self.max_workers = max_workers
+        self.max_age_hours = max_age_hours
+        self.cache_hits = 0
+        self.completed = 0
+        self.failures = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # job_id -> (estado, futuro que se resuelve al terminar) de los trabajos en curso
+        self._running: Dict[str, Tuple[Dict[str, Any], asyncio.Future]] = {}
+        # Referencias a las tareas de renderizado (el event loop solo guarda referencias débiles)
+        self._tasks: Set[asyncio.Task] = set()
+        self._finished = TTLCache(FINISHED_JOBS_MAX_SIZE, FINISHED_JOBS_TTL_SECONDS)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def artifact_path(self, baby_id: int, job_id: str) -> Path:
+        return self.root / f"baby_{baby_id}" / f"{job_id}.pdf"
+
+    def _prune(self, baby_id: int) -> None:
+        # Los PDFs de versiones de datos antiguas ya no se piden: se borran al caducar
+        cutoff = time.time() - self.max_age_hours * 3600
+        for path in (self.root / f"baby_{baby_id}").glob("*.pdf"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                pass
+
+    async def submit(self, db: AsyncSession, baby: Baby, days: int) -> Dict[str, Any]:
+        """Job for a report of the last ``days`` days: already done if that PDF exists, shared if in progress"""
+        start_date, end_date = report_window(days)
+        report_baby = ReportBaby(baby.name, baby.birth_date)
+        data_version = await get_data_version(db, baby.id)
+        job_id = report_key(baby.id, report_baby, start_date, end_date, data_version)
+
+        if job_id in self._running:
+            return self._running[job_id][0]
+
+        job = {
+            "id": job_id,
+            "baby_id": baby.id,
+            "status": "pending",
+            "days": days,
+            "start_date": start_date.date(),
+            "end_date": end_date.date(),
+            "data_version": data_version,
+            "size": None,
+            "error": None,
+        }
+        path = self.artifact_path(baby.id, job_id)
+        if path.exists():
+            self.cache_hits += 1
+            job.update(status="done", size=path.stat().st_size)
+            self._finished.set(job_id, job)
+            return job
+
+        # Se registra antes de cargar los datos: las peticiones simultáneas del mismo informe
+        # esperan a este trabajo en vez de renderizar cada una su PDF
+        finished = asyncio.get_running_loop().create_future()
+        self._running[job_id] = (job, finished)
+        try:
+            rows = (await db.execute(select(Activity.type, Activity.timestamp, Activity.data, Activity.notes).where(
+                Activity.baby_id == baby.id,
+                Activity.timestamp >= start_date,
+                Activity.timestamp <= end_date
+            ).order_by(Activity.timestamp.desc()))).all()
+            activities = [ReportActivity(*row) for row in rows]
+            daily = await load_daily_stats(db, baby.id, start_date, end_date)
+        except BaseException as exc:
+            self.failures += 1
+            job.update(status="failed", error=str(exc) or type(exc).__name__)
+            self._finish(job, finished)
+            raise
+
+        args = (str(path), report_baby, activities, start_date, end_date, daily)
+        task = asyncio.create_task(self._run(job, args, finished))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def _finish(self, job: Dict[str, Any], finished: asyncio.Future) -> None:
+        self._finished.set(job["id"], job)
+        self._running.pop(job["id"], None)
+        if not finished.done():
+            finished.set_result(None)
+
+    async def _run(self, job: Dict[str, Any], args: tuple, finished: asyncio.Future) -> None:
+        job["status"] = "running"
+        try:
+            if self.max_workers <= 0:
+                size = await run_in_threadpool(_render_report, *args)
+            else:
+                executor = self._get_executor()
+                try:
+                    size = await asyncio.get_running_loop().run_in_executor(executor, _render_report, *args)
+                except BrokenProcessPool:
+                    # Un worker murió: se recrea el pool en el siguiente trabajo
+                    if self._executor is executor:
+                        self.shutdown()
+                    raise
+        except Exception as exc:
+            self.failures += 1
+            logger.exception("Report job %s failed", job["id"])
+            job.update(status="failed", error=str(exc) or type(exc).__name__)
+        else:
+            self.completed += 1
+            job.update(status="done", size=size)
+            self._prune(job["baby_id"])
+        finally:
+            self._finish(job, finished)
+
+    def get(self, baby_id: int, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job status; a stored PDF counts as done even if another worker rendered it"""
+        running = self._running.get(job_id)
+        job = running[0] if running is not None else self._finished.get(job_id)
+        if job is not None:
+            return job if job["baby_id"] == baby_id else None
+        path = self.artifact_path(baby_id, job_id)
+        if path.exists():
+            return {"id": job_id, "baby_id": baby_id, "status": "done", "size": path.stat().st_size}
+        return None
+
+    async def wait(self, job_id: str) -> None:
+        running = self._running.get(job_id)
+        if running is not None:
+            # shield: si el cliente se va, el informe sigue generándose para la próxima descarga
+            await asyncio.shield(running[1])
+
+    def remove_baby(self, baby_id: int) -> None:
+        """Drop every stored report of a deleted baby"""
+        shutil.rmtree(self.root / f"baby_{baby_id}", ignore_errors=True)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "running": len(self._running),
+            "completed": self.completed,
+            "failures": self.failures,
+            "cache_hits": self.cache_hits,
+        }
+
+
+report_jobs = ReportJobs(settings.REPORT_STORE_DIR, settings.REPORT_WORKERS, settings.REPORT_MAX_AGE_HOURS)
@@ -0,0 +1,198 @@
+# Estilos y plantillas de tabla del informe: se construyen una vez al importar y los comparten todos los informes
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import cm
+from reportlab.platypus import TableStyle
+
+# Subirla al cambiar el diseño del informe: invalida los PDFs ya guardados
+REPORT_TEMPLATE_VERSION = 2
+
+PRIMARY = colors.HexColor('#6BA3E8')
+TEXT = colors.HexColor('#1A1A1A')
+
+_sample_styles = getSampleStyleSheet()
+
+# ========== ESTILOS DE TEXTO ==========
+
+TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=_sample_styles['Heading1'],
+    fontSize=28,
+    textColor=PRIMARY,
+    spaceAfter=10,
+    spaceBefore=20,
+    alignment=TA_CENTER,
+    fontName='Helvetica-Bold',
+    leading=34
+)
+
+SUBTITLE_STYLE = ParagraphStyle(
+    'CustomSubtitle',
+    parent=_sample_styles['Normal'],
+    fontSize=12,
+    textColor=colors.HexColor('#666666'),
+    spaceAfter=30,
+    alignment=TA_CENTER,
+    fontName='Helvetica',
+)
+
+HEADING_STYLE = ParagraphStyle(
+    'CustomHeading',
+    parent=_sample_styles['Heading2'],
+    fontSize=16,
+    textColor=TEXT,
+    spaceAfter=16,
+    spaceBefore=20,
+    fontName='Helvetica-Bold',
+    borderWidth=0,
+    borderColor=PRIMARY,
+    borderPadding=8,
+    backColor=colors.HexColor('#F0F7FF'),
+    leftIndent=10
+)
+
+OBSERVATION_STYLE = ParagraphStyle(
+    'ObservationStyle',
+    parent=_sample_styles['Normal'],
+    fontSize=9,
+    textColor=TEXT,
+    fontName='Helvetica',
+    leading=12,
+    leftIndent=5,
+    rightIndent=5
+)
+
+# ========== TABLAS ==========
+
+PATIENT_HEADER_WIDTHS = [15*cm]
+PATIENT_HEADER_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, -1), PRIMARY),
+    ('TEXTCOLOR', (0, 0), (-1, -1), colors.white),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 14),
+    ('TOPPADDING', (0, 0), (-1, -1), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+])
+
+PATIENT_WIDTHS = [5*cm, 10*cm]
+PATIENT_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#E8F4F8')),
+    ('BACKGROUND', (1, 0), (1, -1), colors.white),
+    ('TEXTCOLOR', (0, 0), (-1, -1), TEXT),
+    ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
+    ('ALIGN', (1, 0), (1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 11),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
+    ('TOPPADDING', (0, 0), (-1, -1), 10),
+    ('LEFTPADDING', (0, 0), (-1, -1), 12),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 12),
+    ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#D0E8F2')),
+    ('LINEBELOW', (0, 0), (-1, -2), 0.5, colors.HexColor('#E8F4F8')),
+])
+
+STATS_WIDTHS = [7*cm, 4*cm, 4*cm]
+STATS_STYLE = TableStyle([
+    # Header
+    ('BACKGROUND', (0, 0), (-1, 0), PRIMARY),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('TOPPADDING', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+
+    # Body
+    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F9FAFB')]),
+    ('TEXTCOLOR', (0, 1), (-1, -1), TEXT),
+    ('FONTNAME', (0, 1), (0, -1), 'Helvetica-Bold'),
+    ('FONTNAME', (1, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 10),
+    ('TOPPADDING', (0, 1), (-1, -1), 10),
+    ('BOTTOMPADDING', (0, 1), (-1, -1), 10),
+
+    # Borders
+    ('BOX', (0, 0), (-1, -1), 1.5, PRIMARY),
+    ('LINEBELOW', (0, 0), (-1, 0), 1.5, colors.white),
+    ('INNERGRID', (0, 1), (-1, -1), 0.5, colors.HexColor('#E5E7EB')),
+])
+
+
+def _detail_table_style(color: str, row_color: str, grid_color: str, centered_column=None) -> TableStyle:
+    """Shared look of the feeding / sleep / health detail tables"""
+    color = colors.HexColor(color)
+    commands = [
+        # Header
+        ('BACKGROUND', (0, 0), (-1, 0), color),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('TOPPADDING', (0, 0), (-1, 0), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
+
+        # Body
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor(row_color)]),
+        ('FONTSIZE', (0, 1), (-1, -1), 9),
+        ('TOPPADDING', (0, 1), (-1, -1), 8),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
+        ('LEFTPADDING', (0, 0), (-1, -1), 8),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+
+        # Borders
+        ('BOX', (0, 0), (-1, -1), 1, color),
+        ('LINEBELOW', (0, 0), (-1, 0), 1.5, colors.white),
+        ('INNERGRID', (0, 1), (-1, -1), 0.5, colors.HexColor(grid_color)),
+    ]
+    if centered_column is not None:
+        commands.insert(3, ('ALIGN', (centered_column, 0), (centered_column, -1), 'CENTER'))
+    return TableStyle(commands)
+
+
+FEEDING_WIDTHS = [3.5*cm, 3.5*cm, 2.5*cm, 5.5*cm]
+FEEDING_STYLE = _detail_table_style('#4CAF50', '#F1F8F4', '#E8F5E9', centered_column=2)
+
+SLEEP_WIDTHS = [3.5*cm, 2.5*cm, 9*cm]
+SLEEP_STYLE = _detail_table_style('#9C27B0', '#F3E5F5', '#E1BEE7', centered_column=1)
+
+HEALTH_WIDTHS = [3.5*cm, 3*cm, 8.5*cm]
+HEALTH_STYLE = _detail_table_style('#FF5252', '#FFEBEE', '#FFCDD2')
+
+# Todas las observaciones van en una sola tabla: una fila (caja) por observación
+OBSERVATIONS_WIDTHS = [15*cm]
+OBSERVATIONS_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#F9FAFB')),
+    ('TEXTCOLOR', (0, 0), (-1, -1), TEXT),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('TOPPADDING', (0, 0), (-1, -1), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
+    ('LEFTPADDING', (0, 0), (-1, -1), 10),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 10),
+    ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#D0E8F2')),
+    ('INNERGRID', (0, 0), (-1, -1), 1, colors.HexColor('#D0E8F2')),
+])
+
+FOOTER_WIDTHS = [15*cm]
+FOOTER_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#F0F7FF')),
+    ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#666666')),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ('TOPPADDING', (0, 0), (-1, -1), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
+    ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#D0E8F2')),
+])
+
+ACTIVITY_TYPE_LABELS = {
+    'feeding': 'Alimentación',
+    'sleep': 'Sueño',
+    'diaper': 'Pañal',
+    'health': 'Salud',
+    'medical': 'Médico'
+}
@@ -0,0 +1,180 @@
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional
+from sqlalchemy import case, select, delete, func, Date
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models.activity import Activity
+from ..models.daily_activity_stats import DailyActivityStats
+
+# Estructura de un día agregado, tal y como la consumen MLService y el PDF
+DAY_FIELDS = (
+    "total_activities",
+    "feeding_count",
+    "feeding_ml",
+    "sleep_count",
+    "sleep_hours",
+    "diaper_count",
+    "health_count",
+)
+
+DailyStats = Dict[date, Dict[str, float]]
+
+
+def _number(value: Any) -> float:
+    """Numeric JSON value or 0 (ignores strings, booleans and nulls)"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return 0.0
+
+
+def activity_delta(activity: Activity, sign: int = 1) -> Dict[str, Any]:
+    """Rollup contribution of one activity (sign=-1 to remove it)"""
+    data = activity.data or {}
+    return {
+        "baby_id": activity.baby_id,
+        "day": activity.timestamp.date(),
+        "type": activity.type,
+        "count": sign,
+        "quantity_ml": sign * _number(data.get("quantity_ml")),
+        "duration_hours": sign * _number(data.get("duration_hours")),
+    }
+
+
+def _merge_deltas(deltas: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    merged: Dict[tuple, Dict[str, Any]] = {}
+    for delta in deltas:
+        key = (delta["baby_id"], delta["day"], delta["type"])
+        if key not in merged:
+            merged[key] = dict(delta)
+        else:
+            for field in ("count", "quantity_ml", "duration_hours"):
+                merged[key][field] += delta[field]
+    return [
+        d for d in merged.values()
+        if d["count"] or d["quantity_ml"] or d["duration_hours"]
+    ]
+
+
+async def apply_rollup_deltas(db: AsyncSession, deltas: Iterable[Dict[str, Any]]) -> None:
+    """Upsert activity deltas into daily_activity_stats within the caller's transaction"""
+    merged = _merge_deltas(deltas)
+    if not merged:
+        return
+
+    dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(DailyActivityStats).values(merged)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["baby_id", "day", "type"],
+        set_={
+            "count": DailyActivityStats.count + stmt.excluded.count,
+            "quantity_ml": DailyActivityStats.quantity_ml + stmt.excluded.quantity_ml,
+            "duration_hours": DailyActivityStats.duration_hours + stmt.excluded.duration_hours,
+        },
+    )
+    await db.execute(stmt)
+
+    # Los días que se quedan sin actividades no deben aparecer como días vacíos
+    for d in merged:
+        if d["count"] < 0:
+            await db.execute(delete(DailyActivityStats).where(
+                DailyActivityStats.baby_id == d["baby_id"],
+                DailyActivityStats.day == d["day"],
+                DailyActivityStats.type == d["type"],
+                DailyActivityStats.count <= 0
+            ))
+
+
+def empty_day() -> Dict[str, float]:
+    return {field: 0 for field in DAY_FIELDS}
+
+
+def _add_to_day(day: Dict[str, float], activity_type: str, count: float, quantity_ml: float, duration_hours: float) -> None:
+    day["total_activities"] += count
+    if activity_type == "feeding":
+        day["feeding_count"] += count
+        day["feeding_ml"] += quantity_ml
+    elif activity_type == "sleep":
+        day["sleep_count"] += count
+        day["sleep_hours"] += duration_hours
+    elif activity_type == "diaper":
+        day["diaper_count"] += count
+    elif activity_type in ("health", "medical"):
+        day["health_count"] += count
+
+
+def daily_stats_from_rows(rows: Iterable[DailyActivityStats]) -> DailyStats:
+    """Fold rollup rows into {day: {...}} sorted by day"""
+    daily: DailyStats = {}
+    for row in sorted(rows, key=lambda r: r.day):
+        if row.day not in daily:
+            daily[row.day] = empty_day()
+        _add_to_day(daily[row.day], row.type, row.count, row.quantity_ml, row.duration_hours)
+    return daily
+
+
+def aggregate_daily(activities: Iterable[Activity]) -> DailyStats:
+    """Recompute the same structure from raw activities (verification / no rollup)"""
+    daily: DailyStats = {}
+    for activity in activities:
+        delta = activity_delta(activity)
+        if delta["day"] not in daily:
+            daily[delta["day"]] = empty_day()
+        _add_to_day(daily[delta["day"]], activity.type, 1, delta["quantity_ml"], delta["duration_hours"])
+    return dict(sorted(daily.items()))
+
+
+async def load_daily_stats(db: AsyncSession, baby_id: int, start_date: datetime, end_date: datetime) -> DailyStats:
+    """Read the rollup rows for the days covered by [start_date, end_date]"""
+    rows = (await db.scalars(select(DailyActivityStats).where(
+        DailyActivityStats.baby_id == baby_id,
+        DailyActivityStats.day >= start_date.date(),
+        DailyActivityStats.day <= end_date.date()
+    ))).all()
+    return daily_stats_from_rows(rows)
+
+
+def _numeric_field(dialect_name: str, key: str):
+    """SQL value of a numeric field of Activity.data, NULL otherwise (same rule as _number)"""
+    # Sin la guarda el CAST falla en Postgres con "" o "abc", y SQLite sumaría "120" o true
+    if dialect_name == "postgresql":
+        is_number = func.json_typeof(Activity.data[key]) == "number"
+    else:
+        is_number = func.json_type(Activity.data, f"$.{key}").in_(("integer", "real"))
+    return case((is_number, Activity.data[key].as_float()))
+
+
+async def backfill_rollups(db: AsyncSession, baby_id: Optional[int] = None) -> int:
+    """Rebuild daily_activity_stats from activities with a single GROUP BY"""
+    dialect_name = db.bind.dialect.name
+    day = func.date(Activity.timestamp, type_=Date)
+    query = select(
+        Activity.baby_id,
+        day,
+        Activity.type,
+        func.count(),
+        func.coalesce(func.sum(_numeric_field(dialect_name, "quantity_ml")), 0),
+        func.coalesce(func.sum(_numeric_field(dialect_name, "duration_hours")), 0),
+    ).group_by(Activity.baby_id, day, Activity.type)
+
+    clear = delete(DailyActivityStats)
+    if baby_id is not None:
+        query = query.where(Activity.baby_id == baby_id)
+        clear = clear.where(DailyActivityStats.baby_id == baby_id)
+
+    rows = (await db.execute(query)).all()
+
+    await db.execute(clear)
+    if rows:
+        await db.execute(DailyActivityStats.__table__.insert(), [
+            {
+                "baby_id": row[0],
+                "day": row[1],
+                "type": row[2],
+                "count": row[3],
+                "quantity_ml": row[4],
+                "duration_hours": row[5],
+            }
+            for row in rows
+        ])
+    await db.commit()
+    return len(rows)
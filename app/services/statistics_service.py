@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..models.daily_activity_stats import DailyActivityStats
+from .activity_writes import get_data_version
+from .rollup_service import DAY_FIELDS, daily_stats_from_rows, empty_day
+
+# Clave: (baby_id, days, día actual, data_version) -> nunca devuelve datos viejos
+statistics_cache = TTLCache(settings.STATISTICS_CACHE_MAX_SIZE, settings.STATISTICS_CACHE_TTL_SECONDS)
+
+
+class StatisticsService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_statistics(self, baby_id: int, days: int = 7) -> Dict[str, Any]:
+        """Per-day series and totals for the last `days` calendar days (UTC)"""
+        end_day = datetime.now(timezone.utc).date()
+        start_day = end_day - timedelta(days=days - 1)
+
+        version = await get_data_version(self.db, baby_id)
+        cache_key = (baby_id, days, end_day, version)
+        cached = statistics_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        rows = (await self.db.scalars(select(DailyActivityStats).where(
+            DailyActivityStats.baby_id == baby_id,
+            DailyActivityStats.day >= start_day,
+            DailyActivityStats.day <= end_day
+        ))).all()
+        daily = daily_stats_from_rows(rows)
+
+        dates = [start_day + timedelta(days=i) for i in range(days)]
+        series = {field: [] for field in DAY_FIELDS}
+        for day in dates:
+            values = daily.get(day) or empty_day()
+            for field in DAY_FIELDS:
+                series[field].append(round(values[field], 1))
+
+        totals = {field: round(sum(values), 1) for field, values in series.items()}
+
+        result = {
+            "baby_id": baby_id,
+            "days": days,
+            "start_date": start_day.isoformat(),
+            "end_date": end_day.isoformat(),
+            "data_version": version,
+            "dates": [day.isoformat() for day in dates],
+            "series": series,
+            "totals": totals,
+            "daily_averages": {field: round(total / days, 1) for field, total in totals.items()},
+        }
+        statistics_cache.set(cache_key, result)
+        return result
@@ -0,0 +1,181 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import func, select
+from ..core.config import settings
+from ..database import SessionLocal, to_naive_utc
+from ..models.activity import Activity
+from ..models.baby import Baby
+from .activity_frame import ActivityFrame, load_activity_frame
+from .activity_writes import get_data_version
+from .ml_pool import MODELS, STORED_MODELS, stored_model_name, warm_worker
+from .rollup_service import DailyStats, load_daily_stats
+
+logger = logging.getLogger(__name__)
+
+# Ventanas (días) que se entrenan: la de /insights por defecto
+TRAINING_WINDOWS = (14,)
+
+
+def _train_and_store(baby_id: int, days: int, data_version: int, frame: ActivityFrame, daily: DailyStats) -> None:
+    """Fit every stored model of a baby and write it to the model store (runs in a worker process)"""
+    from .ml_service import MLService
+    from .model_store import model_store
+    for name, (fit_name, count_samples) in STORED_MODELS.items():
+        args = (frame, daily) if MODELS[name] else (frame,)
+        model = getattr(MLService, fit_name)(*args)
+        model_store.save(baby_id, stored_model_name(name, days), data_version, count_samples(frame, daily), model)
+
+
+class LocalTrainingQueue:
+    """In-process priority queue of baby ids; a baby is queued at most once"""
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, int]] = []
+        self._pending: Dict[int, float] = {}
+        self._counter = itertools.count()
+        self._ready = asyncio.Event()
+
+    async def put(self, baby_id: int, priority: float) -> None:
+        """Queue a baby (lower priority value runs first); re-queuing keeps the best priority"""
+        current = self._pending.get(baby_id)
+        if current is not None and current <= priority:
+            return
+        self._pending[baby_id] = priority
+        heapq.heappush(self._heap, (priority, next(self._counter), baby_id))
+        self._ready.set()
+
+    async def get(self) -> int:
+        while True:
+            while self._heap:
+                priority, _, baby_id = heapq.heappop(self._heap)
+                # Entradas superadas por un put con mejor prioridad
+                if self._pending.get(baby_id) == priority:
+                    del self._pending[baby_id]
+                    return baby_id
+            self._ready.clear()
+            await self._ready.wait()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+
+class TrainingScheduler:
+    """Retrains per-baby models in the background so /insights only reads the model store"""
+
+    def __init__(self, queue, concurrency: int):
+        self.queue = queue
+        self.concurrency = concurrency or os.cpu_count() or 1
+        self.completed = 0
+        self.failed = 0
+        self.latencies = deque(maxlen=100)
+        # baby_id -> (data_version entrenada, instante del entrenamiento)
+        self._trained: Dict[int, Tuple[int, float]] = {}
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def _needs_training(self, baby_id: int, data_version: int) -> bool:
+        trained = self._trained.get(baby_id)
+        if trained is None:
+            return True
+        trained_version, trained_at = trained
+        if data_version - trained_version >= settings.TRAINING_RETRAIN_EVERY_N_WRITES:
+            return True
+        return time.monotonic() - trained_at >= settings.TRAINING_INTERVAL_MINUTES * 60
+
+    async def scan(self) -> int:
+        """Queue babies with recent activity that have enough new writes or are due; most recent first"""
+        since = to_naive_utc(datetime.now(timezone.utc) - timedelta(days=settings.TRAINING_ACTIVE_DAYS))
+        async with SessionLocal() as db:
+            rows = (await db.execute(
+                select(Baby.id, Baby.data_version, func.max(Activity.timestamp))
+                .join(Activity, Activity.baby_id == Baby.id)
+                .where(Activity.timestamp >= since)
+                .group_by(Baby.id, Baby.data_version)
+            )).all()
+
+        queued = 0
+        for baby_id, data_version, last_activity in rows:
+            if self._needs_training(baby_id, data_version):
+                await self.queue.put(baby_id, -last_activity.timestamp())
+                queued += 1
+        return queued
+
+    async def train_baby(self, baby_id: int) -> int:
+        """Train every window of one baby; returns the data version it was trained at"""
+        loop = asyncio.get_running_loop()
+        end_date = datetime.now(timezone.utc)
+        async with SessionLocal() as db:
+            data_version = await get_data_version(db, baby_id)
+            for days in TRAINING_WINDOWS:
+                start_date = end_date - timedelta(days=days)
+                frame = await load_activity_frame(db, baby_id, start_date, end_date)
+                daily = await load_daily_stats(db, baby_id, start_date, end_date)
+                await loop.run_in_executor(self._executor, _train_and_store, baby_id, days, data_version, frame, daily)
+        return data_version
+
+    async def _worker(self) -> None:
+        while True:
+            baby_id = await self.queue.get()
+            started = time.perf_counter()
+            try:
+                data_version = await self.train_baby(baby_id)
+            except Exception:
+                self.failed += 1
+                logger.exception("Training failed for baby %s", baby_id)
+                continue
+            self._trained[baby_id] = (data_version, time.monotonic())
+            self.completed += 1
+            self.latencies.append(time.perf_counter() - started)
+
+    async def _poll(self) -> None:
+        while True:
+            try:
+                await self.scan()
+            except Exception:
+                logger.exception("Training scan failed")
+            await asyncio.sleep(settings.TRAINING_POLL_SECONDS)
+
+    def start(self) -> None:
+        """Start the poller and one worker per allowed concurrent training"""
+        if self._tasks:
+            return
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.concurrency,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=warm_worker,
+        )
+        self._tasks = [asyncio.create_task(self._poll())]
+        self._tasks += [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        latencies = list(self.latencies)
+        return {
+            "running": bool(self._tasks),
+            "concurrency": self.concurrency,
+            "queue_length": len(self.queue),
+            "completed": self.completed,
+            "failed": self.failed,
+            "latency_ms_avg": round(sum(latencies) / len(latencies) * 1000, 1) if latencies else None,
+            "latency_ms_max": round(max(latencies) * 1000, 1) if latencies else None,
+        }
+
+
+training_scheduler = TrainingScheduler(LocalTrainingQueue(), settings.TRAINING_CONCURRENCY)
@@ -5,6 +5,7 @@ class Baby {
   final String name;
   final DateTime birthDate;
   final String? photo;
+  final String? photoThumbnail;
   final String createdAt;
   final String updatedAt;
 
@@ -13,6 +14,7 @@ class Baby {
     required this.name,
     required this.birthDate,
     this.photo,
+    this.photoThumbnail,
     required this.createdAt,
     required this.updatedAt,
   });
@@ -23,6 +25,7 @@ class Baby {
       name: json['name'],
       birthDate: DateTime.parse(json['birth_date']),
       photo: json['photo'],
+      photoThumbnail: json['photo_thumbnail'],
       createdAt: json['created_at'],
       updatedAt: json['updated_at'],
     );
@@ -3,6 +3,7 @@ class User {
   final String email;
   final String name;
   final String? profilePicture;
+  final String? profilePictureThumbnail;
   final DateTime createdAt;
 
   User({
@@ -10,6 +11,7 @@ class User {
     required this.email,
     required this.name,
     this.profilePicture,
+    this.profilePictureThumbnail,
     required this.createdAt,
   });
 
@@ -19,6 +21,7 @@ class User {
       email: json['email'],
       name: json['name'],
       profilePicture: json['profile_picture'],
+      profilePictureThumbnail: json['profile_picture_thumbnail'],
       createdAt: DateTime.parse(json['created_at']),
     );
   }
@@ -1,8 +1,8 @@
 import 'package:flutter/material.dart';
-import 'dart:convert';
 import '../../services/api_service.dart';
 import '../../models/baby.dart';
 import 'edit_baby_screen.dart';
+import '../../services/image_service.dart';
 
 class BabyProfileScreen extends StatefulWidget {
   final int babyId;
@@ -196,14 +196,13 @@ class _BabyProfileScreenState extends State<BabyProfileScreen> {
   Widget _buildBabyAvatar() {
     if (_baby?.photo != null && _baby!.photo!.isNotEmpty) {
       try {
-        final imageData = _baby!.photo!.split(',').last;
         return Container(
           width: 120,
           height: 120,
           decoration: BoxDecoration(
             borderRadius: BorderRadius.circular(30),
             image: DecorationImage(
-              image: MemoryImage(base64Decode(imageData)),
+              image: ImageService.imageProvider(_baby!.photoThumbnail ?? _baby!.photo!),
               fit: BoxFit.cover,
             ),
             boxShadow: [
@@ -1,4 +1,3 @@
-import 'dart:convert';
 import 'package:flutter/material.dart';
 import 'package:flutter/foundation.dart' show kIsWeb;
 import 'package:intl/intl.dart';
@@ -171,14 +170,13 @@ class _EditBabyScreenState extends State<EditBabyScreen> {
   Widget _buildPhotoWidget() {
     if (_photoBase64 != null && _photoBase64!.isNotEmpty) {
       try {
-        final imageData = _photoBase64!.split(',').last;
         return Container(
           width: 120,
           height: 120,
           decoration: BoxDecoration(
             borderRadius: BorderRadius.circular(20),
             image: DecorationImage(
-              image: MemoryImage(base64Decode(imageData)),
+              image: ImageService.imageProvider(_photoBase64!),
               fit: BoxFit.cover,
             ),
             boxShadow: [
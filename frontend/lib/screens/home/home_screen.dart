@@ -1,5 +1,4 @@
 import 'package:flutter/material.dart';
-import 'dart:convert';
 // ignore: deprecated_member_use
 import 'dart:html' as html;
 import '../../services/auth_storage.dart';
@@ -16,6 +15,7 @@ import '../insights/insights_screen.dart';
 import '../activities/activities_history_screen.dart';
 import '../statistics/statistics_screen.dart';
 import '../profile/profile_screen.dart';
+import '../../services/image_service.dart';
 
 class HomeScreen extends StatefulWidget {
   const HomeScreen({super.key});
@@ -31,6 +31,7 @@ class _HomeScreenState extends State<HomeScreen> {
   Baby? _selectedBaby;
   List<Baby> _babies = [];
   List<Activity> _todayActivities = [];
+  Map<String, Activity> _latestActivities = {};
   bool _isLoading = true;
 
   @override
@@ -45,12 +46,27 @@ class _HomeScreenState extends State<HomeScreen> {
     });
 
     try {
-      // Cargar bebés
-      final babiesData = await _apiService.getMyBabies();
-      _babies = babiesData.map((json) => Baby.fromJson(json)).toList();
+      // Cargar bebés con su última actividad de cada tipo (una sola petición)
+      final dashboard = await _apiService.getDashboard();
+      _babies = dashboard.map((json) => Baby.fromJson(json)).toList();
 
       if (_babies.isNotEmpty) {
         _selectedBaby = _babies.first;
+        final latest = dashboard.first['latest_activities'] as Map<String, dynamic>;
+        _latestActivities = latest.map((type, json) {
+          final timestamp = DateTime.parse(json['timestamp']);
+          return MapEntry(
+            type,
+            Activity(
+              id: json['id'],
+              babyId: _selectedBaby!.id,
+              type: type,
+              timestamp: timestamp,
+              data: json['data'],
+              createdAt: timestamp,
+            ),
+          );
+        });
 
         // Cargar actividades de hoy
         final today = DateTime.now();
@@ -102,10 +118,7 @@ class _HomeScreenState extends State<HomeScreen> {
   }
 
   Activity? _getLastActivity(String type) {
-    final activities = _todayActivities.where((a) => a.type == type).toList();
-    if (activities.isEmpty) return null;
-    activities.sort((a, b) => b.timestamp.compareTo(a.timestamp));
-    return activities.first;
+    return _latestActivities[type];
   }
 
   void _onItemTapped(int index) {
@@ -355,14 +368,13 @@ class _HomeScreenState extends State<HomeScreen> {
   Widget _buildBabyAvatar() {
     if (_selectedBaby?.photo != null && _selectedBaby!.photo!.isNotEmpty) {
       try {
-        final imageData = _selectedBaby!.photo!.split(',').last;
         return Container(
           width: 56,
           height: 56,
           decoration: BoxDecoration(
             borderRadius: BorderRadius.circular(16),
             image: DecorationImage(
-              image: MemoryImage(base64Decode(imageData)),
+              image: ImageService.imageProvider(_selectedBaby!.photoThumbnail ?? _selectedBaby!.photo!),
               fit: BoxFit.cover,
             ),
             boxShadow: [
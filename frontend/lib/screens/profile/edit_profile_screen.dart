@@ -1,4 +1,3 @@
-import 'dart:convert';
 import 'package:flutter/material.dart';
 import 'package:flutter/foundation.dart' show kIsWeb;
 import '../../services/api_service.dart';
@@ -106,14 +105,13 @@ class _EditProfileScreenState extends State<EditProfileScreen> {
   Widget _buildProfilePicture() {
     if (_profilePictureBase64 != null && _profilePictureBase64!.isNotEmpty) {
       try {
-        final imageData = _profilePictureBase64!.split(',').last;
         return Container(
           width: 120,
           height: 120,
           decoration: BoxDecoration(
             shape: BoxShape.circle,
             image: DecorationImage(
-              image: MemoryImage(base64Decode(imageData)),
+              image: ImageService.imageProvider(_profilePictureBase64!),
               fit: BoxFit.cover,
             ),
             boxShadow: [
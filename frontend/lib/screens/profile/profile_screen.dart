@@ -1,10 +1,10 @@
-import 'dart:convert';
 import 'package:flutter/material.dart';
 import '../../services/api_service.dart';
 import '../../services/auth_storage.dart';
 import '../../models/user.dart';
 import 'edit_profile_screen.dart';
 import 'change_password_screen.dart';
+import '../../services/image_service.dart';
 
 class ProfileScreen extends StatefulWidget {
   const ProfileScreen({super.key});
@@ -96,14 +96,13 @@ class _ProfileScreenState extends State<ProfileScreen> {
   Widget _buildProfileAvatar() {
     if (_user?.profilePicture != null && _user!.profilePicture!.isNotEmpty) {
       try {
-        final imageData = _user!.profilePicture!.split(',').last;
         return Container(
           width: 100,
           height: 100,
           decoration: BoxDecoration(
             shape: BoxShape.circle,
             image: DecorationImage(
-              image: MemoryImage(base64Decode(imageData)),
+              image: ImageService.imageProvider(_user!.profilePictureThumbnail ?? _user!.profilePicture!),
               fit: BoxFit.cover,
             ),
             boxShadow: [
@@ -170,6 +170,25 @@ class ApiService {
     return await getBabies();
   }
 
+  // Pantalla de inicio: bebés con rol, nº de cuidadores y última actividad de cada tipo
+  Future<List<dynamic>> getDashboard() async {
+    final token = await _authStorage.getToken();
+
+    final response = await http.get(
+      Uri.parse('$baseUrl/babies/dashboard'),
+      headers: {
+        'Content-Type': 'application/json',
+        'Authorization': 'Bearer $token',
+      },
+    );
+
+    if (response.statusCode == 200) {
+      return json.decode(response.body);
+    } else {
+      throw Exception('Error al obtener bebés: ${response.body}');
+    }
+  }
+
   Future<Map<String, dynamic>> getBaby(int babyId) async {
     final token = await _authStorage.getToken();
 
@@ -274,6 +293,38 @@ class ApiService {
     }
   }
 
+  // Cambios desde el último sync_token (sin token: todas las actividades).
+  // 'reset': true indica que el token había caducado y hay que reemplazar la copia local
+  Future<Map<String, dynamic>> getActivityChanges({
+    required int babyId,
+    int? since,
+  }) async {
+    final token = await _authStorage.getToken();
+
+    var url = '$baseUrl/babies/$babyId/activities/changes';
+    if (since != null) {
+      url += '?since=$since';
+    }
+
+    final response = await http.get(
+      Uri.parse(url),
+      headers: {
+        'Content-Type': 'application/json',
+        'Authorization': 'Bearer $token',
+      },
+    );
+
+    if (response.statusCode == 200) {
+      return json.decode(response.body);
+    } else if (response.statusCode == 410 && since != null) {
+      // Token anterior a la retención de borrados: se descarta la copia local y se empieza de cero
+      final changes = await getActivityChanges(babyId: babyId);
+      return {...changes, 'reset': true};
+    } else {
+      throw Exception('Error al obtener cambios: ${response.body}');
+    }
+  }
+
   Future<List<dynamic>> getBabyActivities({
     required int babyId,
     DateTime? startDate,
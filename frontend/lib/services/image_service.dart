@@ -1,10 +1,20 @@
 import 'dart:convert';
+import 'package:flutter/painting.dart';
 import 'package:image_picker/image_picker.dart';
 import 'package:flutter/foundation.dart' show kIsWeb;
+import 'api_service.dart';
 
 class ImageService {
   final ImagePicker _picker = ImagePicker();
 
+  // La API devuelve URLs (/media/...); una imagen recién elegida sigue siendo un data URL
+  static ImageProvider imageProvider(String photo) {
+    if (photo.startsWith('data:')) {
+      return MemoryImage(base64Decode(photo.split(',').last));
+    }
+    return NetworkImage('${ApiService.baseUrl}$photo');
+  }
+
   Future<String?> pickImageAsBase64() async {
     try {
       final XFile? image = await _picker.pickImage(
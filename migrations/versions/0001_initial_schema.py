@@ -0,0 +1,81 @@
+"""initial schema
+
+Esquema tal y como existía antes de introducir Alembic. En una base de datos
+ya creada basta con marcarla: ``alembic stamp 0001``.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("password_hash", sa.String(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("profile_picture", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("reset_token", sa.String(), nullable=True),
+        sa.Column("reset_token_expiry", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "babies",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("birth_date", sa.Date(), nullable=False),
+        sa.Column("photo", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_babies_id", "babies", ["id"])
+
+    op.create_table(
+        "user_babies",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("baby_id", sa.Integer(), sa.ForeignKey("babies.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("role", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_user_babies_id", "user_babies", ["id"])
+
+    op.create_table(
+        "activities",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("baby_id", sa.Integer(), sa.ForeignKey("babies.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("type", sa.String(), nullable=False),
+        sa.Column("timestamp", sa.DateTime(), nullable=False),
+        sa.Column("data", sa.JSON(), nullable=True),
+        sa.Column("notes", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_activities_id", "activities", ["id"])
+    op.create_index("ix_activities_type", "activities", ["type"])
+    op.create_index("ix_activities_timestamp", "activities", ["timestamp"])
+
+
+def downgrade() -> None:
+    op.drop_table("activities")
+    op.drop_table("user_babies")
+    op.drop_table("babies")
+    op.drop_table("users")
@@ -0,0 +1,55 @@
+"""composite indexes for per-baby queries
+
+Todas las consultas calientes filtran por bebé + rango de fechas (y a menudo
+tipo), así que los índices simples sobre ``type``/``timestamp`` no sirven.
+En PostgreSQL los índices se crean con CONCURRENTLY para no bloquear
+escrituras mientras se construyen.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Eliminar relaciones duplicadas antes de crear el índice único
+    op.execute(
+        "DELETE FROM user_babies WHERE id NOT IN "
+        "(SELECT MIN(id) FROM user_babies GROUP BY user_id, baby_id)"
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_activities_baby_id_timestamp", "activities", ["baby_id", "timestamp"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_activities_baby_id_type_timestamp", "activities", ["baby_id", "type", "timestamp"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_user_babies_user_id_baby_id", "user_babies", ["user_id", "baby_id"],
+            unique=True, postgresql_concurrently=True,
+        )
+        # "type" solo tiene cuatro valores; el índice compuesto lo cubre
+        op.drop_index("ix_activities_type", table_name="activities", postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index("ix_activities_type", "activities", ["type"], postgresql_concurrently=True)
+        op.drop_index("ix_user_babies_user_id_baby_id", table_name="user_babies", postgresql_concurrently=True)
+        op.drop_index("ix_activities_baby_id_type_timestamp", table_name="activities", postgresql_concurrently=True)
+        op.drop_index("ix_activities_baby_id_timestamp", table_name="activities", postgresql_concurrently=True)
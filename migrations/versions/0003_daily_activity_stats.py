@@ -0,0 +1,37 @@
+"""daily activity rollup table
+
+Tras aplicar esta migración hay que poblar la tabla una vez:
+``python -m app.cli backfill-rollups``.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "daily_activity_stats",
+        sa.Column("baby_id", sa.Integer(), sa.ForeignKey("babies.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("type", sa.String(), primary_key=True),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("quantity_ml", sa.Float(), nullable=False),
+        sa.Column("duration_hours", sa.Float(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("daily_activity_stats")
@@ -0,0 +1,41 @@
+"""online interval estimators
+
+La tabla se rellena sola: cada estimador se recalcula desde el historial la
+primera vez que se lee (o con ``python -m app.cli rebuild-intervals``).
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "interval_estimators",
+        sa.Column("baby_id", sa.Integer(), sa.ForeignKey("babies.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("type", sa.String(), primary_key=True),
+        sa.Column("last_timestamp", sa.DateTime(), nullable=True),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("mean", sa.Float(), nullable=False),
+        sa.Column("m2", sa.Float(), nullable=False),
+        sa.Column("ewm_mean", sa.Float(), nullable=False),
+        sa.Column("ewm_var", sa.Float(), nullable=False),
+        sa.Column("hour_buckets", sa.JSON(), nullable=False),
+        sa.Column("stale", sa.Boolean(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("interval_estimators")
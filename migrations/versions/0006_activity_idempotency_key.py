@@ -0,0 +1,35 @@
+"""activity idempotency keys for batch ingestion
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("activities", sa.Column("idempotency_key", sa.String(), nullable=True))
+
+    # Las filas existentes tienen la clave a NULL, que no entra en conflicto
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ux_activities_baby_id_idempotency_key", "activities", ["baby_id", "idempotency_key"],
+            unique=True, postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ux_activities_baby_id_idempotency_key", table_name="activities", postgresql_concurrently=True)
+    op.drop_column("activities", "idempotency_key")
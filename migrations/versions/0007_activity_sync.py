@@ -0,0 +1,49 @@
+"""activity versions and tombstones for delta sync
+
+Las actividades existentes quedan con version 0: la primera sincronización
+(sin token) las devuelve todas.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("activities", sa.Column("updated_at", sa.DateTime(), nullable=True))
+    op.add_column("activities", sa.Column("version", sa.Integer(), nullable=False, server_default="0"))
+    op.create_table(
+        "activity_tombstones",
+        sa.Column("activity_id", sa.Integer(), primary_key=True),
+        sa.Column("baby_id", sa.Integer(), sa.ForeignKey("babies.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_activity_tombstones_baby_id_version", "activity_tombstones", ["baby_id", "version"])
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_activities_baby_id_version", "activities", ["baby_id", "version"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_activities_baby_id_version", table_name="activities", postgresql_concurrently=True)
+    op.drop_index("ix_activity_tombstones_baby_id_version", table_name="activity_tombstones")
+    op.drop_table("activity_tombstones")
+    op.drop_column("activities", "version")
+    op.drop_column("activities", "updated_at")
@@ -0,0 +1,30 @@
+"""pruned tombstone horizon per baby
+
+Las lápidas más antiguas que TOMBSTONE_RETENTION_DAYS se purgan con
+"python -m app.cli prune-tombstones"; un sync_token anterior a la versión
+purgada recibe 410 y el cliente vuelve a sincronizar desde cero.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("babies", sa.Column("tombstones_pruned_version", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    op.drop_column("babies", "tombstones_pruned_version")
@@ -0,0 +1,65 @@
+"""Activity ingestion throughput: one POST per activity vs POST .../activities:batch.
+
+    python scripts/bench_activity_batch.py [--count 1000] [--batch-size 500]
+
+Each run inserts ``count`` new activities; batch items carry idempotency
+keys, as the offline sync sends them. The batch endpoint is reported as
+n/a on checkouts that do not have it.
+"""
+import argparse
+import asyncio
+import itertools
+
+from bench_common import activity_dicts, call, create_owner, measure_async, print_table, running_app, tree_label
+
+_keys = itertools.count()
+
+
+async def main(count: int, batch_size: int) -> None:
+    async with running_app() as app:
+        owner = await create_owner(app)
+        url = f"/babies/{owner.baby_id}/activities"
+
+        def payloads():
+            return [dict(values, timestamp=values["timestamp"].isoformat()) for values in activity_dicts(count, 30)]
+
+        async def single():
+            for item in payloads():
+                response = await call(app, "POST", url, headers=owner.headers, json_body=item)
+                assert response.status == 201, response.body
+            return response
+
+        async def batch():
+            items = [dict(item, idempotency_key=f"bench-{next(_keys)}") for item in payloads()]
+            for start in range(0, len(items), batch_size):
+                response = await call(app, "POST", f"{url}:batch", headers=owner.headers, json_body={
+                    "items": items[start:start + batch_size]
+                })
+                assert response.status == 200, response.body
+            return response
+
+        probe = await call(app, "POST", f"{url}:batch", headers=owner.headers, json_body={"items": []})
+        rows = []
+        for name, fn, supported in (
+            ("one POST per activity", single, True),
+            (f"batches of {batch_size}", batch, probe.status != 404 and probe.status != 405),
+        ):
+            if not supported:
+                rows.append((name, "n/a", "n/a", "n/a"))
+                continue
+            ms, peak, _ = await measure_async(fn)
+            rows.append((name, ms, count / (ms / 1000), peak))
+
+    print_table(
+        f"{count:,} activities - {tree_label()}",
+        ("path", "ms", "activities/s", "peak MiB"),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.count, args.batch_size))
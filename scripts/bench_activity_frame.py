@@ -0,0 +1,67 @@
+"""InsightsService analyses and stateless MLService models at 1k/10k/100k activities.
+
+    python scripts/bench_activity_frame.py [--sizes 1000 10000 100000]
+
+In memory, no database. On a checkout with ActivityFrame the analyses get
+a frame built from (timestamp, type, data) rows, as the app loads them, and
+the build is timed too; before it they get the list of Activity objects.
+"""
+import argparse
+
+from bench_common import make_activities, measure, print_table, tree_label
+
+from app.services.insights_service import InsightsService
+from app.services.ml_service import MLService
+
+try:
+    from app.services.activity_frame import ActivityFrame
+except ImportError:  # Árbol anterior al frame: los análisis reciben la lista de actividades
+    ActivityFrame = None
+
+ANALYSES = ("_detect_patterns", "_analyze_feeding", "_analyze_sleep", "_analyze_diapers")
+MODELS = (
+    "predict_next_feeding", "classify_sleep_quality", "predict_sleep_duration",
+    "predict_diaper_change", "analyze_feeding_sleep_correlation", "forecast_next_week",
+)
+
+
+def main(sizes) -> None:
+    rows = []
+    service = InsightsService(None)
+    for count in sizes:
+        # Unas 12 actividades al día
+        days = max(14, count // 12)
+        activities = make_activities(count, days)
+        projected = [(a.timestamp, a.type, a.data) for a in activities]
+
+        if ActivityFrame is not None:
+            build_ms, build_peak, source = measure(lambda: ActivityFrame.from_rows(projected))
+        else:
+            build_ms, build_peak, source = "-", "-", activities
+
+        def analyses():
+            patterns = service._detect_patterns(source, days)
+            for name in ANALYSES[1:]:
+                getattr(service, name)(source, days)
+            return service._generate_recommendations(source, patterns)
+
+        def models():
+            return [getattr(MLService, name)(source) for name in MODELS]
+
+        analyses_ms, analyses_peak, _ = measure(analyses)
+        models_ms, models_peak, _ = measure(models)
+        rows.append((f"{count:,}", build_ms, analyses_ms, models_ms, max(
+            peak for peak in (build_peak, analyses_peak, models_peak) if peak != "-"
+        )))
+
+    print_table(
+        f"Insights analyses - {tree_label()}",
+        ("activities", "frame build ms", "analyses ms", "models ms", "peak MiB"),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    main(parser.parse_args().sizes)
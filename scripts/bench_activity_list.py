@@ -0,0 +1,65 @@
+"""GET /babies/{id}/activities over a long history: full list, keyset pages and NDJSON.
+
+    python scripts/bench_activity_list.py [--count 100000] [--days 365]
+
+Peak memory is what the request allocates while it runs (tracemalloc),
+latency the best of three runs. Modes the checkout does not support are
+reported as n/a.
+"""
+import argparse
+import asyncio
+
+from bench_common import call, create_owner, measure_async, print_table, running_app, seed_activities, tree_label
+
+
+async def main(count: int, days: int, page_size: int) -> None:
+    async with running_app() as app:
+        owner = await create_owner(app)
+        await seed_activities(owner.baby_id, owner.user_id, count, days)
+        url = f"/babies/{owner.baby_id}/activities"
+
+        async def get(query: str = ""):
+            return await call(app, "GET", f"{url}?{query}", headers=owner.headers, keep_body=False)
+
+        async def walk_pages():
+            cursor = None
+            while True:
+                response = await call(
+                    app, "GET", f"{url}?limit={page_size}" + (f"&cursor={cursor}" if cursor else ""),
+                    headers=owner.headers, keep_body=False
+                )
+                cursor = response.headers.get("x-next-cursor")
+                if cursor is None:
+                    return response
+
+        rows = []
+        probe = await get(f"limit={page_size}")
+        paged = "x-next-cursor" in probe.headers
+        streamed = (await get("format=ndjson")).headers.get("content-type", "").startswith("application/x-ndjson")
+        cases = [
+            ("full list (JSON)", get, True),
+            (f"first page, limit={page_size}", lambda: get(f"limit={page_size}"), paged),
+            (f"every page, limit={page_size}", walk_pages, paged),
+            ("full list (NDJSON)", lambda: get("format=ndjson"), streamed),
+        ]
+        for name, fn, supported in cases:
+            if not supported:
+                rows.append((name, "n/a", "n/a", "n/a"))
+                continue
+            ms, peak, response = await measure_async(fn)
+            rows.append((name, ms, peak, f"{response.size / 1024:,.0f}"))
+
+    print_table(
+        f"{count:,} activities over {days} days - {tree_label()}",
+        ("request", "ms", "peak MiB", "last body KiB"),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.count, args.days, args.page_size))
@@ -0,0 +1,233 @@
+"""Shared setup for the scripts/bench_*.py benchmarks.
+
+Import this module before anything from ``app``: it points the settings at
+a throwaway SQLite database (unless DATABASE_URL is already set) and puts
+the repository root on sys.path. The benchmarks only call entry points that
+also exist before the change they measure, so the "before" numbers come
+from running the same script on an older checkout::
+
+    git worktree add /tmp/before <commit>^
+    cp -r scripts /tmp/before/ && cd /tmp/before && python scripts/bench_<name>.py
+"""
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import urlencode
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+_tmp = tempfile.mkdtemp(prefix="babycare-bench-")
+for _name, _value in {
+    "DATABASE_URL": f"sqlite+aiosqlite:///{_tmp}/bench.db",
+    "SECRET_KEY": "bench-secret",
+    "DEBUG": "false",
+    # Argon2 barato: solo se registra un usuario por benchmark
+    "ARGON2_TIME_COST": "1",
+    "ARGON2_MEMORY_COST": "8",
+    "ARGON2_PARALLELISM": "1",
+    "ML_POOL_WORKERS": "0",
+    "REPORT_WORKERS": "0",
+    "TRAINING_SCHEDULER_ENABLED": "false",
+    "EVENTS_BACKEND": "local",
+    "MODEL_STORE_DIR": f"{_tmp}/model_store",
+    "MEDIA_STORE_DIR": f"{_tmp}/media_store",
+    "REPORT_STORE_DIR": f"{_tmp}/report_store",
+}.items():
+    os.environ.setdefault(_name, _value)
+
+MiB = 1024 * 1024
+
+
+# ========== MEDICIÓN ==========
+
+def measure(fn: Callable[[], Any], repeat: int = 3) -> Tuple[float, float, Any]:
+    """Best wall time in ms over ``repeat`` runs, peak traced memory in MiB, and the last result"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    # La memoria se mide en una pasada aparte: tracemalloc ralentiza bastante
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best * 1000, peak / MiB, result
+
+
+async def measure_async(fn: Callable[[], Awaitable[Any]], repeat: int = 3) -> Tuple[float, float, Any]:
+    """``measure`` for coroutine functions"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = await fn()
+        best = min(best, time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        await fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best * 1000, peak / MiB, result
+
+
+def print_table(title: str, header: Sequence[str], rows: List[Sequence[Any]]) -> None:
+    def cell(value: Any) -> str:
+        return f"{value:,.1f}" if isinstance(value, float) else str(value)
+
+    cells = [list(header)] + [[cell(value) for value in row] for row in rows]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(header))]
+    print(f"\n{title}")
+    for index, row in enumerate(cells):
+        print("  " + "  ".join(value.rjust(width) if i else value.ljust(width) for i, (value, width) in enumerate(zip(row, widths))))
+        if index == 0:
+            print("  " + "  ".join("-" * width for width in widths))
+
+
+# ========== DATOS ==========
+
+def activity_dicts(count: int, days: int, seed: int = 42) -> Iterator[Dict[str, Any]]:
+    """``count`` activities spread evenly over the last ``days`` days: feedings, sleeps and diapers"""
+    rng = random.Random(seed)
+    end = datetime.utcnow()
+    step = timedelta(days=days) / count
+    for index in range(count):
+        kind = index % 3
+        if kind == 0:
+            activity_type, data = "feeding", {"quantity_ml": rng.randint(60, 180)}
+        elif kind == 1:
+            activity_type, data = "sleep", {"duration_hours": round(rng.uniform(0.5, 4), 2)}
+        else:
+            activity_type, data = "diaper", {"type": rng.choice(["wet", "dirty", "both"])}
+        yield {
+            "type": activity_type,
+            "timestamp": end - step * (count - index),
+            "data": data,
+            "notes": rng.choice([None, "sin incidencias", "algo inquieto"]),
+        }
+
+
+def make_activities(count: int, days: int, baby_id: int = 1) -> list:
+    from app.models.activity import Activity
+    return [Activity(id=index + 1, baby_id=baby_id, **values) for index, values in enumerate(activity_dicts(count, days))]
+
+
+async def seed_activities(baby_id: int, user_id: int, count: int, days: int) -> None:
+    """Bulk insert straight into the table (faster than the API for 100k rows)"""
+    from sqlalchemy import insert
+    from app.database import engine
+    from app.models.activity import Activity
+
+    rows = [dict(values, baby_id=baby_id, user_id=user_id) for values in activity_dicts(count, days)]
+    async with engine.begin() as connection:
+        for start in range(0, len(rows), 5000):
+            await connection.execute(insert(Activity), rows[start:start + 5000])
+
+
+# ========== APP ==========
+
+@asynccontextmanager
+async def running_app():
+    """The app with its schema created and its startup/shutdown handlers run"""
+    from app.database import Base, engine
+    import app.models  # noqa: F401  (registra todas las tablas en Base.metadata)
+    from app.main import app
+
+    engine.echo = False
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    async with app.router.lifespan_context(app):
+        yield app
+
+
+async def call(
+    app,
+    method: str,
+    path: str,
+    headers: Optional[Dict[str, str]] = None,
+    json_body: Any = None,
+    form: Optional[Dict[str, str]] = None,
+    keep_body: bool = True
+) -> SimpleNamespace:
+    """One request straight through ASGI.
+
+    With ``keep_body=False`` the body is only counted, so a streamed
+    response is never held in memory by the benchmark itself.
+    """
+    path, _, query = path.partition("?")
+    body = b""
+    raw_headers = [(b"host", b"bench")]
+    if json_body is not None:
+        body = json.dumps(json_body, default=str).encode()
+        raw_headers.append((b"content-type", b"application/json"))
+    elif form is not None:
+        body = urlencode(form).encode()
+        raw_headers.append((b"content-type", b"application/x-www-form-urlencoded"))
+    raw_headers.append((b"content-length", str(len(body)).encode()))
+    raw_headers += [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()]
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+        "root_path": "", "headers": raw_headers, "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+    }
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # El cliente nunca se desconecta
+        await asyncio.Event().wait()
+
+    response = SimpleNamespace(status=0, headers={}, size=0, chunks=[])
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response.status = message["status"]
+            response.headers = {name.decode().lower(): value.decode() for name, value in message["headers"]}
+        elif message["type"] == "http.response.body":
+            chunk = message.get("body", b"")
+            response.size += len(chunk)
+            if keep_body:
+                response.chunks.append(chunk)
+
+    await app(scope, receive, send)
+    response.body = b"".join(response.chunks)
+    response.json = lambda: json.loads(response.body)
+    return response
+
+
+async def create_owner(app) -> SimpleNamespace:
+    """Register a user with one baby; returns ``headers``, ``user_id`` and ``baby_id``"""
+    credentials = {"email": "bench@example.com", "password": "password1"}
+    await call(app, "POST", "/auth/register", json_body=dict(credentials, name="Bench"))
+    login = await call(app, "POST", "/auth/login", form={"username": credentials["email"], "password": credentials["password"]})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    user_id = (await call(app, "GET", "/auth/users/me", headers=headers)).json()["id"]
+    baby = await call(app, "POST", "/babies", headers=headers, json_body={"name": "Bench", "birth_date": "2025-01-01"})
+    return SimpleNamespace(headers=headers, user_id=user_id, baby_id=baby.json()["id"])
+
+
+def tree_label() -> str:
+    """Commit of the checkout being measured"""
+    try:
+        return subprocess.run(
+            ["git", "-C", str(ROOT), "log", "-1", "--format=%h %s"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return str(ROOT)
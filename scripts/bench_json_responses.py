@@ -0,0 +1,47 @@
+"""Serialization cost of large activity responses (10k activities by default).
+
+    python scripts/bench_json_responses.py [--count 10000]
+    ORJSON_RESPONSES=false python scripts/bench_json_responses.py
+
+Times GET /babies/{id}/activities returning every activity and the same
+list with a sparse fieldset. Run it with ORJSON_RESPONSES=false
+to separate the row path from the encoder.
+"""
+import argparse
+import asyncio
+
+from bench_common import call, create_owner, measure_async, print_table, running_app, seed_activities, tree_label
+
+
+async def main(count: int) -> None:
+    async with running_app() as app:
+        from app.core.config import settings
+
+        owner = await create_owner(app)
+        await seed_activities(owner.baby_id, owner.user_id, count, 90)
+        url = f"/babies/{owner.baby_id}/activities"
+
+        rows = []
+        for name, path in (
+            ("all fields", url),
+            ("fields=id,type,timestamp", f"{url}?fields=id,type,timestamp"),
+        ):
+            async def get():
+                response = await call(app, "GET", path, headers=owner.headers, keep_body=False)
+                assert response.status == 200, response.status
+                return response
+
+            ms, peak, response = await measure_async(get, repeat=5)
+            rows.append((name, ms, peak, f"{response.size / 1024:,.0f}"))
+
+    print_table(
+        f"{count:,} activities, ORJSON_RESPONSES={getattr(settings, 'ORJSON_RESPONSES', 'n/a')} - {tree_label()}",
+        ("request", "ms", "peak MiB", "body KiB"),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=10_000)
+    asyncio.run(main(parser.parse_args().count))
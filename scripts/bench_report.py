@@ -0,0 +1,81 @@
+"""PDF report rendering: one pediatric report over a long window.
+
+    python scripts/bench_report.py [--days 365] [--per-day 12] [--health-per-day 2] [--renders 50]
+
+Calls generate_pediatric_report directly (no database, no process pool)
+and reads the result back the way the download does. The health table has
+no row limit, so health records are what make a long report many pages.
+A batch of short 7-day reports shows the fixed cost paid by every render.
+"""
+import argparse
+import re
+from datetime import date, datetime, timedelta
+
+from bench_common import make_activities, measure, print_table, tree_label
+
+from app.models.activity import Activity
+from app.models.baby import Baby
+from app.services.pdf_generator import generate_pediatric_report
+
+CHUNK_SIZE = 64 * 1024
+
+
+def render(baby, activities, start_date, end_date) -> bytes:
+    report = generate_pediatric_report(baby, activities, start_date, end_date)
+    try:
+        # Como la descarga: por trozos
+        return b"".join(iter(lambda: report.read(CHUNK_SIZE), b""))
+    finally:
+        report.close()
+
+
+def health_records(count: int, days: int) -> list:
+    end = datetime.utcnow()
+    step = timedelta(days=days) / count
+    return [
+        Activity(baby_id=1, type="health" if index % 2 else "medical", timestamp=end - step * (count - index), data={
+            "temperature": 37.8, "medication": "Paracetamol", "dosage": "2.5 ml"
+        }, notes="control")
+        for index in range(count)
+    ]
+
+
+def main(days: int, per_day: int, health_per_day: int, renders: int) -> None:
+    baby = Baby(id=1, name="Bench", birth_date=date.today() - timedelta(days=days + 30))
+    activities = make_activities(days * per_day, days) + health_records(days * health_per_day, days)
+    activities.sort(key=lambda a: a.timestamp, reverse=True)
+    end_date = datetime.utcnow()
+    start_date = end_date - timedelta(days=days)
+
+    ms, peak, pdf = measure(lambda: render(baby, activities, start_date, end_date))
+    pages = len(re.findall(rb"/Type /Page\b", pdf))
+    rows = [(f"{days} days", ms, peak, pages, f"{len(pdf) / 1024:,.0f}")]
+
+    # Informes cortos: pesa lo que cuesta preparar cada render, no el contenido
+    week_start = end_date - timedelta(days=7)
+    week = [a for a in activities if a.timestamp >= week_start]
+
+    def render_week():
+        for _ in range(renders):
+            pdf = render(baby, week, week_start, end_date)
+        return pdf
+
+    ms, peak, pdf = measure(render_week)
+    pages = len(re.findall(rb"/Type /Page\b", pdf))
+    rows.append((f"7 days, per report of {renders}", ms / renders, peak, pages, f"{len(pdf) / 1024:,.0f}"))
+
+    print_table(
+        f"{days}-day report, {len(activities):,} activities - {tree_label()}",
+        ("report", "ms", "peak MiB", "pages", "PDF KiB"),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--per-day", type=int, default=12)
+    parser.add_argument("--health-per-day", type=int, default=2)
+    parser.add_argument("--renders", type=int, default=50)
+    args = parser.parse_args()
+    main(args.days, args.per_day, args.health_per_day, args.renders)
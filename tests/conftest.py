@@ -0,0 +1,111 @@
+"""Shared fixtures: the app against a throwaway SQLite database.
+
+The settings are read when ``app`` is imported, so the environment is set
+here first. Async database helpers run on the TestClient's own event loop
+(``run``) so they share the engine with the requests.
+"""
+import itertools
+import os
+import tempfile
+from types import SimpleNamespace
+
+_tmp = tempfile.mkdtemp(prefix="babycare-tests-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite+aiosqlite:///{_tmp}/test.db",
+    "SECRET_KEY": "test-secret",
+    "DEBUG": "false",
+    # Argon2 barato: los tests registran bastantes usuarios
+    "ARGON2_TIME_COST": "1",
+    "ARGON2_MEMORY_COST": "8",
+    "ARGON2_PARALLELISM": "1",
+    "ML_POOL_WORKERS": "0",
+    "REPORT_WORKERS": "0",
+    "TRAINING_SCHEDULER_ENABLED": "false",
+    "EVENTS_BACKEND": "local",
+    "MODEL_STORE_DIR": f"{_tmp}/model_store",
+    "MEDIA_STORE_DIR": f"{_tmp}/media_store",
+    "REPORT_STORE_DIR": f"{_tmp}/report_store",
+})
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.database import Base, SessionLocal, engine
+import app.models  # noqa: F401  (registra todas las tablas en Base.metadata)
+from app.main import app
+
+engine.echo = False
+
+
+@event.listens_for(engine.sync_engine, "connect")
+def _sqlite_foreign_keys(dbapi_connection, connection_record):
+    # Los ON DELETE CASCADE de los modelos necesitan las claves foráneas activas en SQLite
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+async def _create_schema() -> None:
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as test_client:
+        test_client.portal.call(_create_schema)
+        yield test_client
+
+
+@pytest.fixture
+def run(client):
+    """Call ``fn(db, *args)`` with a fresh session on the app's event loop"""
+    def call(fn, *args):
+        async def with_session():
+            async with SessionLocal() as db:
+                return await fn(db, *args)
+        return client.portal.call(with_session)
+    return call
+
+
+_emails = itertools.count(1)
+
+
+@pytest.fixture
+def make_user(client):
+    """Register a user; returns it with ``headers``, ``id`` and ``email``"""
+    def make():
+        email = f"user{next(_emails)}@example.com"
+        response = client.post("/auth/register", json={"email": email, "password": "password1", "name": "Test"})
+        assert response.status_code == 201, response.text
+        token = client.post("/auth/login", data={"username": email, "password": "password1"}).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        user_id = client.get("/auth/users/me", headers=headers).json()["id"]
+        return SimpleNamespace(headers=headers, id=user_id, email=email)
+    return make
+
+
+@pytest.fixture
+def owner(make_user):
+    return make_user()
+
+
+@pytest.fixture
+def baby_id(client, owner):
+    response = client.post("/babies", headers=owner.headers, json={"name": "Bebé", "birth_date": "2025-01-01"})
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+@pytest.fixture
+def statements(client):
+    """SQL statements sent to the database while the test runs"""
+    sent = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        sent.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    yield sent
+    event.remove(engine.sync_engine, "before_cursor_execute", capture)
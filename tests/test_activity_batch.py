@@ -0,0 +1,42 @@
+from app.services.activity_writes import get_data_version
+
+
+def _batch(client, headers, baby_id, items):
+    response = client.post(f"/babies/{baby_id}/activities:batch", headers=headers, json={"items": items})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+ITEMS = [
+    {"type": "feeding", "timestamp": "2025-06-01T08:00:00Z", "data": {"quantity_ml": 100}, "idempotency_key": "a"},
+    {"type": "diaper", "timestamp": "2025-06-01T09:00:00Z", "idempotency_key": "b"},
+    {"type": "diaper", "timestamp": "2025-06-01T09:00:00Z", "idempotency_key": "b"},
+    {"type": "sleep", "timestamp": "2025-06-01T10:00:00Z"},
+]
+
+
+def test_batch_reports_created_and_duplicates(client, run, owner, baby_id):
+    result = _batch(client, owner.headers, baby_id, ITEMS)
+    assert [item["status"] for item in result["results"]] == ["created", "created", "duplicate", "created"]
+    assert (result["created"], result["duplicates"]) == (3, 1)
+    assert result["results"][2]["activity"]["id"] == result["results"][1]["activity"]["id"]
+
+    # Todas las filas del lote llevan la versión que quedó en el bebé
+    version = run(get_data_version, baby_id)
+    changes = client.get(f"/babies/{baby_id}/activities/changes", headers=owner.headers).json()
+    assert {change["version"] for change in changes["upserted"]} == {version}
+
+
+def test_retried_batch_changes_nothing(client, run, owner, baby_id):
+    keyed = [item for item in ITEMS if "idempotency_key" in item]
+    first = _batch(client, owner.headers, baby_id, keyed)
+    version = run(get_data_version, baby_id)
+    etag = client.get(f"/babies/{baby_id}/activities", headers=owner.headers).headers["ETag"]
+
+    retry = _batch(client, owner.headers, baby_id, keyed)
+    assert retry["created"] == 0
+    assert [item["activity"]["id"] for item in retry["results"]] == [item["activity"]["id"] for item in first["results"]]
+    # Un reintento no sube la versión: ETags, cachés y token de sincronización siguen valiendo
+    assert run(get_data_version, baby_id) == version
+    cached = client.get(f"/babies/{baby_id}/activities", headers={**owner.headers, "If-None-Match": etag})
+    assert cached.status_code == 304
@@ -0,0 +1,37 @@
+from datetime import datetime
+
+import numpy as np
+
+from app.models.activity import Activity
+from app.services.activity_frame import ActivityFrame, DIAPER_KINDS, US_PER_HOUR
+from app.services.rollup_service import aggregate_daily
+
+ACTIVITIES = [
+    Activity(baby_id=1, type="sleep", timestamp=datetime(2025, 3, 2, 21, 30), data={"duration_hours": 8}),
+    Activity(baby_id=1, type="feeding", timestamp=datetime(2025, 3, 1, 8), data={"quantity_ml": 120}),
+    Activity(baby_id=1, type="feeding", timestamp=datetime(2025, 3, 1, 11), data={"quantity_ml": "abc"}),
+    Activity(baby_id=1, type="diaper", timestamp=datetime(2025, 3, 2, 9), data={"type": "dirty"}),
+    Activity(baby_id=1, type="medical", timestamp=datetime(2025, 3, 2, 10), data=None),
+    Activity(baby_id=1, type="unknown", timestamp=datetime(2025, 3, 3, 10), data={}),
+]
+
+
+def test_frame_columns():
+    frame = ActivityFrame.from_activities(ACTIVITIES)
+    assert len(frame) == len(ACTIVITIES)
+    # Orden cronológico
+    assert np.all(np.diff(frame.ts_us) > 0)
+    assert frame.of_type("feeding").sum() == 2
+    # Los valores no numéricos quedan como NaN (las sumas usan nansum)
+    quantities = frame.quantity_ml[frame.of_type("feeding")]
+    assert quantities[0] == 120.0 and np.isnan(quantities[1])
+    assert frame.diaper_kind[frame.of_type("diaper")][0] == DIAPER_KINDS["dirty"]
+    assert list(frame.hour[:2]) == [8, 11]
+    # 2025-03-01 fue sábado
+    assert frame.weekday[0] == 5
+    assert (frame.ts_us[1] - frame.ts_us[0]) == 3 * US_PER_HOUR
+
+
+def test_frame_daily_stats_match_the_rollup_rule():
+    assert ActivityFrame.from_activities(ACTIVITIES).daily_stats() == aggregate_daily(ACTIVITIES)
+    assert ActivityFrame.from_rows([]).daily_stats() == {}
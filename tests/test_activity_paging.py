@@ -0,0 +1,74 @@
+import json
+
+
+def _create(client, headers, baby_id, count):
+    # Varias actividades con la misma hora: el id desempata el orden del cursor
+    timestamps = ["2025-04-01T10:00:00Z"] * 4 + [f"2025-04-0{day}T08:00:00Z" for day in range(2, 2 + count - 4)]
+    for timestamp in timestamps:
+        response = client.post(f"/babies/{baby_id}/activities", headers=headers, json={"type": "diaper", "timestamp": timestamp})
+        assert response.status_code == 201, response.text
+
+
+def test_keyset_pages_cover_the_list_once(client, owner, baby_id):
+    _create(client, owner.headers, baby_id, 8)
+    url = f"/babies/{baby_id}/activities"
+    full = client.get(url, headers=owner.headers).json()
+    assert len(full) == 8
+
+    pages = []
+    params = {"limit": 3}
+    while True:
+        response = client.get(url, headers=owner.headers, params=params)
+        assert response.status_code == 200
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        params = {"limit": 3, "cursor": cursor}
+
+    assert [len(page) for page in pages] == [3, 3, 2]
+    ids = [activity["id"] for page in pages for activity in page]
+    assert ids == [activity["id"] for activity in full]
+    assert len(set(ids)) == len(ids)
+
+
+def test_exact_last_page_has_no_cursor(client, owner, baby_id):
+    _create(client, owner.headers, baby_id, 6)
+    url = f"/babies/{baby_id}/activities"
+    first = client.get(url, headers=owner.headers, params={"limit": 3})
+    second = client.get(url, headers=owner.headers, params={"limit": 3, "cursor": first.headers["X-Next-Cursor"]})
+    assert len(second.json()) == 3
+    assert "X-Next-Cursor" not in second.headers
+
+
+def test_ndjson_matches_json(client, owner, baby_id):
+    _create(client, owner.headers, baby_id, 5)
+    url = f"/babies/{baby_id}/activities"
+    full = client.get(url, headers=owner.headers).json()
+    lines = client.get(url, headers=owner.headers, params={"format": "ndjson"}).text.splitlines()
+    assert [json.loads(line) for line in lines] == full
+
+
+def test_invalid_cursor_is_rejected(client, owner, baby_id):
+    response = client.get(f"/babies/{baby_id}/activities", headers=owner.headers, params={"limit": 3, "cursor": "nope"})
+    assert response.status_code == 400
+
+
+def test_ndjson_pages_end_with_the_next_cursor(client, owner, baby_id):
+    _create(client, owner.headers, baby_id, 7)
+    url = f"/babies/{baby_id}/activities"
+    full = client.get(url, headers=owner.headers).json()
+
+    streamed = []
+    params = {"format": "ndjson", "limit": 3}
+    while True:
+        lines = [json.loads(line) for line in client.get(url, headers=owner.headers, params=params).text.splitlines()]
+        if lines and "next_cursor" in lines[-1]:
+            streamed.extend(lines[:-1])
+            assert len(lines) == 4
+            params = {"format": "ndjson", "limit": 3, "cursor": lines[-1]["next_cursor"]}
+            continue
+        streamed.extend(lines)
+        break
+
+    assert streamed == full
@@ -0,0 +1,119 @@
+from app.services.activity_writes import prune_tombstones
+
+
+def _post(client, headers, baby_id, hour):
+    response = client.post(f"/babies/{baby_id}/activities", headers=headers, json={
+        "type": "diaper", "timestamp": f"2025-05-01T{hour:02d}:00:00Z"
+    })
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def _changes(client, headers, baby_id, **params):
+    response = client.get(f"/babies/{baby_id}/activities/changes", headers=headers, params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_token_semantics(client, owner, baby_id):
+    headers = owner.headers
+    first, second, third = (_post(client, headers, baby_id, hour) for hour in (1, 2, 3))
+
+    initial = _changes(client, headers, baby_id)
+    assert sorted(change["id"] for change in initial["upserted"]) == [first, second, third]
+    assert initial["deleted"] == [] and not initial["has_more"]
+    token = initial["sync_token"]
+
+    # Sin escrituras nuevas el mismo token devuelve una página vacía
+    assert _changes(client, headers, baby_id, since=token) == {
+        "sync_token": token, "has_more": False, "upserted": [], "deleted": []
+    }
+
+    client.put(f"/babies/{baby_id}/activities/{first}", headers=headers, json={
+        "type": "diaper", "timestamp": "2025-05-01T04:00:00Z", "notes": "edited"
+    })
+    client.delete(f"/babies/{baby_id}/activities/{second}", headers=headers)
+    fourth = _post(client, headers, baby_id, 5)
+
+    delta = _changes(client, headers, baby_id, since=token)
+    assert sorted(change["id"] for change in delta["upserted"]) == [first, fourth]
+    assert delta["deleted"] == [second]
+    assert delta["sync_token"] == token + 3
+    assert all(token < change["version"] <= delta["sync_token"] for change in delta["upserted"])
+
+    # limit=1: una escritura por página, en orden de versión, sin repetir ni saltar ninguna
+    pages = []
+    since = token
+    while True:
+        page = _changes(client, headers, baby_id, since=since, limit=1)
+        pages.append((page["upserted"], page["deleted"]))
+        assert page["sync_token"] > since
+        since = page["sync_token"]
+        if not page["has_more"]:
+            break
+    assert [([c["id"] for c in upserted], deleted) for upserted, deleted in pages] == [
+        ([first], []), ([], [second]), ([fourth], [])
+    ]
+    assert since == delta["sync_token"]
+
+
+def test_batch_larger_than_limit_is_returned_whole(client, owner, baby_id):
+    headers = owner.headers
+    token = _changes(client, headers, baby_id)["sync_token"]
+    response = client.post(f"/babies/{baby_id}/activities:batch", headers=headers, json={"items": [
+        {"type": "diaper", "timestamp": f"2025-05-02T{hour:02d}:00:00Z"} for hour in range(3)
+    ]})
+    assert response.status_code == 200, response.text
+
+    page = _changes(client, headers, baby_id, since=token, limit=2)
+    assert len(page["upserted"]) == 3
+    assert {change["version"] for change in page["upserted"]} == {page["sync_token"]}
+    assert _changes(client, headers, baby_id, since=page["sync_token"])["upserted"] == []
+
+
+def test_pruned_token_requires_resync(client, run, owner, baby_id):
+    headers = owner.headers
+    activity_id = _post(client, headers, baby_id, 1)
+    token = _changes(client, headers, baby_id)["sync_token"]
+    client.delete(f"/babies/{baby_id}/activities/{activity_id}", headers=headers)
+    current = _changes(client, headers, baby_id, since=token)["sync_token"]
+
+    # Retención negativa: todas las lápidas quedan fuera de plazo
+    assert run(prune_tombstones, -1) >= 1
+
+    response = client.get(f"/babies/{baby_id}/activities/changes", headers=headers, params={"since": token})
+    assert response.status_code == 410
+    # Un token posterior al horizonte sigue siendo válido, y la resincronización también
+    assert _changes(client, headers, baby_id, since=current)["deleted"] == []
+    assert _changes(client, headers, baby_id)["sync_token"] == current
+
+
+def test_recent_tombstones_survive_pruning(client, run, owner, baby_id):
+    headers = owner.headers
+    activity_id = _post(client, headers, baby_id, 1)
+    token = _changes(client, headers, baby_id)["sync_token"]
+    client.delete(f"/babies/{baby_id}/activities/{activity_id}", headers=headers)
+
+    run(prune_tombstones, 90)
+    assert _changes(client, headers, baby_id, since=token)["deleted"] == [activity_id]
+
+
+def test_edits_are_sent_once_with_their_latest_version(client, owner, baby_id):
+    headers = owner.headers
+    activity_id = _post(client, headers, baby_id, 1)
+    token = _changes(client, headers, baby_id)["sync_token"]
+    for notes in ("uno", "dos"):
+        client.put(f"/babies/{baby_id}/activities/{activity_id}", headers=headers, json={
+            "type": "diaper", "timestamp": "2025-05-01T01:00:00Z", "notes": notes
+        })
+
+    delta = _changes(client, headers, baby_id, since=token)
+    assert [(change["id"], change["notes"], change["version"]) for change in delta["upserted"]] == [
+        (activity_id, "dos", delta["sync_token"])
+    ]
+
+
+def test_changes_need_access(client, make_user, baby_id):
+    stranger = make_user()
+    response = client.get(f"/babies/{baby_id}/activities/changes", headers=stranger.headers)
+    assert response.status_code == 403
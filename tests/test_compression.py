@@ -0,0 +1,91 @@
+import gzip
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware, accepted_encodings
+
+TEXT = "actividad " * 500
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @app.get("/text")
+    def text():
+        return PlainTextResponse(TEXT, headers={"ETag": '"v1"'})
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("ok", headers={"ETag": '"v1"'})
+
+    @app.get("/image")
+    def image():
+        return Response(b"\x89PNG" + b"\0" * 1000, media_type="image/png")
+
+    @app.get("/ndjson")
+    def ndjson():
+        return StreamingResponse((f'{{"n": {n}}}\n' for n in range(300)), media_type="application/x-ndjson")
+
+    return app
+
+
+def _raw(client, path, encoding="gzip"):
+    # stream=True: httpx no descomprime el cuerpo y se ven los bytes enviados
+    with client.stream("GET", path, headers={"Accept-Encoding": encoding}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+def test_accepted_encodings():
+    assert accepted_encodings("gzip, deflate;q=0.5, br;q=0") == {"gzip", "deflate"}
+    assert accepted_encodings("GZIP;q=bad, identity") == {"identity"}
+    assert accepted_encodings("") == set()
+
+
+def test_text_is_gzipped_and_the_etag_weakened():
+    client = TestClient(_app())
+    response, body = _raw(client, "/text")
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["etag"] == 'W/"v1"'
+    assert int(response.headers["content-length"]) == len(body) < len(TEXT)
+    assert gzip.decompress(body).decode() == TEXT
+
+    response, body = _raw(client, "/text", encoding="identity")
+    assert "content-encoding" not in response.headers and response.headers["etag"] == '"v1"'
+    assert body.decode() == TEXT
+
+
+def test_small_binary_and_streamed_responses():
+    client = TestClient(_app())
+    response, body = _raw(client, "/small")
+    assert body == b"ok" and "content-encoding" not in response.headers
+    assert response.headers["etag"] == '"v1"' and response.headers["vary"] == "Accept-Encoding"
+
+    response, body = _raw(client, "/image")
+    assert "content-encoding" not in response.headers and "vary" not in response.headers
+    assert len(body) == 1004
+
+    # Respuesta en streaming: se comprime trozo a trozo, sin Content-Length
+    response, body = _raw(client, "/ndjson")
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert gzip.decompress(body).decode().splitlines()[-1] == '{"n": 299}'
+
+
+def test_weak_etag_revalidates(client, owner, baby_id):
+    url = f"/babies/{baby_id}/activities"
+    for hour in range(20):
+        client.post(url, headers=owner.headers, json={
+            "type": "diaper", "timestamp": f"2025-07-01T{hour:02d}:00:00Z", "notes": "pañal " * 20
+        })
+
+    response = client.get(url, headers={**owner.headers, "Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+    # El cliente devuelve el ETag débil que recibió y la API lo compara en débil
+    revalidated = client.get(url, headers={**owner.headers, "Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert revalidated.status_code == 304
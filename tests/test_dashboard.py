@@ -0,0 +1,54 @@
+from sqlalchemy import select, text
+from sqlalchemy.dialects import sqlite
+
+from app.services.dashboard_service import _latest_activities
+
+
+def _post(client, headers, baby_id, activity_type, timestamp):
+    response = client.post(f"/babies/{baby_id}/activities", headers=headers, json={"type": activity_type, "timestamp": timestamp})
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def test_dashboard_lists_roles_and_latest_activity_per_type(client, owner, make_user, baby_id):
+    headers = owner.headers
+    empty = client.post("/babies", headers=headers, json={"name": "Sin actividades", "birth_date": "2025-02-01"}).json()["id"]
+    other = make_user()
+    client.post(f"/babies/{baby_id}/caregivers", headers=headers, json={"email": other.email})
+
+    _post(client, headers, baby_id, "feeding", "2025-07-01T08:00:00Z")
+    _post(client, headers, baby_id, "feeding", "2025-07-01T12:00:00Z")
+    # Misma hora: gana el id más alto
+    tied = _post(client, headers, baby_id, "feeding", "2025-07-01T12:00:00Z")
+    sleep = _post(client, headers, baby_id, "sleep", "2025-07-01T10:00:00Z")
+    newest_diaper = _post(client, headers, baby_id, "diaper", "2025-07-02T09:00:00Z")
+    deleted = _post(client, headers, baby_id, "diaper", "2025-07-03T09:00:00Z")
+    client.delete(f"/babies/{baby_id}/activities/{deleted}", headers=headers)
+
+    response = client.get("/babies/dashboard", headers=headers)
+    assert response.status_code == 200
+    dashboard = {baby["id"]: baby for baby in response.json()}
+    assert dashboard[empty]["latest_activities"] == {}
+    baby = dashboard[baby_id]
+    assert (baby["role"], baby["caregiver_count"]) == ("owner", 2)
+    assert {kind: activity["id"] for kind, activity in baby["latest_activities"].items()} == {
+        "feeding": tied, "sleep": sleep, "diaper": newest_diaper
+    }
+
+    # El cuidador solo ve el bebé compartido, con su propio rol
+    shared = client.get("/babies/dashboard", headers=other.headers).json()
+    assert [(entry["id"], entry["role"]) for entry in shared] == [(baby_id, "caregiver")]
+
+
+async def _latest_activity_plan(db):
+    query = select(_latest_activities("sqlite", select(1).scalar_subquery()))
+    sql = str(query.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+    return [row[-1] for row in (await db.execute(text(f"EXPLAIN QUERY PLAN {sql}"))).all()]
+
+
+def test_latest_activity_uses_the_type_index(run):
+    plan = run(_latest_activity_plan)
+    assert any("ix_activities_baby_id_type_timestamp" in step for step in plan), plan
+    # Ni recorrido completo de activities ni ordenación aparte
+    assert not any(step.startswith("SCAN activities") for step in plan), plan
+    assert not any("TEMP B-TREE FOR ORDER BY" in step for step in plan), plan
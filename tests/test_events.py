@@ -0,0 +1,62 @@
+import json
+
+import pytest
+from sqlalchemy import delete
+
+from app.database import SessionLocal
+from app.models.user import User
+from app.models.user_baby import UserBaby
+from app.routers.events import stream_baby_events
+from app.services.event_hub import LocalEventHub, activity_event, create_event_hub, event_hub
+
+
+def test_postgres_backend_that_cannot_be_used_fails_at_startup():
+    assert isinstance(create_event_hub("local", 10), LocalEventHub)
+    # La URL de los tests es SQLite: caer en el hub local dejaría sin eventos a los demás workers
+    with pytest.raises(RuntimeError):
+        create_event_hub("postgres", 10)
+    with pytest.raises(RuntimeError):
+        create_event_hub("redis", 10)
+
+
+def test_slow_client_gets_a_resync():
+    hub = LocalEventHub(queue_size=2)
+    queue = hub.subscribe(1, 1)
+    for activity_id in range(3):
+        hub.deliver(1, json.dumps(activity_event("created", [activity_id], activity_id)))
+    assert queue.get_nowait() == json.dumps({"type": "resync"})
+    assert queue.empty()
+    hub.unsubscribe(1, 1, queue)
+    assert hub.stats()["connections"] == 0
+
+
+def test_stream_delivers_events_and_ends_on_revocation(client, run, owner, make_user, baby_id):
+    other = make_user()
+    added = client.post(f"/babies/{baby_id}/caregivers", headers=owner.headers, json={"email": other.email})
+    assert added.status_code == 201
+
+    # TestClient espera al final del cuerpo: el stream se recorre directamente en el loop de la app
+    async def follow(db):
+        user = await db.get(User, other.id)
+        response = await stream_baby_events(baby_id, role="caregiver", current_user=user, db=db)
+        body = response.body_iterator
+        received = [await body.__anext__()]
+
+        event = activity_event("created", [1], 7)
+        await event_hub.publish(baby_id, event)
+        received.append(await body.__anext__())
+
+        async with SessionLocal() as session:
+            await session.execute(delete(UserBaby).where(UserBaby.user_id == other.id, UserBaby.baby_id == baby_id))
+            await session.commit()
+        await event_hub.publish_access_change([other.id])
+        received.append(await body.__anext__())
+        with pytest.raises(StopAsyncIteration):
+            await body.__anext__()
+        return received
+
+    retry, data, revoked = run(follow)
+    assert retry.startswith("retry:")
+    assert json.loads(data.removeprefix("data: ")) == activity_event("created", [1], 7)
+    assert json.loads(revoked.removeprefix("data: ")) == {"type": "access.revoked"}
+    assert event_hub.stats()["connections"] == 0
@@ -0,0 +1,55 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from app.database import engine
+
+
+@contextmanager
+def _captured_activity_range_queries():
+    """SQL (and parameters) of the per-baby range queries on activities run inside the block"""
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().startswith("SELECT") and "FROM activities" in statement and "activities.timestamp >=" in statement:
+            captured.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        yield captured
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+
+async def _plans(db, queries):
+    connection = await db.connection()
+    return [
+        [row[-1] for row in (await connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)).all()]
+        for statement, parameters in queries
+    ]
+
+
+def test_range_queries_use_the_composite_indexes(client, run, owner, baby_id):
+    for day in range(1, 4):
+        client.post(f"/babies/{baby_id}/activities", headers=owner.headers, json={
+            "type": "feeding", "timestamp": f"2025-08-0{day}T08:00:00Z", "data": {"quantity_ml": 100}
+        })
+
+    with _captured_activity_range_queries() as queries:
+        window = {"start_date": "2025-08-01T00:00:00Z", "end_date": "2025-08-31T00:00:00Z"}
+        assert client.get(f"/babies/{baby_id}/activities", headers=owner.headers, params=window).status_code == 200
+        typed = {**window, "activity_type": "feeding", "limit": 2}
+        assert client.get(f"/babies/{baby_id}/activities", headers=owner.headers, params=typed).status_code == 200
+        # Insights lee el periodo con load_activity_frame
+        assert client.get(f"/babies/{baby_id}/insights", headers=owner.headers).status_code == 200
+    assert len(queries) == 3
+
+    plans = run(_plans, queries)
+    for (statement, _), plan in zip(queries, plans):
+        assert any(
+            "ix_activities_baby_id_timestamp" in step or "ix_activities_baby_id_type_timestamp" in step
+            for step in plan
+        ), (statement, plan)
+        assert not any(step.startswith("SCAN activities") for step in plan), (statement, plan)
+    # Con filtro de tipo se usa el índice de tres columnas
+    assert any("ix_activities_baby_id_type_timestamp" in step for step in plans[1]), plans[1]
@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta
+
+from app.core.config import settings
+from app.services.ml_pool import ml_pool
+
+
+def test_models_run_once_per_data_version(client, owner, baby_id, monkeypatch):
+    calls = []
+    run_models = ml_pool.run_models
+
+    async def counting_run_models(*args, **kwargs):
+        calls.append(args)
+        return await run_models(*args, **kwargs)
+
+    monkeypatch.setattr(ml_pool, "run_models", counting_run_models)
+    # Un tramo por petición: los campos relativos al reloj cambian siempre
+    monkeypatch.setattr(settings, "INSIGHTS_CACHE_BUCKET_SECONDS", 1e-6)
+
+    last_feeding = datetime.utcnow() - timedelta(hours=5)
+    for hours in (9, 7):
+        client.post(f"/babies/{baby_id}/activities", headers=owner.headers, json={
+            "type": "feeding", "timestamp": (last_feeding - timedelta(hours=hours)).isoformat(), "data": {"quantity_ml": 100}
+        })
+    client.post(f"/babies/{baby_id}/activities", headers=owner.headers, json={
+        "type": "feeding", "timestamp": last_feeding.isoformat(), "data": {"quantity_ml": 100}
+    })
+
+    url = f"/babies/{baby_id}/insights"
+    first = client.get(url, headers=owner.headers)
+    second = client.get(url, headers=owner.headers)
+    assert first.status_code == second.status_code == 200
+    assert len(calls) == 1
+    assert first.headers["ETag"] != second.headers["ETag"]
+    # El aviso de horas desde la última toma se recalcula sobre la salida guardada
+    assert first.json()["alerts"][0]["title"] == "Tiempo desde última toma"
+    assert second.json()["alerts"][0]["title"] == "Tiempo desde última toma"
+
+    client.post(f"/babies/{baby_id}/activities", headers=owner.headers, json={
+        "type": "feeding", "timestamp": datetime.utcnow().isoformat(), "data": {"quantity_ml": 90}
+    })
+    third = client.get(url, headers=owner.headers).json()
+    assert len(calls) == 2
+    assert all(alert["title"] != "Tiempo desde última toma" for alert in third["alerts"])
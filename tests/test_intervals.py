@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.models.activity import Activity
+from app.models.interval_estimator import IntervalEstimator
+from app.services.interval_service import (
+    STATE_FIELDS, load_interval_states, predict_next_feeding, state_from_timestamps
+)
+
+
+async def _stored_and_rebuilt(db, baby_id):
+    row = await db.scalar(select(IntervalEstimator).where(IntervalEstimator.baby_id == baby_id, IntervalEstimator.type == "feeding"))
+    timestamps = (await db.scalars(select(Activity.timestamp).where(
+        Activity.baby_id == baby_id, Activity.type == "feeding"
+    ).order_by(Activity.timestamp))).all()
+    return row, state_from_timestamps(timestamps)
+
+
+def _assert_same_state(row, expected):
+    assert not row.stale
+    for field in STATE_FIELDS:
+        value = getattr(row, field)
+        if isinstance(value, float):
+            assert value == pytest.approx(expected[field])
+        elif field == "hour_buckets":
+            assert value == [pytest.approx(bucket) for bucket in expected[field]]
+        else:
+            assert value == expected[field]
+
+
+def test_online_updates_match_a_rebuild(client, run, owner, baby_id):
+    url = f"/babies/{baby_id}/activities"
+    start = datetime(2025, 4, 1, 1)
+
+    def post(hours):
+        return client.post(url, headers=owner.headers, json={
+            "type": "feeding", "timestamp": (start + timedelta(hours=hours)).isoformat()
+        }).json()["id"]
+
+    for hours in (0, 3, 6.5):
+        post(hours)
+    run(load_interval_states, baby_id)
+
+    # Altas en orden: actualización O(1) del estado guardado
+    for hours in (9, 12.25, 15):
+        post(hours)
+    _assert_same_state(*run(_stored_and_rebuilt, baby_id))
+
+    # Alta anterior a la última: se marca para recalcular y la lectura lo reconstruye
+    post(1)
+    row, _ = run(_stored_and_rebuilt, baby_id)
+    assert row.stale
+    run(load_interval_states, baby_id)
+    _assert_same_state(*run(_stored_and_rebuilt, baby_id))
+
+    client.delete(f"{url}/{post(18)}", headers=owner.headers)
+    assert run(_stored_and_rebuilt, baby_id)[0].stale
+
+
+def test_prediction_from_state():
+    start = datetime.utcnow() - timedelta(hours=7)
+    state = state_from_timestamps([start, start + timedelta(hours=3), start + timedelta(hours=6)])
+    prediction = predict_next_feeding(state)
+    assert prediction["has_prediction"]
+    assert prediction["avg_interval_hours"] == 3.0
+    assert prediction["hours_since_last"] == pytest.approx(1.0, abs=0.1)
+    assert prediction["intervals_observed"] == 2
+    assert not predict_next_feeding(state_from_timestamps([start]))["has_prediction"]
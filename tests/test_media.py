@@ -0,0 +1,94 @@
+import base64
+import io
+
+import pytest
+from PIL import Image
+
+from app.core.media_urls import MEDIA_URL_PREFIX, is_media_name, media_url, thumbnail_name, thumbnail_url
+from app.services.media_store import InvalidImage, MediaStore
+
+
+def _png(color="red", size=(400, 300)) -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", size, color).save(out, "PNG")
+    return out.getvalue()
+
+
+def _data_url(data: bytes) -> str:
+    return "data:image/png;base64," + base64.b64encode(data).decode()
+
+
+def test_url_builders():
+    name = "0123456789abcdef0123456789abcdef.png"
+    assert is_media_name(name) and is_media_name(thumbnail_name(name))
+    assert thumbnail_name(name) == "0123456789abcdef0123456789abcdef_thumb.jpg"
+    assert media_url(name) == MEDIA_URL_PREFIX + name
+    assert thumbnail_url(name) == MEDIA_URL_PREFIX + thumbnail_name(name)
+    # Las fotos antiguas guardadas en línea se devuelven tal cual
+    assert media_url("data:image/png;base64,AAAA") == "data:image/png;base64,AAAA"
+    assert media_url(None) is None and thumbnail_url("") == ""
+    for bad in ("../etc/passwd", "0123456789abcdef.png", name.upper(), name[:-3] + "svg"):
+        assert not is_media_name(bad)
+
+
+def test_store_names_are_keyed_and_deduplicated(tmp_path, monkeypatch):
+    store = MediaStore(str(tmp_path), max_bytes=1_000_000, thumbnail_size=64)
+    data = _png()
+    name = store.save(data)
+    assert is_media_name(name) and name.endswith(".png")
+    assert store.path(name).read_bytes() == data
+    with Image.open(store.path(thumbnail_name(name))) as thumbnail:
+        assert thumbnail.format == "JPEG" and max(thumbnail.size) == 64
+
+    # Mismo contenido, mismo nombre: no se vuelve a escribir
+    assert store.save(data) == name
+    assert store.stats()["stored"] == 1 and store.stats()["deduplicated"] == 1
+    assert store.save(_png("blue")) != name
+
+    # El nombre es un HMAC con SECRET_KEY, no un hash del contenido que cualquiera pueda calcular
+    monkeypatch.setattr("app.services.media_store.settings.SECRET_KEY", "other-secret")
+    assert store.save(data) != name
+
+
+def test_store_rejects_invalid_uploads(tmp_path):
+    store = MediaStore(str(tmp_path), max_bytes=200, thumbnail_size=64)
+    with pytest.raises(InvalidImage):
+        store.save(_png())
+    with pytest.raises(InvalidImage):
+        store.save(b"not an image")
+    with pytest.raises(InvalidImage):
+        store._ingest("data:image/png;base64,***")
+    with pytest.raises(InvalidImage):
+        store._ingest(MEDIA_URL_PREFIX + "0123456789abcdef0123456789abcdef.png")
+
+
+def test_photo_upload_and_download(client, owner):
+    response = client.post("/babies", headers=owner.headers, json={
+        "name": "Foto", "birth_date": "2025-01-01", "photo": _data_url(_png("green"))
+    })
+    assert response.status_code == 201, response.text
+    baby = response.json()
+    assert baby["photo"].startswith(MEDIA_URL_PREFIX)
+    assert baby["photo_thumbnail"] == thumbnail_url(baby["photo"][len(MEDIA_URL_PREFIX):])
+
+    # Sin token: la URL es la credencial
+    photo = client.get(baby["photo"])
+    assert photo.status_code == 200
+    assert photo.headers["content-type"] == "image/png"
+    assert "immutable" in photo.headers["cache-control"]
+    assert client.get(baby["photo_thumbnail"]).headers["content-type"] == "image/jpeg"
+    assert client.get(baby["photo"], headers={"If-None-Match": photo.headers["etag"]}).status_code == 304
+
+    # Reenviar la URL recibida conserva la imagen
+    response = client.put(f"/babies/{baby['id']}", headers=owner.headers, json={
+        "name": "Foto", "birth_date": "2025-01-01", "photo": baby["photo"]
+    })
+    assert response.status_code == 200, response.text
+    assert response.json()["photo"] == baby["photo"]
+
+    response = client.post("/babies", headers=owner.headers, json={
+        "name": "Foto", "birth_date": "2025-01-01", "photo": "data:image/png;base64,bm90IGFuIGltYWdl"
+    })
+    assert response.status_code == 422
+    assert client.get(MEDIA_URL_PREFIX + "0" * 32 + ".png").status_code == 404
+    assert client.get(MEDIA_URL_PREFIX + "secret.png").status_code == 422
@@ -0,0 +1,42 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from app.services.activity_frame import ActivityFrame
+from app.services.ml_pool import MLModelPool, MODELS
+
+
+def _frame():
+    start = datetime.utcnow() - timedelta(days=14)
+    rows = []
+    for day in range(14):
+        for hour in (2, 6, 10, 14, 18, 22):
+            rows.append((start + timedelta(days=day, hours=hour), "feeding", {"quantity_ml": 90 + day + hour}))
+        rows.append((start + timedelta(days=day, hours=20), "sleep", {"duration_hours": 6 + day % 3}))
+        rows.append((start + timedelta(days=day, hours=9), "diaper", {"type": "wet"}))
+    return ActivityFrame.from_rows(sorted(rows, key=lambda row: row[0]))
+
+
+def test_process_pool_matches_inline_run():
+    frame = _frame()
+    inline = asyncio.run(MLModelPool(0, 60).run_models(frame))
+
+    pool = MLModelPool(1, 120)
+    try:
+        pooled = asyncio.run(pool.run_models(frame))
+    finally:
+        pool.shutdown()
+
+    assert set(pooled) == set(MODELS)
+    assert pooled == inline
+    assert pool.stats()["completed"] == len(MODELS)
+    assert pool.stats()["failures"] == pool.stats()["timeouts"] == 0
+
+
+def test_model_timeouts_yield_empty_results():
+    pool = MLModelPool(1, 0.0001)
+    try:
+        results = asyncio.run(pool.run_models(_frame()))
+    finally:
+        pool.shutdown()
+    assert results == {name: {} for name in MODELS}
+    assert pool.stats()["timeouts"] == len(MODELS)
@@ -0,0 +1,44 @@
+from app.services.model_store import ModelStore
+
+
+def _trainer(calls, model):
+    def train():
+        calls.append(model)
+        return model
+    return train
+
+
+def test_models_are_reused_until_enough_new_samples(tmp_path):
+    store = ModelStore(str(tmp_path), min_new_samples=5, max_age_hours=24)
+    calls = []
+    assert store.get_or_train(1, "m_14d", 10, 100, _trainer(calls, {"v": 1})) == {"v": 1}
+    assert store.get_or_train(1, "m_14d", 10, 100, _trainer(calls, {"v": 2})) == {"v": 1}
+    # Versión nueva con pocas muestras nuevas: se sigue usando el guardado
+    assert store.get_or_train(1, "m_14d", 11, 103, _trainer(calls, {"v": 3})) == {"v": 1}
+    assert store.get_or_train(1, "m_14d", 12, 110, _trainer(calls, {"v": 4})) == {"v": 4}
+    assert calls == [{"v": 1}, {"v": 4}]
+    assert store.stats()["hits"] == 2 and store.stats()["trained"] == 2
+
+    # Otro proceso (otro ModelStore sobre el mismo directorio) lee lo guardado
+    assert ModelStore(str(tmp_path), 5, 24).get_or_train(1, "m_14d", 12, 110, _trainer(calls, None)) == {"v": 4}
+
+
+def test_stale_models_are_served_when_requests_only_read(tmp_path):
+    trainer = ModelStore(str(tmp_path), min_new_samples=5, max_age_hours=24)
+    trainer.save(1, "m_14d", 1, 10, {"v": 1})
+    reader = ModelStore(str(tmp_path), min_new_samples=5, max_age_hours=24, train_on_request=False)
+    calls = []
+    assert reader.get_or_train(1, "m_14d", 99, 1000, _trainer(calls, {"v": 2})) == {"v": 1}
+    assert calls == []
+
+
+def test_untrainable_models_are_not_stored_and_babies_can_be_removed(tmp_path):
+    store = ModelStore(str(tmp_path), min_new_samples=5, max_age_hours=24)
+    calls = []
+    assert store.get_or_train(1, "m_14d", 1, 2, _trainer(calls, None)) is None
+    assert store.get_or_train(1, "m_14d", 1, 2, _trainer(calls, None)) is None
+    assert len(calls) == 2
+
+    store.save(2, "m_14d", 1, 10, {"v": 1})
+    store.remove_baby(2)
+    assert not (tmp_path / "baby_2").exists()
@@ -0,0 +1,59 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.security import PasswordHashingPool
+
+
+def test_full_pool_answers_429():
+    pool = PasswordHashingPool(max_workers=1, max_pending=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = [asyncio.create_task(pool.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        assert pool.stats()["in_flight"] == 2 and pool.stats()["queued"] == 1
+        with pytest.raises(HTTPException) as rejected:
+            await pool.run(release.wait)
+        release.set()
+        await asyncio.gather(*running)
+        return rejected.value
+
+    rejected = asyncio.run(scenario())
+    assert rejected.status_code == 429
+    assert rejected.headers["Retry-After"] == "1"
+    stats = pool.stats()
+    assert (stats["completed"], stats["rejected"], stats["failed"], stats["in_flight"]) == (2, 1, 0, 0)
+
+
+def test_failures_are_not_counted_as_completed():
+    pool = PasswordHashingPool(max_workers=1, max_pending=0)
+
+    def broken():
+        raise ValueError("bad hash")
+
+    with pytest.raises(ValueError):
+        asyncio.run(pool.run(broken))
+    stats = pool.stats()
+    assert (stats["completed"], stats["failed"], stats["in_flight"]) == (0, 1, 0)
+
+
+def test_login_checks_the_password_in_the_pool(client, make_user):
+    user = make_user()
+    wrong = client.post("/auth/login", data={"username": user.email, "password": "not-it"})
+    assert wrong.status_code == 401
+
+
+def test_metrics_require_the_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", None)
+    assert client.get("/metrics").status_code == 404
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scraper")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer other"}).status_code == 401
+    response = client.get("/metrics", headers={"Authorization": "Bearer scraper"})
+    assert response.status_code == 200
+    assert {"completed", "failed", "rejected"} <= set(response.json()["password_hashing"])
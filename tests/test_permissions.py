@@ -0,0 +1,70 @@
+from app.core.permissions import access_cache
+from app.models.user_baby import UserBaby
+from app.services.event_hub import event_hub
+
+
+async def _grant(db, user_id, baby_id):
+    # Alta directa en la BD, como la haría otro worker: la caché de este no se entera
+    db.add(UserBaby(user_id=user_id, baby_id=baby_id, role="caregiver"))
+    await db.commit()
+
+
+def test_cache_miss_is_confirmed_in_the_database(client, run, make_user, baby_id):
+    other = make_user()
+    url = f"/babies/{baby_id}/activities"
+    assert client.get(url, headers=other.headers).status_code == 403
+    assert access_cache.get(other.id) == {}
+
+    run(_grant, other.id, baby_id)
+    assert client.get(url, headers=other.headers).status_code == 200
+    assert access_cache.get(other.id) == {baby_id: "caregiver"}
+
+
+def test_removed_caregiver_loses_access_at_once(client, owner, make_user, baby_id):
+    other = make_user()
+    url = f"/babies/{baby_id}/activities"
+    added = client.post(f"/babies/{baby_id}/caregivers", headers=owner.headers, json={"email": other.email})
+    assert added.status_code == 201, added.text
+    assert client.get(url, headers=other.headers).status_code == 200
+
+    removed = client.delete(f"/babies/{baby_id}/caregivers/{other.id}", headers=owner.headers)
+    assert removed.status_code == 204
+    assert client.get(url, headers=other.headers).status_code == 403
+
+
+def test_access_change_clears_the_cache(client, owner, baby_id):
+    client.get(f"/babies/{baby_id}", headers=owner.headers)
+    assert access_cache.get(owner.id) is not None
+    event_hub.access_changed([owner.id])
+    assert access_cache.get(owner.id) is None
+
+
+def test_cached_roles_skip_the_user_babies_query(client, owner, baby_id, statements):
+    url = f"/babies/{baby_id}/activities"
+    client.get(url, headers=owner.headers)
+    statements.clear()
+    assert client.get(url, headers=owner.headers).status_code == 200
+    assert not [statement for statement in statements if "FROM user_babies" in statement]
+
+
+def test_roles_are_enforced_per_baby(client, owner, make_user, baby_id):
+    other = make_user()
+    own_baby = client.post("/babies", headers=other.headers, json={"name": "Otro", "birth_date": "2025-03-01"}).json()["id"]
+    # Tener acceso (cacheado) a un bebé no da acceso a los demás
+    assert client.get(f"/babies/{own_baby}", headers=other.headers).status_code == 200
+    assert client.get(f"/babies/{baby_id}", headers=other.headers).status_code == 403
+
+    client.post(f"/babies/{baby_id}/caregivers", headers=owner.headers, json={"email": other.email})
+    # Un cuidador no es dueño: ni borra el bebé ni gestiona cuidadores
+    assert client.delete(f"/babies/{baby_id}", headers=other.headers).status_code == 403
+    assert client.delete(f"/babies/{baby_id}/caregivers/{owner.id}", headers=other.headers).status_code == 403
+
+
+def test_deleted_baby_is_forgotten_by_every_member(client, owner, make_user, baby_id):
+    other = make_user()
+    client.post(f"/babies/{baby_id}/caregivers", headers=owner.headers, json={"email": other.email})
+    assert client.get(f"/babies/{baby_id}", headers=other.headers).status_code == 200
+
+    assert client.delete(f"/babies/{baby_id}", headers=owner.headers).status_code == 204
+    assert access_cache.get(other.id) is None
+    assert client.get(f"/babies/{baby_id}", headers=other.headers).status_code == 403
@@ -0,0 +1,62 @@
+import base64
+import io
+
+import pytest
+from fastapi import HTTPException
+from PIL import Image
+
+from app.core.projection import parse_fields
+from app.schemas.activity import ActivityResponse
+from app.schemas.baby import BabyResponse
+
+
+def test_parse_fields():
+    assert parse_fields(None, BabyResponse) is None
+    assert parse_fields(" name, ,birth_date", BabyResponse) == {"id", "name", "birth_date"}
+    # Los campos calculados también se pueden pedir
+    assert parse_fields("photo_thumbnail", BabyResponse) == {"id", "photo_thumbnail"}
+    with pytest.raises(HTTPException) as error:
+        parse_fields("name,password", BabyResponse)
+    assert error.value.status_code == 400 and "password" in error.value.detail
+
+
+def test_sparse_activities_read_only_their_columns(client, owner, baby_id, statements):
+    url = f"/babies/{baby_id}/activities"
+    for hour in (1, 2):
+        client.post(url, headers=owner.headers, json={
+            "type": "feeding", "timestamp": f"2025-06-01T{hour:02d}:00:00Z", "notes": "nota", "data": {"quantity_ml": 90}
+        })
+
+    statements.clear()
+    response = client.get(url, headers=owner.headers, params={"fields": "type", "limit": 1})
+    assert response.status_code == 200, response.text
+    assert response.json() == [{"id": response.json()[0]["id"], "type": "feeding"}]
+    assert "X-Next-Cursor" in response.headers
+    query = next(statement for statement in statements if "FROM activities" in statement)
+    assert "activities.notes" not in query and "activities.data" not in query
+
+    assert client.get(url, headers=owner.headers, params={"fields": "type,nope"}).status_code == 400
+    assert set(client.get(url, headers=owner.headers).json()[0]) == set(ActivityResponse.model_fields)
+
+
+def test_sparse_babies_skip_the_photo(client, owner, statements):
+    out = io.BytesIO()
+    Image.new("RGB", (32, 32), "white").save(out, "PNG")
+    response = client.post("/babies", headers=owner.headers, json={
+        "name": "Ligera", "birth_date": "2025-02-01",
+        "photo": "data:image/png;base64," + base64.b64encode(out.getvalue()).decode()
+    })
+    assert response.status_code == 201, response.text
+    baby = response.json()
+
+    statements.clear()
+    sparse = client.get("/babies", headers=owner.headers, params={"fields": "name"}).json()
+    assert {"id": baby["id"], "name": "Ligera"} in sparse
+    assert all(set(entry) == {"id", "name"} for entry in sparse)
+    query = next(statement for statement in statements if "FROM babies" in statement)
+    assert "babies.photo" not in query
+
+    # El campo calculado carga la columna de la que sale y se serializa con el schema
+    thumbnails = client.get("/babies", headers=owner.headers, params={"fields": "photo_thumbnail"}).json()
+    assert {"id": baby["id"], "photo_thumbnail": baby["photo_thumbnail"]} in thumbnails
+    assert client.get("/babies", headers=owner.headers, params={"fields": "secret"}).status_code == 400
@@ -0,0 +1,51 @@
+from datetime import date, datetime
+
+from app.services.report_jobs import ReportBaby, report_key
+
+START = datetime(2025, 1, 1)
+END = datetime(2025, 1, 31)
+BABY = ReportBaby("Lucía", date(2024, 12, 1))
+
+
+def test_report_key_is_stable():
+    assert report_key(1, BABY, START, END, 7) == report_key(1, ReportBaby("Lucía", date(2024, 12, 1)), START, END, 7)
+    # La hora del día no cuenta: el informe va por días
+    assert report_key(1, BABY, START.replace(hour=9), END, 7) == report_key(1, BABY, START, END, 7)
+
+
+def test_report_key_changes_with_its_inputs():
+    key = report_key(1, BABY, START, END, 7)
+    assert report_key(2, BABY, START, END, 7) != key
+    assert report_key(1, BABY._replace(name="Lucia"), START, END, 7) != key
+    assert report_key(1, BABY._replace(birth_date=date(2024, 12, 2)), START, END, 7) != key
+    assert report_key(1, BABY, datetime(2025, 1, 2), END, 7) != key
+    assert report_key(1, BABY, START, datetime(2025, 2, 1), 7) != key
+    assert report_key(1, BABY, START, END, 8) != key
+
+
+def test_report_etag_follows_baby_and_activities(client, owner, baby_id):
+    headers = owner.headers
+    url = f"/babies/{baby_id}/report"
+    first = client.get(url, headers=headers)
+    assert first.status_code == 200, first.text
+    etag = first.headers["ETag"]
+    assert client.get(url, headers={**headers, "If-None-Match": etag}).status_code == 304
+
+    # Renombrar no sube data_version pero el nombre sale en el PDF
+    renamed = client.put(f"/babies/{baby_id}", headers=headers, json={"name": "Otro nombre", "birth_date": "2025-01-01"})
+    assert renamed.status_code == 200, renamed.text
+    after_rename = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert after_rename.status_code == 200
+    assert after_rename.headers["ETag"] != etag
+
+    etag = after_rename.headers["ETag"]
+    client.post(f"/babies/{baby_id}/activities", headers=headers, json={"type": "diaper", "timestamp": datetime.utcnow().isoformat()})
+    after_write = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert after_write.status_code == 200
+    assert after_write.headers["ETag"] != etag
+
+
+def test_report_days_are_bounded(client, owner, baby_id):
+    for days in (0, 367, -5):
+        response = client.get(f"/babies/{baby_id}/report", headers=owner.headers, params={"days": days})
+        assert response.status_code == 422
@@ -0,0 +1,35 @@
+import json
+from datetime import date, datetime
+
+from fastapi.responses import ORJSONResponse
+
+from app.core import responses
+from app.core.responses import DefaultJSONResponse, json_line
+
+
+def test_orjson_is_the_default_response_class():
+    # orjson viene en requirements.txt: con la configuración por defecto siempre está activo
+    assert responses.FAST_JSON
+    assert DefaultJSONResponse is ORJSONResponse
+
+
+def test_fallback_encoder_matches_orjson(monkeypatch):
+    content = {
+        "timestamp": datetime(2025, 1, 2, 3, 4, 5, 678900),
+        "day": date(2025, 1, 2),
+        "data": {"quantity_ml": 120.5, "note": "ñ"},
+        "notes": None,
+    }
+    fast = json_line(content)
+    monkeypatch.setattr(responses, "FAST_JSON", False)
+    assert json.loads(json_line(content)) == json.loads(fast)
+
+
+def test_row_responses_match_the_response_model(client, owner, baby_id):
+    created = client.post(f"/babies/{baby_id}/activities", headers=owner.headers, json={
+        "type": "feeding", "timestamp": "2025-09-01T08:30:15.250000Z", "data": {"quantity_ml": 90}, "notes": "ñam"
+    }).json()
+    # El listado sale de filas sin pasar por pydantic; el detalle, por el response_model
+    listed = client.get(f"/babies/{baby_id}/activities", headers=owner.headers).json()
+    detail = client.get(f"/babies/{baby_id}/activities/{created['id']}", headers=owner.headers).json()
+    assert listed == [detail] == [created]
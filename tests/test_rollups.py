@@ -0,0 +1,75 @@
+from datetime import date, datetime
+
+from sqlalchemy import select
+
+from app.models.activity import Activity
+from app.models.daily_activity_stats import DailyActivityStats
+from app.services.rollup_service import activity_delta, aggregate_daily, backfill_rollups, daily_stats_from_rows
+
+
+async def _rollup_rows(db, baby_id):
+    rows = (await db.scalars(select(DailyActivityStats).where(DailyActivityStats.baby_id == baby_id))).all()
+    return sorted((row.day, row.type, row.count, row.quantity_ml, row.duration_hours) for row in rows)
+
+
+async def _daily(db, baby_id):
+    rows = (await db.scalars(select(DailyActivityStats).where(DailyActivityStats.baby_id == baby_id))).all()
+    activities = (await db.scalars(select(Activity).where(Activity.baby_id == baby_id))).all()
+    return daily_stats_from_rows(rows), aggregate_daily(activities)
+
+
+def test_incremental_rollup_matches_backfill(client, run, owner, baby_id):
+    headers = owner.headers
+    url = f"/babies/{baby_id}/activities"
+    # Valores no numéricos incluidos: ni las deltas ni el GROUP BY deben sumarlos
+    items = [
+        {"type": "feeding", "timestamp": "2025-03-01T08:00:00Z", "data": {"quantity_ml": 120}},
+        {"type": "feeding", "timestamp": "2025-03-01T11:00:00Z", "data": {"quantity_ml": 90.5}},
+        {"type": "feeding", "timestamp": "2025-03-01T14:00:00Z", "data": {"quantity_ml": "120"}},
+        {"type": "feeding", "timestamp": "2025-03-02T08:00:00Z", "data": {"quantity_ml": ""}},
+        {"type": "feeding", "timestamp": "2025-03-02T09:00:00Z", "data": {"quantity_ml": True}},
+        {"type": "sleep", "timestamp": "2025-03-01T20:00:00Z", "data": {"duration_hours": 2.5}},
+        {"type": "sleep", "timestamp": "2025-03-02T20:00:00Z", "data": {"duration_hours": "abc"}},
+        {"type": "diaper", "timestamp": "2025-03-02T10:00:00Z"},
+    ]
+    created = [client.post(url, headers=headers, json=item).json() for item in items]
+    response = client.post(f"{url}:batch", headers=headers, json={"items": [
+        {"type": "feeding", "timestamp": "2025-03-03T08:00:00Z", "data": {"quantity_ml": 60}},
+        {"type": "health", "timestamp": "2025-03-03T09:00:00Z", "data": None},
+    ]})
+    assert response.status_code == 200, response.text
+
+    # Edición que cambia de día y de tipo, y un borrado que vacía un grupo
+    updated = client.put(f"{url}/{created[0]['id']}", headers=headers, json={
+        "type": "sleep", "timestamp": "2025-03-03T22:00:00Z", "data": {"duration_hours": 1}
+    })
+    assert updated.status_code == 200, updated.text
+    assert client.delete(f"{url}/{created[7]['id']}", headers=headers).status_code == 204
+
+    incremental = run(_rollup_rows, baby_id)
+    from_rows, from_activities = run(_daily, baby_id)
+    assert from_rows == from_activities
+
+    run(backfill_rollups, baby_id)
+    assert run(_rollup_rows, baby_id) == incremental
+
+
+def test_emptied_days_leave_no_rollup_rows(client, run, owner, baby_id):
+    url = f"/babies/{baby_id}/activities"
+    activity_id = client.post(url, headers=owner.headers, json={
+        "type": "sleep", "timestamp": "2025-03-10T20:00:00Z", "data": {"duration_hours": 3}
+    }).json()["id"]
+    assert [row[:3] for row in run(_rollup_rows, baby_id)] == [(date(2025, 3, 10), "sleep", 1)]
+
+    client.delete(f"{url}/{activity_id}", headers=owner.headers)
+    assert run(_rollup_rows, baby_id) == []
+
+
+def test_activity_delta_ignores_non_numeric_values():
+    activity = Activity(baby_id=1, type="feeding", timestamp=datetime(2025, 3, 1, 8), data={
+        "quantity_ml": "120", "duration_hours": True
+    })
+    assert activity_delta(activity) == {
+        "baby_id": 1, "day": date(2025, 3, 1), "type": "feeding", "count": 1, "quantity_ml": 0.0, "duration_hours": 0.0
+    }
+    assert activity_delta(Activity(baby_id=1, type="sleep", timestamp=datetime(2025, 3, 1), data={"duration_hours": 1.5}), -1)["duration_hours"] == -1.5
@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta
+
+
+def test_statistics_series_and_cache(client, owner, baby_id, statements):
+    today = datetime.utcnow().date()
+    yesterday = today - timedelta(days=1)
+    url = f"/babies/{baby_id}/activities"
+    for day, activity_type, data in (
+        (today, "feeding", {"quantity_ml": 100}),
+        (today, "feeding", {"quantity_ml": 50.25}),
+        (yesterday, "sleep", {"duration_hours": 2}),
+        (yesterday, "diaper", None),
+    ):
+        client.post(url, headers=owner.headers, json={"type": activity_type, "timestamp": f"{day}T00:00:00Z", "data": data})
+
+    response = client.get(f"/babies/{baby_id}/statistics", headers=owner.headers, params={"days": 3})
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["dates"] == [str(today - timedelta(days=2)), str(yesterday), str(today)]
+    assert stats["series"]["feeding_count"] == [0, 0, 2]
+    assert stats["series"]["feeding_ml"] == [0, 0, 150.2]
+    assert stats["series"]["sleep_hours"] == [0, 2, 0]
+    assert stats["series"]["total_activities"] == [0, 2, 2]
+    assert stats["totals"]["diaper_count"] == 1
+
+    # Misma versión de datos: respuesta de la caché, sin leer la tabla de rollups
+    statements.clear()
+    assert client.get(f"/babies/{baby_id}/statistics", headers=owner.headers, params={"days": 3}).json() == stats
+    assert not [statement for statement in statements if "FROM daily_activity_stats" in statement]
+
+    client.post(url, headers=owner.headers, json={"type": "diaper", "timestamp": f"{today}T00:00:00Z"})
+    updated = client.get(f"/babies/{baby_id}/statistics", headers=owner.headers, params={"days": 3}).json()
+    assert updated["totals"]["diaper_count"] == 2
+    assert updated["data_version"] > stats["data_version"]
+
+
+def test_statistics_days_are_bounded(client, owner, baby_id):
+    for days in (0, 367):
+        assert client.get(f"/babies/{baby_id}/statistics", headers=owner.headers, params={"days": days}).status_code == 422
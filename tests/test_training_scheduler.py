@@ -0,0 +1,57 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from app.core.config import settings
+from app.services.training_scheduler import LocalTrainingQueue, TrainingScheduler
+
+
+def test_queue_keeps_each_baby_once_with_its_best_priority():
+    async def scenario():
+        queue = LocalTrainingQueue()
+        await queue.put(1, 5)
+        await queue.put(2, 3)
+        await queue.put(1, 1)
+        await queue.put(2, 9)
+        assert len(queue) == 2
+        order = [await queue.get(), await queue.get()]
+        waiting = asyncio.create_task(queue.get())
+        await asyncio.sleep(0.01)
+        assert not waiting.done()
+        await queue.put(3, 0)
+        return order, await waiting
+
+    assert asyncio.run(scenario()) == ([1, 2], 3)
+
+
+def test_scan_queues_active_babies_until_trained(client, owner, baby_id, monkeypatch):
+    monkeypatch.setattr(settings, "TRAINING_RETRAIN_EVERY_N_WRITES", 3)
+    now = datetime.utcnow()
+    for hours in range(12):
+        client.post(f"/babies/{baby_id}/activities", headers=owner.headers, json={
+            "type": "feeding", "timestamp": (now - timedelta(hours=3 * hours)).isoformat(), "data": {"quantity_ml": 80 + hours}
+        })
+
+    scheduler = TrainingScheduler(LocalTrainingQueue(), concurrency=1)
+
+    async def queued_babies():
+        await scheduler.scan()
+        babies = []
+        while len(scheduler.queue):
+            babies.append(await scheduler.queue.get())
+        return babies
+
+    assert baby_id in client.portal.call(queued_babies)
+
+    # Sin pool de procesos el entrenamiento va al ejecutor por defecto del loop
+    version = client.portal.call(scheduler.train_baby, baby_id)
+    stored = Path(settings.MODEL_STORE_DIR) / f"baby_{baby_id}"
+    assert any(stored.glob("*.joblib"))
+    # Lo que anota _worker al terminar
+    scheduler._trained[baby_id] = (version, time.monotonic())
+    assert baby_id not in client.portal.call(queued_babies)
+
+    for hours in range(3):
+        client.post(f"/babies/{baby_id}/activities", headers=owner.headers, json={"type": "diaper", "timestamp": now.isoformat()})
+    assert baby_id in client.portal.call(queued_babies)
@@ -0,0 +1,32 @@
+from app.core.security import user_cache
+
+
+def _user_queries(statements):
+    return [statement for statement in statements if "FROM users" in statement]
+
+
+def test_cached_principal_skips_the_users_query(client, make_user, statements):
+    user = make_user()
+    assert "password_hash" not in user_cache.get(user.id)
+
+    statements.clear()
+    assert client.get("/auth/users/me", headers=user.headers).status_code == 200
+    assert _user_queries(statements) == []
+
+
+def test_profile_update_invalidates_the_cache(client, make_user):
+    user = make_user()
+    response = client.put("/auth/users/me", headers=user.headers, json={"name": "Nuevo nombre"})
+    assert response.status_code == 200
+    assert client.get("/auth/users/me", headers=user.headers).json()["name"] == "Nuevo nombre"
+
+
+def test_token_for_a_changed_email_is_rejected(client, make_user):
+    user = make_user()
+    new_email = user.email.replace("@", "+new@")
+    assert client.put("/auth/users/me", headers=user.headers, json={"email": new_email}).status_code == 200
+    # El token lleva el email anterior: ni la caché ni la BD lo aceptan ya
+    assert client.get("/auth/users/me", headers=user.headers).status_code == 401
+
+    token = client.post("/auth/login", data={"username": new_email, "password": "password1"}).json()["access_token"]
+    assert client.get("/auth/users/me", headers={"Authorization": f"Bearer {token}"}).json()["email"] == new_email